@@ -0,0 +1,68 @@
+"""
+    benchmarks.bench_aggregates
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Reads of the precomputed aggregates against summing every stored season
+    again (in SQL and by loading the seasons), and the cost of storing one
+    more season with the aggregates kept up to date, over the synthetic
+    1950-present history of the search benchmark.
+
+    $ python -m benchmarks.bench_aggregates
+
+"""
+import tempfile
+from datetime import datetime
+from os import path
+from timeit import repeat
+from typing import Dict
+
+from benchmarks.bench_search import history
+from formulacli.records import Table
+from formulacli.results_store import ResultsStore
+
+RUNS = 50
+DRIVER = "Jacques Villeneuve VIL"
+
+
+def loaded_sum(store: ResultsStore) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for year in store.seasons("drivers"):
+        for row in store.load("drivers", year, typed=True):
+            if isinstance(row["PTS"], float):
+                totals[row["DRIVER"]] = totals.get(row["DRIVER"], 0.0) + row["PTS"]
+    return totals
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        store: ResultsStore = ResultsStore(path.join(directory, "results.sqlite3"))
+        history(store)
+        seasons: int = len(store.seasons("drivers"))
+        print(f"{seasons} seasons of drivers and teams\n")
+
+        def best(fn, runs: int = RUNS) -> float:
+            return min(repeat(fn, number=1, repeat=runs)) * 1000
+
+        cases = [
+            ("top 10 career points", lambda: store.aggregate("career-points", 10),
+             lambda: store.db.execute('SELECT DRIVER, SUM(PTS) FROM results_drivers GROUP BY DRIVER'
+                                      ' ORDER BY 2 DESC LIMIT 10').fetchall(),
+             lambda: sorted(loaded_sum(store).items(), key=lambda item: -item[1])[:10]),
+            ("points of one driver", lambda: store.aggregate_of("career-points", DRIVER),
+             lambda: store.db.execute('SELECT SUM(PTS) FROM results_drivers WHERE DRIVER = ?', (DRIVER,)).fetchone(),
+             lambda: loaded_sum(store).get(DRIVER)),
+        ]
+        print(f"{'QUERY':<24}{'AGGREGATE':>12}{'SQL SCAN':>12}{'LOAD SCAN':>12}")
+        for label, aggregate, sql_scan, load_scan in cases:
+            print(f"{label:<24}{best(aggregate):>10.3f}ms{best(sql_scan):>10.3f}ms{best(load_scan, 5):>10.3f}ms")
+
+        last: int = datetime.now().year - 1
+        season: Table = store.load("drivers", last)
+        saved: float = best(lambda: store.save("drivers", last, season), 10)
+        rebuilt: float = best(store.rebuild_aggregates, 3)
+        print(f"\nstoring a season again: {saved:.2f}ms, rebuilding every aggregate: {rebuilt:.2f}ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+    benchmarks.bench_ansi_encodings
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Bytes written and render time of every ``paint_image`` encoding for a
+    portrait sized image (the DriverContext crop resized by (0.45, 0.22)).
+
+    $ python -m benchmarks.bench_ansi_encodings [IMAGE]
+
+"""
+import sys
+from timeit import repeat
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from formulacli.img_converter import ENCODINGS, paint_image
+
+RUNS = 5
+SIZE = (round(110 * 0.45), round(115 * 0.22))
+
+
+def portrait() -> Image:
+    """Smooth synthetic stand-in for a driver portrait: flat background, shaded head and shoulders."""
+    im: Image = Image.new("RGB", (110, 115), (225, 225, 225))
+    draw = ImageDraw.Draw(im)
+    draw.ellipse((30, 10, 80, 70), fill=(210, 160, 130))
+    draw.rectangle((10, 75, 100, 115), fill=(30, 30, 120))
+    return im.filter(ImageFilter.GaussianBlur(2))
+
+
+def main() -> None:
+    im: Image = Image.open(sys.argv[1]).convert("RGB") if len(sys.argv) > 1 else portrait()
+    im = im.resize(SIZE)
+    baseline: int = len(paint_image(im).encode())
+
+    print(f"{SIZE[0]}x{SIZE[1]} cells, best of {RUNS}")
+    print(f"{'ENCODING':<12}{'BYTES':>10}{'VS CELLS':>10}{'TIME':>12}")
+    for encoding in ENCODINGS:
+        size: int = len(paint_image(im, encoding=encoding).encode())
+        elapsed: float = min(repeat(lambda: paint_image(im, encoding=encoding), number=1, repeat=RUNS))
+        print(f"{encoding:<12}{size:>10,}{size / baseline:>10.0%}{elapsed * 1000:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
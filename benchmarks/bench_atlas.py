@@ -0,0 +1,83 @@
+"""
+    benchmarks.bench_atlas
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Startup time and resident memory of drawing the portraits of a roster in
+    a fresh interpreter: painted by ``convert_image`` (downloaded from a local
+    server) and emitted from the atlas.
+    Peak resident memory is read from ``getrusage``, so this runs on Unix only.
+
+    $ python -m benchmarks.bench_atlas
+
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from typing import Dict, List
+
+PORTRAITS = 20
+RUNS = 5
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+
+PREAMBLE: str = (
+    "import json, resource, sys, time\n"
+    "start = time.perf_counter()\n"
+    "from formulacli.prefetch import PORTRAIT_ARGS\n"
+)
+EPILOGUE: str = (
+    "print(json.dumps({'ms': (time.perf_counter() - start) * 1000,\n"
+    "                  'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,\n"
+    "                  'heavy': [m for m in ('numpy', 'PIL') if m in sys.modules]}))\n"
+)
+PATHS: Dict[str, str] = {
+    "convert_image": (
+        "from formulacli.img_converter import convert_image\n"
+        "for url in urls: convert_image(url, **PORTRAIT_ARGS)\n"
+    ),
+    "atlas": (
+        "from formulacli.atlas import get_atlas\n"
+        "for url in urls: get_atlas().portrait(url, **PORTRAIT_ARGS)\n"
+    ),
+}
+
+
+class Quiet(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def run(code: str, cache: str) -> Dict:
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            env={**os.environ, "FORMULACLI_CACHE_DIR": cache})
+    return json.loads(result.stdout)
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Quiet, directory=str(FIXTURES)))
+    Thread(target=server.serve_forever, daemon=True).start()
+    # distinct urls of the same picture, one per driver
+    urls: List[str] = [f"http://127.0.0.1:{server.server_port}/portrait.jpg?driver={i}" for i in range(PORTRAITS)]
+
+    print(f"{PORTRAITS} portraits, best of {RUNS} fresh interpreters\n")
+    print(f"{'PATH':<16}{'TIME':>10}{'PEAK RSS':>12}  HEAVY IMPORTS")
+    for label, body in PATHS.items():
+        with tempfile.TemporaryDirectory() as cache:
+            code: str = PREAMBLE + f"urls = {urls!r}\n" + body + EPILOGUE
+            if label != "convert_image":
+                run(code, cache)  # fills the atlas
+            runs: List[Dict] = [run(code, cache) for _ in range(RUNS)]
+        best: Dict = min(runs, key=lambda result: result["ms"])
+        rss: int = min(result["rss"] for result in runs)
+        print(f"{label:<16}{best['ms']:>8.1f}ms{rss / 1024:>10.1f}MB  {', '.join(best['heavy']) or 'none'}")
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
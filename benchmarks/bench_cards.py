@@ -0,0 +1,49 @@
+"""
+    benchmarks.bench_cards
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Painting throughput of the card export for growing process pools, on a
+    grid of 1280px portraits decoded, cropped and quantized like the
+    DriverContext does. Downloads are left out, they overlap the painting.
+
+    $ python -m benchmarks.bench_cards
+
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import List
+
+from PIL import Image
+
+from formulacli.cards import quantize_portrait
+
+PORTRAIT: Path = Path(__file__).parent.parent / "tests" / "fixtures" / "portrait.jpg"
+CARDS = 80
+SIDE = 1280
+
+
+def main() -> None:
+    buffer = io.BytesIO()
+    Image.open(PORTRAIT).convert("RGB").resize((SIDE, SIDE)).save(buffer, "JPEG", quality=90)
+    portraits: List[bytes] = [buffer.getvalue()] * CARDS
+
+    cores: int = os.cpu_count() or 1
+    pools: List[int] = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    print(f"{CARDS} portraits of {SIDE}px, {cores} cores")
+    print(f"{'PROCESSES':<12}{'WALL':>10}{'CARDS/S':>10}{'SPEEDUP':>10}")
+    single: float = 0.0
+    for workers in pools:
+        with ProcessPoolExecutor(workers) as pool:
+            list(pool.map(quantize_portrait, portraits[:workers]))  # warm up the workers
+            start: float = perf_counter()
+            list(pool.map(quantize_portrait, portraits))
+            wall: float = perf_counter() - start
+        single = single or wall
+        print(f"{workers:<12}{wall:>9.2f}s{CARDS / wall:>10.1f}{single / wall:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+    benchmarks.bench_color_lut
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Accuracy versus bucket size of the colour lookup tables, and the cost of
+    painting a 110x115 crop through exact distances versus a lookup table.
+
+    $ python -m benchmarks.bench_color_lut
+
+"""
+from timeit import repeat
+
+from numpy import uint8
+from numpy.random import default_rng
+from PIL import Image
+
+from formulacli.img_converter import LUT_BITS, get_lut, lut_accuracy_report, paint_image, BACK_BW_SCHEME
+
+RUNS = 5
+
+
+def main() -> None:
+    print(lut_accuracy_report())
+    print()
+
+    pixels = default_rng(0).integers(0, 256, size=(115, 110, 3), dtype=uint8)
+    image: Image = Image.fromarray(pixels, "RGB")
+    get_lut(BACK_BW_SCHEME, LUT_BITS)
+
+    exact: float = min(repeat(lambda: paint_image(image), number=1, repeat=RUNS))
+    lut: float = min(repeat(lambda: paint_image(image, lut_bits=LUT_BITS), number=1, repeat=RUNS))
+    print(f"110x115 crop, best of {RUNS}")
+    print(f"  exact distances : {exact * 1000:8.2f} ms")
+    print(f"  {LUT_BITS}-bit lookup    : {lut * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+    benchmarks.bench_image_decode
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Bytes transferred and decode memory of a DriverContext portrait: the full
+    resolution decode followed by crop and resize, against ``decode_image``
+    and its reduced JPEG decoding, for portraits of growing resolution at the
+    ``medium`` and ``low`` rendition qualities.
+
+    $ python -m benchmarks.bench_image_decode
+
+"""
+import io
+from pathlib import Path
+from timeit import repeat
+from typing import Tuple
+
+from PIL import Image
+
+from formulacli import img_converter
+from formulacli.img_converter import decode_image
+from formulacli.prefetch import PORTRAIT_ARGS
+
+PORTRAIT: Path = Path(__file__).parent.parent / "tests" / "fixtures" / "portrait.jpg"
+SIDES = (320, 640, 1280, 1920)
+QUALITIES = {"medium": 90, "low": 60}
+RUNS = 20
+
+
+def rendition(side: int, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.open(PORTRAIT).convert("RGB").resize((side, side)).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def full_decode(data: bytes, crop_box: Tuple[int, int, int, int]) -> Image:
+    image: Image = Image.open(io.BytesIO(data))
+    cropped: Image = image.crop(crop_box)
+    return cropped.resize((round(cropped.size[0] * PORTRAIT_ARGS["ratio"][0]),
+                           round(cropped.size[1] * PORTRAIT_ARGS["ratio"][1])))
+
+
+def main() -> None:
+    decoded = {}
+    img_converter.count = lambda name, n=1: decoded.__setitem__(name, n)
+
+    print(f"{'PORTRAIT':<16}{'BYTES':>10}{'FULL MEM':>12}{'FULL':>10}{'DRAFT MEM':>12}{'DRAFT':>10}")
+    for side in SIDES:
+        # the portrait crop box scaled to the rendition
+        crop_box = tuple(round(c * side / 320) for c in PORTRAIT_ARGS["crop_box"])
+        for label, quality in QUALITIES.items():
+            data: bytes = rendition(side, quality)
+            full: float = min(repeat(lambda: full_decode(data, crop_box), number=1, repeat=RUNS))
+            draft: float = min(repeat(lambda: decode_image(data, PORTRAIT_ARGS["ratio"], None, crop_box),
+                                      number=1, repeat=RUNS))
+            print(f"{f'{side}px {label}':<16}{len(data):>10,}{side * side * 3:>12,}{full * 1000:>8.2f}ms"
+                  f"{decoded['image decoded bytes']:>12,}{draft * 1000:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+    benchmarks.bench_paint_image
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compares the per-pixel ``color_to_ansi`` loop with the batched quantizer
+    behind ``paint_image`` on a 110x115 crop (the DriverContext portrait box).
+
+    $ python -m benchmarks.bench_paint_image
+
+"""
+from timeit import repeat
+
+from colorama import Back, Fore, Style
+from numpy import array, uint8
+from numpy.random import default_rng
+from PIL import Image
+
+from formulacli.img_converter import BACK_BW_SCHEME, color_to_ansi, paint_image
+
+CROP_SIZE = (110, 115)
+RUNS = 5
+
+
+def legacy_paint_image(im: Image) -> str:
+    picture: str = ""
+    for row in array(im).tolist():
+        for px in row:
+            picture += color_to_ansi(tuple(px), BACK_BW_SCHEME)
+            picture += " "
+        picture += "\n"
+    return picture + Back.RESET + Fore.RESET + Style.RESET_ALL
+
+
+def main() -> None:
+    pixels = default_rng(0).integers(0, 256, size=(CROP_SIZE[1], CROP_SIZE[0], 3), dtype=uint8)
+    image: Image = Image.fromarray(pixels, "RGB")
+    assert legacy_paint_image(image) == paint_image(image)
+
+    legacy: float = min(repeat(lambda: legacy_paint_image(image), number=1, repeat=RUNS))
+    batched: float = min(repeat(lambda: paint_image(image), number=1, repeat=RUNS))
+    print(f"{CROP_SIZE[0]}x{CROP_SIZE[1]} crop, best of {RUNS}")
+    print(f"  per-pixel loop : {legacy * 1000:8.2f} ms")
+    print(f"  batched        : {batched * 1000:8.2f} ms")
+    print(f"  speedup        : {legacy / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
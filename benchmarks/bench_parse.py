@@ -0,0 +1,62 @@
+"""
+    benchmarks.bench_parse
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Parse time and peak memory of every extractor on the fixture pages,
+    building the full tree versus only the strained subtrees.
+
+    $ python -m benchmarks.bench_parse
+
+"""
+import tracemalloc
+from pathlib import Path
+from timeit import repeat
+from typing import Callable, Any, List, Tuple
+
+from bs4 import SoupStrainer
+
+from formulacli import html_handlers
+from formulacli.drivers import DRIVER_STRAINER, DRIVERS_STRAINER, parse_driver, parse_drivers
+from formulacli.html_handlers import parse
+from formulacli.news import NEWS_STRAINER, parse_top_stories
+from formulacli.result_tables import RESULTS_STRAINER, get_result_table, get_values
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+RUNS = 5
+
+EXTRACTORS: List[Tuple[str, str, SoupStrainer, Callable[[Any], Any]]] = [
+    ("parse_drivers", "drivers.html", DRIVERS_STRAINER, parse_drivers),
+    ("parse_driver", "driver.html", DRIVER_STRAINER, parse_driver),
+    ("get_result_table", "results_races.html", RESULTS_STRAINER, lambda soup: get_values(get_result_table(soup))),
+    ("parse_top_stories", "latest.html", NEWS_STRAINER, parse_top_stories),
+]
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    fn()
+    peak: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    print(f"strained parser: {html_handlers.PARSER}, best of {RUNS}")
+    print(f"{'EXTRACTOR':<20}{'FULL':>10}{'STRAINED':>10}{'FULL PEAK':>12}{'STRAINED PEAK':>15}")
+    for name, fixture, strainer, extract in EXTRACTORS:
+        html: str = (FIXTURES / fixture).read_text(encoding="utf-8")
+
+        def full():
+            return extract(parse(html))
+
+        def strained():
+            return extract(parse(html, strainer))
+
+        full_time: float = min(repeat(full, number=1, repeat=RUNS))
+        strained_time: float = min(repeat(strained, number=1, repeat=RUNS))
+        print(f"{name:<20}{full_time * 1000:>8.1f}ms{strained_time * 1000:>8.1f}ms"
+              f"{peak_memory(full) / 1024:>10.0f}KB{peak_memory(strained) / 1024:>13.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
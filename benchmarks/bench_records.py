@@ -0,0 +1,63 @@
+"""
+    benchmarks.bench_records
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Memory and render latency of the record tables against pandas DataFrames
+    for the tables the contexts print: the drivers list and a results table.
+
+    $ python -m benchmarks.bench_records
+
+"""
+import tracemalloc
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Callable
+
+from pandas import DataFrame
+
+from formulacli.drivers import parse_drivers
+from formulacli.html_handlers import parse
+from formulacli.records import Table
+from formulacli.result_tables import get_cols, get_result_table, get_values
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+RUNS = 20
+
+
+def allocated(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by the object ``build`` returns."""
+    tracemalloc.start()
+    obj = build()
+    size: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def compare(label: str, table: Table, render_table: Callable[[Any], str], render_frame: Callable[[Any], str]) -> None:
+    frame: DataFrame = table.to_pandas()
+    table_time: float = min(repeat(lambda: render_table(table), number=1, repeat=RUNS))
+    frame_time: float = min(repeat(lambda: render_frame(frame), number=1, repeat=RUNS))
+    scraped = [list(row) for row in table.rows]
+    table_size: int = allocated(lambda: Table(table.columns, scraped))
+    frame_size: int = allocated(lambda: DataFrame(scraped, columns=list(table.columns)))
+    print(f"{label:<10}{'Table':<11}{table_size / 1024:>8.1f}KB{table_time * 1000:>10.3f}ms")
+    print(f"{'':<10}{'DataFrame':<11}{frame_size / 1024:>8.1f}KB{frame_time * 1000:>10.3f}ms")
+
+
+def main() -> None:
+    print(f"{'':<21}{'MEMORY':>10}{'RENDER':>12}  (best of {RUNS})")
+    drivers: Table = parse_drivers(parse((FIXTURES / "drivers.html").read_text(encoding="utf-8")))
+    compare("drivers", drivers,
+            lambda table: table.select("NAME", "NUMBER", "TEAM").to_string(start=1),
+            lambda frame: frame[["NAME", "NUMBER", "TEAM"]].to_string())
+
+    soup = get_result_table(parse((FIXTURES / "results_races.html").read_text(encoding="utf-8")))
+    races: Table = Table(get_cols(soup), get_values(soup))
+    compare("races", races,
+            lambda table: table.to_string(index=False),
+            lambda frame: frame.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
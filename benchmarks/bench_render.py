@@ -0,0 +1,112 @@
+"""
+    benchmarks.bench_render
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Frame time and bytes sent while cycling through DriverContext style frames
+    (header, portrait, profile), written to a pseudo terminal: ``clear`` plus
+    line by line prints against the diffing renderer. The link column estimates
+    the transfer time of a frame over a slow SSH connection.
+
+    $ python -m benchmarks.bench_render
+
+"""
+import os
+import shutil
+import subprocess
+from threading import Thread
+from time import perf_counter, sleep
+from typing import Callable, List, TextIO
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from formulacli.img_converter import paint_image
+from formulacli.renderer import Renderer
+
+DRIVERS = 20
+LAPS = 3
+COLUMNS, ROWS = 120, 50
+LINK_BYTES_PER_S = 1_000_000 / 8  # 1 Mbit/s
+SIZE = (round(110 * 0.45), round(115 * 0.22))
+
+
+def portrait(shade: int) -> str:
+    im: Image = Image.new("RGB", (110, 115), (225, 225, 225))
+    draw = ImageDraw.Draw(im)
+    draw.ellipse((30, 10, 80, 70), fill=(210, 160 - shade, 130 + shade))
+    draw.rectangle((10, 75, 100, 115), fill=(30 + shade * 4, 30, 120))
+    return paint_image(im.filter(ImageFilter.GaussianBlur(2)).resize(SIZE), encoding="rle")
+
+
+def frames() -> List[str]:
+    names: List[str] = [f"DRIVER{i:02}" for i in range(DRIVERS)]
+    portraits: List[str] = [portrait(i % 10) for i in range(DRIVERS)]
+    pages: List[str] = []
+    for i, name in enumerate(names):
+        header: str = "  ".join(f"\x1b[31m{other}\x1b[39m" if other == name else other for other in names[:8])
+        lines: List[str] = ["  " + header, ""]
+        lines += ["       " + line for line in portraits[i].split("\n")]
+        lines += [f"  {label}:{' ' * (30 - len(label))}{label.lower()} of {name}"
+                  for label in ("TEAM", "COUNTRY", "PODIUMS", "POINTS", "GRANDS PRIX ENTERED")]
+        lines += ["", "Press h for help.", ""]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def legacy(out: TextIO) -> Callable[[str], None]:
+    clear: str = shutil.which("clear") or ""
+
+    def draw(page: str) -> None:
+        if clear:
+            subprocess.run([clear], stdout=out, env=dict(os.environ, TERM="xterm"))
+        else:
+            out.write("\x1b[H\x1b[2J")
+        for line in page.split("\n")[:-1]:
+            print("\x1b[0m" + line, file=out)
+        out.flush()
+    return draw
+
+
+def diffed(out: TextIO) -> Callable[[str], None]:
+    renderer: Renderer = Renderer()
+    return lambda page: renderer.draw(page, out)
+
+
+def main() -> None:
+    os.environ["COLUMNS"], os.environ["LINES"] = str(COLUMNS), str(ROWS)
+    master, slave = os.openpty()
+    received: List[int] = [0]
+
+    def drain() -> None:
+        while True:
+            try:
+                chunk: bytes = os.read(master, 65536)
+            except OSError:
+                return
+            received[0] += len(chunk)
+
+    Thread(target=drain, daemon=True).start()
+    out: TextIO = os.fdopen(slave, "w", buffering=1 << 20)
+    pages: List[str] = frames()
+
+    print(f"{DRIVERS} drivers x {LAPS} laps, {COLUMNS}x{ROWS} pty")
+    print(f"{'RENDERER':<12}{'FRAME':>10}{'BYTES':>10}{'LINK':>10}")
+    for label, make in (("clear", legacy), ("diff", diffed)):
+        draw: Callable[[str], None] = make(out)
+        draw(pages[-1])
+        sleep(0.2)
+        sent: int = received[0]
+        start: float = perf_counter()
+        for _ in range(LAPS):
+            for page in pages:
+                draw(page)
+        elapsed: float = perf_counter() - start
+        count: int = LAPS * DRIVERS
+        sleep(0.2)  # lets the drain thread catch up
+        per_frame: float = (received[0] - sent) / count
+        print(f"{label:<12}{elapsed / count * 1000:>8.2f}ms{per_frame:>10,.0f}"
+              f"{per_frame / LINK_BYTES_PER_S * 1000:>8.0f}ms")
+    out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+    benchmarks.bench_roster
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Latency of a ``d`` step through a full 20 driver grid: the header loop
+    and index arithmetic DriverContext used to run on every construction,
+    against the precomputed roster (strip slicing and a ring lookup), and
+    the whole DriverContext construction with it.
+
+    $ python -m benchmarks.bench_roster
+
+"""
+from timeit import repeat
+from typing import Tuple
+
+from colorama import Back, Fore, Style
+
+from formulacli.contexts import DriverContext
+from formulacli.records import Table
+from formulacli.roster import Roster, get_roster
+
+DRIVERS = 20
+STEPS = 10_000
+RUNS = 5
+
+
+def legacy_step(drivers: Table, index: int) -> Tuple[int, str]:
+    next_index: int = index + 1
+    if next_index > len(drivers) - 1:
+        next_index = 0
+    current: str = drivers[next_index]['NAME']
+    header: str = Back.LIGHTWHITE_EX
+    for name in drivers.column('NAME'):
+        if name == current:
+            header += Fore.RED + Back.WHITE + name.split(' ')[-1] + Back.LIGHTWHITE_EX + Fore.RESET
+        else:
+            header += Fore.LIGHTBLACK_EX + Style.DIM + name.split(' ')[-1] + Fore.RESET
+        header += "  "
+    return next_index, header + Back.RESET
+
+
+def roster_step(drivers: Table, index: int) -> Tuple[int, str]:
+    roster: Roster = get_roster(drivers)
+    next_index: int = roster.next[index]
+    return next_index, roster.header(next_index)
+
+
+def context_step(drivers: Table, index: int) -> Tuple[int, str]:
+    next_index: int = get_roster(drivers).next[index]
+    return next_index, DriverContext(drivers[next_index], next_index, drivers).header
+
+
+def main() -> None:
+    drivers: Table = Table(["NAME", "NUMBER", "TEAM", "URL", "IMG"], [
+        [f"First{i} Surname{i}", str(i), f"Team{i // 2}", f"/en/drivers/{i}.html", ""] for i in range(DRIVERS)
+    ])
+    print(f"{DRIVERS} drivers, {STEPS:,} d steps")
+    for label, step in (("loop", legacy_step), ("roster", roster_step), ("context", context_step)):
+        def run() -> None:
+            index: int = 0
+            for _ in range(STEPS):
+                index, _header = step(drivers, index)
+        best: float = min(repeat(run, number=1, repeat=RUNS))
+        print(f"{label:<10}{best / STEPS * 1e6:>8.2f}us per step")
+
+
+if __name__ == "__main__":
+    main()
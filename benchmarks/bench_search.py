@@ -0,0 +1,88 @@
+"""
+    benchmarks.bench_search
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Build, load and lookup times of the search index over a store holding a
+    synthetic 1950-present history (about as many drivers and teams as the
+    real one), against a linear scan of the names.
+
+    $ python -m benchmarks.bench_search
+
+"""
+import random
+import tempfile
+from datetime import datetime
+from os import path
+from time import perf_counter
+from timeit import repeat
+from typing import List
+
+from formulacli.records import Table
+from formulacli.results_store import FIRST_SEASON, ResultsStore
+from formulacli.search import SearchIndex, build_index, tokenize
+
+DRIVERS = 870
+TEAMS = 170
+PER_SEASON = 25
+QUERIES = ("ham", "44", "villeneuve", "vileneuve", "red bull", "2019", "zzz")
+RUNS = 200
+
+SYLLABLES = ["ma", "ri", "ton", "vel", "sch", "ber", "lau", "ham", "neu", "ve", "pi", "quet", "ros", "ber", "ga", "ni"]
+
+
+def name(rng: random.Random) -> str:
+    first: str = "".join(rng.choice(SYLLABLES) for _ in range(2)).title()
+    last: str = "".join(rng.choice(SYLLABLES) for _ in range(3)).title()
+    return f"{first} {last} {last[:3].upper()}"
+
+
+def history(store: ResultsStore) -> Table:
+    rng: random.Random = random.Random(0)
+    drivers: List[str] = [name(rng) for _ in range(DRIVERS - 1)] + ["Jacques Villeneuve VIL"]
+    teams: List[str] = [f"{rng.choice(SYLLABLES).title()}{rng.choice(SYLLABLES)} {n}" for n in range(TEAMS - 1)]
+    teams.append("Red Bull Racing Honda")
+    for year in range(FIRST_SEASON, datetime.now().year):
+        grid: List[str] = rng.sample(drivers, PER_SEASON)
+        store.save("drivers", year, Table(["POS", "DRIVER", "NATIONALITY", "CAR", "PTS"], [
+            [str(pos + 1), driver, "GBR", rng.choice(teams), str(PER_SEASON - pos)] for pos, driver in enumerate(grid)
+        ]))
+        store.save("team", year, Table(["POS", "TEAM", "PTS"], [
+            [str(pos + 1), team, str(10 - pos)] for pos, team in enumerate(rng.sample(teams, 10))
+        ]))
+    return Table(["NAME", "NUMBER", "TEAM", "URL", "IMG"], [
+        ["Lewis Hamilton", "44", "Mercedes", "/en/drivers/lewis-hamilton.html", ""],
+        ["Max Verstappen", "33", "Red Bull Racing", "/en/drivers/max-verstappen.html", ""],
+    ])
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        store: ResultsStore = ResultsStore(path.join(directory, "results.sqlite3"))
+        roster: Table = history(store)
+        index_path: str = path.join(directory, "search.json")
+
+        start: float = perf_counter()
+        index: SearchIndex = build_index(store, roster)
+        built: float = perf_counter() - start
+        index.save(index_path)
+        start = perf_counter()
+        SearchIndex.load(index_path)
+        loaded: float = perf_counter() - start
+        print(f"{len(index)} entries, {len(index.prefixes)} prefixes, {path.getsize(index_path):,} bytes on disk")
+        print(f"built in {built * 1000:.1f}ms, loaded in {loaded * 1000:.1f}ms\n")
+
+        labels: List[str] = [entry.label for entry in index.entries]
+        print(f"{'QUERY':<14}{'INDEX':>10}{'SCAN':>10}  BEST MATCH")
+        for query in QUERIES:
+            indexed: float = min(repeat(lambda: index.search(query), number=1, repeat=RUNS))
+            words: List[str] = tokenize(query)
+            scan: float = min(repeat(lambda: [label for label in labels
+                                              if all(any(token.startswith(word) for token in tokenize(label))
+                                                     for word in words)], number=1, repeat=RUNS // 10))
+            best: List = index.search(query, limit=1)
+            print(f"{query:<14}{indexed * 1e6:>8.0f}us{scan * 1e6:>8.0f}us  {best[0].label if best else '-'}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
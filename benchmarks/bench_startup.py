@@ -0,0 +1,52 @@
+"""
+    benchmarks.bench_startup
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Import cost of everything needed to draw the main menu, measured with
+    ``python -X importtime`` in a fresh interpreter, against importing every
+    subsystem up front.
+
+    $ python -m benchmarks.bench_startup
+
+"""
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MENU: str = "import formulacli.app; formulacli.app.FormulaCLI(); formulacli.app.contexts.MainContext()"
+SUBSYSTEMS: str = MENU + "; import formulacli.prefetch, formulacli.news, formulacli.results_store"
+HEAVY: Tuple[str, ...] = ("pandas", "numpy", "PIL", "requests", "bs4")
+RUNS = 5
+
+
+def import_times(code: str) -> Dict[str, int]:
+    """
+    Self import time in microseconds per top level package imported by ``code``.
+    """
+    stderr: str = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                 capture_output=True, text=True, check=True).stderr
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines()[1:]:
+        own, _, name = line.split("|")
+        package: str = name.strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(own.split(":")[1])
+    return packages
+
+
+def report(label: str, code: str) -> None:
+    runs: List[Dict[str, int]] = [import_times(code) for _ in range(RUNS)]
+    best: Dict[str, int] = min(runs, key=lambda packages: sum(packages.values()))
+    heavy: List[str] = [package for package in HEAVY if package in best]
+    print(f"{label:<12}{sum(best.values()) / 1000:>8.1f}ms  heavy imports: {', '.join(heavy) or 'none'}")
+    for package, micros in sorted(best.items(), key=lambda item: -item[1])[:6]:
+        print(f"{'':<14}{package:<20}{micros / 1000:>8.1f}ms")
+
+
+def main() -> None:
+    print(f"best of {RUNS}")
+    report("main menu", MENU)
+    report("everything", SUBSYSTEMS)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,15 @@
-from formulacli import FormulaCLI
+import sys
 
-CLI = FormulaCLI()
+from formulacli.profiling import enable_from_argv
 
 if __name__ == "__main__":
-    CLI.run()
+    # before the instrumented modules are imported
+    argv = enable_from_argv(sys.argv[1:])
+    if argv:
+        from formulacli.cli import main
+
+        sys.exit(main(argv))
+
+    from formulacli import FormulaCLI
+
+    FormulaCLI().run()
@@ -0,0 +1,21 @@
+"""
+    formulacli.__main__
+    ~~~~~~~~~~~~~~~~~~~
+
+    ``python -m formulacli`` starts the interface, or runs a headless subcommand when given one.
+
+"""
+import sys
+
+from formulacli.profiling import enable_from_argv
+
+# before the instrumented modules are imported
+argv = enable_from_argv(sys.argv[1:])
+if argv:
+    from formulacli.cli import main
+
+    sys.exit(main(argv))
+else:
+    from formulacli import FormulaCLI
+
+    FormulaCLI().run()
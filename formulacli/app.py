@@ -5,14 +5,18 @@
     Controls Context objects and main loop.
 
 """
+import logging
 import sys
 from typing import Dict, Any
 
-from colorama import Style
+from colorama import Style, init
 
-from formulacli import contexts
-from formulacli.exceptions import ExitException
-from formulacli.helpers import clear_screen
+from formulacli import contexts, profiling
+from formulacli.exceptions import ExitException, FetchError
+from formulacli.helpers import Timer
+from formulacli.renderer import get_renderer
+
+logger = logging.getLogger(__name__)
 
 
 class FormulaCLI:
@@ -21,6 +25,7 @@ class FormulaCLI:
     Changes context based on state change of Context objects.
     """
     def __init__(self) -> None:
+        init(convert=True)
         self.state: Dict[str, Any] = {
             "ctx": contexts.MainContext,
             "args": {}
@@ -35,10 +40,10 @@ class FormulaCLI:
                 try:
                     ctx = self.state["ctx"]
                     if hasattr(ctx, '__call__'):
-                        ctx = ctx(**self.state["args"])
-                        ctx.add_to_history()
-                    clear_screen()
+                        with Timer(f"{ctx.__name__}.open"):
+                            ctx = contexts.Context.open(ctx, self.state["args"])
                     ctx.render()
+                    ctx.add_to_cache()
                     if ctx.state['next_ctx']:
                         self.state["ctx"] = ctx.state['next_ctx']
                         self.state["args"] = ctx.state['next_ctx_args']
@@ -49,18 +54,56 @@ class FormulaCLI:
                     else:
                         ctx.block_render = True
                         print(Style.RESET_ALL)
+                        get_renderer().invalidate()
                         self.state["ctx"] = ctx
+                except FetchError as e:
+                    self.fall_back(ctx, e)
 
         except ExitException:
             self.close("Graciously exiting.")
         except EOFError:
             self.close()
 
+    def fall_back(self, ctx: Any, error: FetchError) -> None:
+        """
+        Returns to the previous context, showing why the current one could not be built or drawn.
+        :param ctx: failed context, or its class when the constructor failed
+        :param error: fetch failure
+        """
+        history = contexts.Context.history
+        if isinstance(ctx, contexts.Context):
+            # built but not drawn, its frame is already in the history
+            contexts.Context.cache.discard(ctx.frame.key)
+            if history and history[-1] is ctx.frame:
+                history.pop()
+        contexts.Context.messages.append(contexts.Message(msg=str(error), type='error'))
+        if history:
+            previous = history.pop()
+            self.state["ctx"] = previous.ctx
+            self.state["args"] = previous.args
+        else:
+            self.state["ctx"] = contexts.MainContext
+            self.state["args"] = {}
+
     @staticmethod
     def close(msg: str = "Graciously exiting.") -> None:
         """
         Exits the program graciously
         :param msg: Exit message
         """
+        # only the subsystems that were used are loaded
+        prefetch = sys.modules.get("formulacli.prefetch")
+        if prefetch is not None:
+            prefetch.shutdown()
+        html_handlers = sys.modules.get("formulacli.html_handlers")
+        if html_handlers is not None:
+            logger.debug("connection reuse: %s", html_handlers.session_stats())
+            for name, value in html_handlers.session_stats().items():
+                profiling.count(f"session {name}", value)
+            if html_handlers._cache is not None:
+                for name, value in html_handlers._cache.stats.items():
+                    profiling.count(f"page cache {name}", value)
+        logger.debug("frames: %s", get_renderer().stats())
         print(msg)
+        profiling.close()
         sys.exit()
@@ -0,0 +1,135 @@
+"""
+    formulacli.async_fetch
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Runs blocking fetches off the main thread while an asyncio loop keeps
+    drawing a spinner and reading keys, so slow responses can be left with
+    back or quit instead of freezing the terminal.
+
+"""
+import asyncio
+import os
+import sys
+from threading import Thread
+from typing import Any, Callable, Optional, Tuple, List, TextIO
+
+from formulacli.exceptions import ExitException, FetchCancelled
+from formulacli.renderer import terminal
+
+SPINNER: str = "|/-\\"
+FRAME_INTERVAL: float = 0.1
+BACK_KEYS: Tuple[str, ...] = ("b", "\x1b")
+QUIT_KEYS: Tuple[str, ...] = ("q",)
+
+
+class KeyReader:
+    """
+    Non blocking key reads from the terminal, a no-op when stdin is not a terminal.
+    """
+    def __init__(self) -> None:
+        self.fd: Optional[int] = None
+        self.settings: Optional[List[Any]] = None
+
+    def __enter__(self) -> "KeyReader":
+        if sys.platform != "win32" and sys.stdin.isatty():
+            import termios
+            import tty
+
+            self.fd = sys.stdin.fileno()
+            self.settings = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.settings is not None:
+            import termios
+
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self.settings)
+            self.settings = None
+
+    def poll(self) -> Optional[str]:
+        """
+        Pending key press, if any.
+        """
+        if sys.platform == "win32":
+            import msvcrt
+
+            return msvcrt.getwch() if msvcrt.kbhit() else None
+        if self.fd is None:
+            return None
+        import select
+
+        if select.select([self.fd], [], [], 0)[0]:
+            return os.read(self.fd, 1).decode(errors="ignore")
+        return None
+
+
+def run_in_thread(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+    """
+    Runs ``fn`` in a daemon thread, an abandoned fetch never delays the exit.
+    """
+    loop = asyncio.get_running_loop()
+    future: asyncio.Future = loop.create_future()
+
+    def settle(result: Any, error: Optional[BaseException]) -> None:
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target() -> None:
+        result: Any = None
+        error: Optional[BaseException] = None
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:  # handed over to the loop
+            error = e
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            pass  # abandoned, the loop is already closed
+
+    Thread(target=target, daemon=True, name="fetch").start()
+    return future
+
+
+async def fetch_async(fn: Callable[..., Any], *args: Any, label: str = "Loading", **kwargs: Any) -> Any:
+    """
+    Awaits ``fn(*args, **kwargs)`` while spinning and servicing keys.
+    :raises FetchCancelled: a back key was pressed
+    :raises ExitException: a quit key was pressed
+    """
+    future: asyncio.Future = run_in_thread(fn, *args, **kwargs)
+    out: TextIO = terminal()
+    draw: bool = out.isatty()
+    frame: int = 0
+    with KeyReader() as keys:
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=FRAME_INTERVAL)
+                if done:
+                    return future.result()
+                if draw:
+                    out.write(f"\r  {SPINNER[frame % len(SPINNER)]} {label}... (b: back, q: quit)")
+                    out.flush()
+                    frame += 1
+                key: Optional[str] = keys.poll()
+                if key in BACK_KEYS:
+                    future.cancel()
+                    raise FetchCancelled()
+                if key in QUIT_KEYS:
+                    future.cancel()
+                    raise ExitException
+        finally:
+            if draw and frame:
+                out.write("\r\x1b[K")
+                out.flush()
+
+
+def fetch(fn: Callable[..., Any], *args: Any, label: str = "Loading", **kwargs: Any) -> Any:
+    """
+    Blocking entry point of :func:`fetch_async` for the contexts.
+    """
+    return asyncio.run(fetch_async(fn, *args, label=label, **kwargs))
@@ -0,0 +1,424 @@
+"""
+    formulacli.atlas
+    ~~~~~~~~~~~~~~~~
+
+    Memory mapped atlas of painted portraits. Every portrait is kept as a grid
+    of palette indexes, one byte per cell, next to the escape codes of the
+    scheme it was painted with, so that restarts draw it again without numpy,
+    PIL or the network.
+
+    File layout: :data:`MAGIC` then records appended one after the other, each
+    a kind and a length (:data:`RECORD`) followed by its payload: ``S`` records
+    hold a scheme as JSON, ``G`` records a grid (:data:`GRID` then the cells).
+    A grid written again replaces the previous one, the file is compacted
+    once it grows past :data:`MAX_BYTES`. Other processes may have the file
+    mapped: writers take an advisory lock on ``<atlas>.lock``, only ever
+    append to the file and replace it as a whole when compacting.
+
+"""
+import json
+import mmap
+import struct
+from collections import namedtuple
+from contextlib import contextmanager
+from hashlib import sha1
+from itertools import groupby
+from os import fstat, path, replace, stat
+from sys import platform
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from colorama import Back, Fore, Style
+
+from formulacli.helpers import cache_dir
+from formulacli.palettes import scheme_for, scheme_key
+
+MAGIC: bytes = b"FCATLAS\x02"
+# kind, payload length
+RECORD: struct.Struct = struct.Struct("<cI")
+# key, width, height, scheme
+GRID: struct.Struct = struct.Struct("<40sHHH")
+
+MAX_BYTES: int = 8 * 1024 * 1024
+
+# encodings of :func:`~formulacli.img_converter.paint_image` a palette grid can be emitted with
+ENCODINGS: Tuple[str, ...] = ("cells", "rle")
+
+# offset of the cells in the file
+Entry = namedtuple("Entry", ["offset", "width", "height", "scheme"])
+Scheme = namedtuple("Scheme", ["codes", "brush"])
+
+
+def atlas_key(url: str,
+              brush: Optional[str] = None,
+              colored: bool = False,
+              ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
+              size: Optional[Tuple[int, int]] = None,
+              crop_box: Optional[Tuple[int, int, int, int]] = None,
+              lut_bits: Optional[int] = None) -> str:
+    """
+    Digest of the arguments changing the palette indexes of an image and of the colour scheme they select.
+    """
+    params: Dict[str, Any] = {
+        "url": url,
+        "brush": brush,
+        "colored": colored,
+        "ratio": ratio,
+        "size": size,
+        "crop_box": crop_box,
+        "lut_bits": lut_bits,
+        "scheme": scheme_key(scheme_for(brush, colored)),
+    }
+    return sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def emit(grid: bytes, width: int, codes: List[str], brush: str, encoding: str = "rle") -> str:
+    """
+    Text :func:`~formulacli.img_converter.paint_image` writes for the same palette indexes.
+    :param grid: palette index of every cell, row after row
+    :param codes: escape code of every palette entry, cells indexed ``len(codes)`` have none
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}")
+    missing: int = len(codes)
+    rows: List[str] = []
+    if encoding == "cells":
+        cells: List[str] = [code + Style.BRIGHT + brush for code in codes]
+        cells.append(Style.BRIGHT + brush)
+        for start in range(0, len(grid), width):
+            rows.append("".join([cells[i] for i in grid[start:start + width]]))
+    else:
+        run_codes: List[str] = [*codes, ""]
+        for start in range(0, len(grid), width):
+            # cells without a palette entry keep the colour of the cell before them
+            found: int = missing
+            filled: List[int] = []
+            for i in grid[start:start + width]:
+                if i != missing:
+                    found = i
+                filled.append(found)
+            rows.append(Style.BRIGHT + "".join([run_codes[i] + brush * sum(1 for _ in run)
+                                                for i, run in groupby(filled)]))
+    rows.append(Back.RESET + Fore.RESET + Style.RESET_ALL)
+    return "\n".join(rows)
+
+
+@contextmanager
+def locked(lock_path: str) -> Iterator[None]:
+    """
+    Holds an exclusive advisory lock on ``lock_path``, shared with the other processes using the atlas.
+    :raises OSError: the lock file cannot be created
+    """
+    with open(lock_path, "a+b") as f:
+        if platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def index_portrait(data: bytes,
+                   brush: Optional[str] = None,
+                   colored: bool = False,
+                   ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
+                   size: Optional[Tuple[int, int]] = None,
+                   crop_box: Optional[Tuple[int, int, int, int]] = None,
+                   lut_bits: Optional[int] = None) -> Tuple[bytes, int]:
+    """
+    Decodes and quantizes a downloaded image like :func:`~formulacli.img_converter.convert_image`.
+    :return: the palette grid and its width
+    """
+    from formulacli.img_converter import decode_image, index_image
+
+    indexes = index_image(decode_image(data, ratio, size, crop_box), scheme_for(brush, colored), lut_bits)
+    return indexes.astype("uint8").tobytes(), indexes.shape[1]
+
+
+class PortraitAtlas:
+    """
+    Palette grids by :func:`atlas_key`, read from a memory map of the atlas file.
+    Grids are appended in place under :func:`locked`, after reading what other processes appended,
+    the file is never truncated and only replaced when it is compacted.
+    Portraits that cannot be stored (unwritable directory, full disk) are still painted.
+    """
+    def __init__(self, file_path: Optional[str] = None, max_bytes: int = MAX_BYTES) -> None:
+        """
+        :param file_path: defaults to ``portraits.atlas`` in the ``atlas`` user cache directory
+        """
+        self.path: Optional[str] = file_path
+        if self.path is None:
+            try:
+                self.path = path.join(cache_dir("atlas"), "portraits.atlas")
+            except OSError:  # nothing is stored
+                pass
+        self.max_bytes: int = max_bytes
+        self.lock: Lock = Lock()
+        self.map: Optional[mmap.mmap] = None
+        # (device, inode) of the mapped file, changes when another process compacts it
+        self.inode: Optional[Tuple[int, int]] = None
+        # where the next record is written
+        self.end: int = 0
+        # in the order they were written
+        self.entries: Dict[str, Entry] = {}
+        self.schemes: List[Scheme] = []
+        # read this session, evicted last
+        self.used: Set[str] = set()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evicted": 0, "errors": 0}
+        self.open()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def open(self) -> None:
+        """
+        Maps the atlas file and reads its records, a missing or unreadable file is an empty atlas.
+        """
+        self.close()
+        if self.path is None:
+            return
+        try:
+            self.remap()
+        except (OSError, ValueError):  # missing or empty
+            return
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.close()
+            return
+        self.end = self.scan(len(MAGIC))
+
+    def remap(self) -> None:
+        with open(self.path, "rb") as f:
+            status = fstat(f.fileno())
+            self.inode = (status.st_dev, status.st_ino)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def unmap(self) -> None:
+        if self.map is not None:
+            self.map.close()
+        self.map = None
+
+    def close(self) -> None:
+        self.unmap()
+        self.inode = None
+        self.end = 0
+        self.entries = {}
+        self.schemes = []
+
+    def scan(self, position: int) -> int:
+        """
+        Reads the records from ``position``.
+        :return: the end of the last complete record, an interrupted write leaves a partial one behind
+        """
+        size: int = len(self.map)
+        while position + RECORD.size <= size:
+            kind, length = RECORD.unpack_from(self.map, position)
+            start: int = position + RECORD.size
+            if start + length > size:
+                break
+            if kind == b"S":
+                try:
+                    self.schemes.append(Scheme(*json.loads(self.map[start:start + length])))
+                except (ValueError, TypeError):
+                    break
+            elif kind == b"G" and length >= GRID.size:
+                raw_key, width, height, scheme = GRID.unpack_from(self.map, start)
+                if length != GRID.size + width * height or scheme >= len(self.schemes):
+                    break
+                key: str = raw_key.rstrip(b"\0").decode("ascii", "replace")
+                self.entries.pop(key, None)
+                self.entries[key] = Entry(start + GRID.size, width, height, scheme)
+            else:
+                break
+            position = start + length
+        return position
+
+    def grid(self, entry: Entry) -> bytes:
+        return self.map[entry.offset:entry.offset + entry.width * entry.height]
+
+    def get(self, key: str, encoding: str = "rle") -> Optional[str]:
+        """
+        Stored portrait painted with ``encoding``, ``None`` when it was never added.
+        """
+        with self.lock:
+            entry: Optional[Entry] = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.used.add(key)
+            grid: bytes = self.grid(entry)
+            scheme: Scheme = self.schemes[entry.scheme]
+        return emit(grid, entry.width, scheme.codes, scheme.brush, encoding)
+
+    def put(self, key: str, grid: bytes, width: int, codes: List[str], brush: str) -> None:
+        """
+        Adds (or replaces) a portrait, failures to write are counted in ``stats`` and otherwise ignored.
+        """
+        with self.lock:
+            if self.path is None:
+                return
+            try:
+                with locked(self.path + ".lock"):
+                    self.refresh()
+                    self.append(key, bytes(grid), width, Scheme(list(codes), brush))
+                    if self.end > self.max_bytes:
+                        self.compact()
+            except OSError:
+                self.stats["errors"] += 1
+                self.open()
+
+    def refresh(self) -> None:
+        """
+        Reads the records other processes appended since the file was mapped, all of them when
+        it was replaced by a compaction. Called with the file lock held.
+        """
+        try:
+            status = stat(self.path)
+        except FileNotFoundError:
+            self.close()
+            return
+        if self.map is None or (status.st_dev, status.st_ino) != self.inode:
+            self.open()
+        elif status.st_size > len(self.map):
+            self.unmap()
+            self.remap()
+            self.end = self.scan(self.end)
+
+    def append(self, key: str, grid: bytes, width: int, scheme: Scheme) -> None:
+        """
+        Writes the records of a grid after the last complete one. Called with the file lock held.
+        """
+        fresh: bool = self.map is None
+        if fresh:
+            self.close()
+            self.end = len(MAGIC)
+        chunks: List[bytes] = [MAGIC] if fresh else []
+        if scheme in self.schemes:
+            index: int = self.schemes.index(scheme)
+        else:
+            index = len(self.schemes)
+            payload: bytes = json.dumps(list(scheme)).encode()
+            chunks += [RECORD.pack(b"S", len(payload)), payload]
+        height: int = len(grid) // width
+        chunks += [RECORD.pack(b"G", GRID.size + len(grid)), GRID.pack(key.encode(), width, height, index), grid]
+
+        # unmapped while written, mapped files cannot be resized on Windows
+        self.unmap()
+        # never truncated, other processes may have it mapped
+        with open(self.path, "r+b" if path.exists(self.path) else "wb") as f:
+            f.seek(0 if fresh else self.end)
+            f.writelines(chunks)
+            end: int = f.tell()
+            size: int = f.seek(0, 2)
+            if size > end:
+                # left over by an interrupted write or an invalid file, unreadable from now on
+                f.seek(end)
+                f.write(bytes(min(RECORD.size, size - end)))
+        self.end = end
+        if index == len(self.schemes):
+            self.schemes.append(scheme)
+        self.entries.pop(key, None)
+        self.entries[key] = Entry(self.end - len(grid), width, height, index)
+        self.remap()
+
+    def compact(self) -> None:
+        """
+        Writes the atlas again without the replaced grids, evicting the oldest ones not read this
+        session, then the oldest ones, until it fits in three quarters of ``max_bytes``.
+        The file is replaced, processes still mapping the previous one read it again on their next write.
+        """
+        def cost(entry: Entry) -> int:
+            return RECORD.size + GRID.size + entry.width * entry.height
+
+        kept: Dict[str, Entry] = dict(self.entries)
+        total: int = len(MAGIC) + sum(cost(entry) for entry in kept.values())
+        newest: str = next(reversed(kept))
+        for read in (False, True):
+            for key, entry in list(kept.items()):
+                if total <= self.max_bytes * 3 // 4:
+                    break
+                if key != newest and (key in self.used) == read:
+                    del kept[key]
+                    total -= cost(entry)
+                    self.stats["evicted"] += 1
+
+        schemes: List[int] = sorted({entry.scheme for entry in kept.values()})
+        chunks: List[bytes] = [MAGIC]
+        for index in schemes:
+            payload: bytes = json.dumps(list(self.schemes[index])).encode()
+            chunks += [RECORD.pack(b"S", len(payload)), payload]
+        for key, entry in kept.items():
+            grid: bytes = self.grid(entry)
+            chunks += [RECORD.pack(b"G", GRID.size + len(grid)),
+                       GRID.pack(key.encode(), entry.width, entry.height, schemes.index(entry.scheme)), grid]
+        with NamedTemporaryFile("wb", dir=path.dirname(self.path), suffix=".tmp", delete=False) as tmp:
+            tmp.writelines(chunks)
+        # unmapped first, files cannot be replaced while mapped on Windows
+        self.unmap()
+        replace(tmp.name, self.path)
+        self.open()
+
+    def paint(self,
+              key: str,
+              grid: bytes,
+              width: int,
+              brush: Optional[str] = None,
+              colored: bool = False,
+              encoding: str = "rle") -> str:
+        """
+        Stores a grid quantized by :func:`index_portrait` and paints it.
+        """
+        codes: List[str] = list(scheme_for(brush, colored).values())
+        self.put(key, grid, width, codes, brush or " ")
+        return emit(grid, width, codes, brush or " ", encoding)
+
+    def portrait(self,
+                 url: str,
+                 brush: Optional[str] = None,
+                 colored: bool = False,
+                 ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
+                 size: Optional[Tuple[int, int]] = None,
+                 crop_box: Optional[Tuple[int, int, int, int]] = None,
+                 lut_bits: Optional[int] = None,
+                 encoding: str = "rle") -> str:
+        """
+        Same as :func:`~formulacli.img_converter.convert_image`, only downloaded and quantized
+        the first time, numpy and PIL are not imported for the portraits already in the atlas.
+        :raises FetchError: see :func:`~formulacli.html_handlers.get_bytes`
+        """
+        key: str = atlas_key(url, brush, colored, ratio, size, crop_box, lut_bits)
+        text: Optional[str] = self.get(key, encoding)
+        if text is not None:
+            return text
+
+        from formulacli.html_handlers import get_bytes
+
+        grid, width = index_portrait(get_bytes(url), brush, colored, ratio, size, crop_box, lut_bits)
+        return self.paint(key, grid, width, brush, colored, encoding)
+
+
+_atlas: Optional[PortraitAtlas] = None
+# the prefetch workers ask for the atlas concurrently
+_atlas_lock: Lock = Lock()
+
+
+def get_atlas() -> PortraitAtlas:
+    global _atlas
+    if _atlas is None:
+        with _atlas_lock:
+            if _atlas is None:
+                _atlas = PortraitAtlas()
+    return _atlas
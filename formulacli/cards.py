@@ -0,0 +1,223 @@
+"""
+    formulacli.cards
+    ~~~~~~~~~~~~~~~~
+
+    Batch export of a card per driver (name, profile and portrait) as ANSI
+    text or HTML, for displays outside the terminal. Profiles and portraits
+    are downloaded in threads, portraits are decoded and quantized in a
+    process pool as that is CPU bound, and every stage is timed.
+
+    $ python -m formulacli cards --out cards --card-format html
+
+"""
+import html
+import re
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from os import makedirs, path
+from threading import Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from formulacli.atlas import atlas_key, get_atlas, index_portrait
+from formulacli.drivers import fetch_driver, fetch_drivers
+from formulacli.exceptions import FetchError
+from formulacli.html_handlers import get_bytes
+from formulacli.prefetch import PORTRAIT_ARGS
+from formulacli.records import Record, Table
+
+FORMATS: Tuple[str, ...] = ("ansi", "html")
+DOWNLOAD_WORKERS: int = 8
+
+# PORTRAIT_ARGS of the quantizing, the encoding is only used to paint
+ENCODING: str = PORTRAIT_ARGS["encoding"]
+INDEX_ARGS: Dict[str, Any] = {name: value for name, value in PORTRAIT_ARGS.items() if name != "encoding"}
+
+# xterm colours of the SGR codes 30-37 and 90-97 (40-47 and 100-107 as backgrounds)
+PALETTE: Tuple[str, ...] = (
+    "#000000", "#cd0000", "#00cd00", "#cdcd00", "#0000ee", "#cd00cd", "#00cdcd", "#e5e5e5",
+    "#7f7f7f", "#ff0000", "#00ff00", "#ffff00", "#5c5cff", "#ff00ff", "#00ffff", "#ffffff",
+)
+SGR: "re.Pattern[str]" = re.compile(r"\x1b\[([\d;]*)m")
+
+
+class StageTimes:
+    """
+    Tasks, busy seconds and wall clock span of every stage, from any thread.
+    """
+    def __init__(self) -> None:
+        # stage -> [tasks, busy seconds, first start, last end]
+        self.stages: Dict[str, List[float]] = {}
+        self.lock: Lock = Lock()
+
+    def record(self, stage: str, start: float, end: float, busy: Optional[float] = None) -> None:
+        """
+        :param busy: seconds of work within ``start`` and ``end``, all of it by default
+        """
+        with self.lock:
+            times: Optional[List[float]] = self.stages.get(stage)
+            if times is None:
+                times = self.stages[stage] = [0, 0.0, start, end]
+            times[0] += 1
+            times[1] += end - start if busy is None else busy
+            times[2] = min(times[2], start)
+            times[3] = max(times[3], end)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, perf_counter())
+
+    def summary(self) -> str:
+        rows: List[List[Any]] = []
+        for stage, (tasks, busy, start, end) in self.stages.items():
+            wall: float = end - start
+            rows.append([stage, int(tasks), f"{busy:.2f}", f"{wall:.2f}", f"{busy / tasks * 1000:.1f}",
+                         f"{busy / wall:.1f}" if wall else "-"])
+        return Table(["STAGE", "TASKS", "BUSY S", "WALL S", "MS/TASK", "PARALLEL"], rows).to_string(index=False)
+
+
+def quantize_portrait(data: bytes) -> Tuple[bytes, int, float]:
+    """
+    Process pool task, quantizes a downloaded portrait like the DriverContext does.
+    :return: the palette grid, its width and the seconds it took
+    """
+    start: float = perf_counter()
+    grid, width = index_portrait(data, **INDEX_ARGS)
+    return grid, width, perf_counter() - start
+
+
+def card(driver: Record, profile: Dict[str, str], portrait: str) -> str:
+    """
+    ANSI text of a card: the driver, the portrait and the profile without the biography.
+    """
+    lines: List[str] = [f"  {driver['NAME']}  #{driver['NUMBER']}", ""]
+    lines += ["       " + line for line in portrait.split("\n")]
+    margin: int = 30
+    for label, value in profile.items():
+        if label not in ['BIO', 'URL', 'IMG']:
+            lines.append("  " + label.title() + ":" + " " * (margin - len(label)) + value)
+    return "\n".join(lines) + "\n"
+
+
+def ansi_to_html(text: str, title: str = "") -> str:
+    """
+    HTML page showing ``text`` as a terminal would, for the escape codes the painters write.
+    """
+    fore: Optional[str] = None
+    back: Optional[str] = None
+    bright: bool = False
+    dim: bool = False
+    spans: List[str] = []
+    for i, part in enumerate(SGR.split(text)):
+        if i % 2 == 0:
+            if part:
+                styles: List[str] = []
+                if fore:
+                    styles.append(f"color:{fore}")
+                if back:
+                    styles.append(f"background:{back}")
+                if bright:
+                    styles.append("font-weight:bold")
+                if dim:
+                    styles.append("opacity:.6")
+                escaped: str = html.escape(part)
+                spans.append(f'<span style="{";".join(styles)}">{escaped}</span>' if styles else escaped)
+            continue
+        codes: List[int] = [int(code) for code in part.split(";") if code] or [0]
+        while codes:
+            code: int = codes.pop(0)
+            if code == 0:
+                fore, back, bright, dim = None, None, False, False
+            elif code == 1:
+                bright = True
+            elif code == 2:
+                dim = True
+            elif code == 22:
+                bright = dim = False
+            elif code in (38, 48) and codes[:1] == [2] and len(codes) >= 4:
+                color: str = "#{:02x}{:02x}{:02x}".format(*codes[1:4])
+                del codes[:4]
+                if code == 38:
+                    fore = color
+                else:
+                    back = color
+            elif code == 39:
+                fore = None
+            elif code == 49:
+                back = None
+            elif 30 <= code <= 37 or 90 <= code <= 97:
+                fore = PALETTE[code - 30 if code < 90 else code - 82]
+            elif 40 <= code <= 47 or 100 <= code <= 107:
+                back = PALETTE[code - 40 if code < 100 else code - 92]
+    return (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n"
+            f"<body style=\"background:#000;color:#e5e5e5\"><pre style=\"line-height:1\">{''.join(spans)}</pre>"
+            f"</body></html>\n")
+
+
+def card_name(driver: Record) -> str:
+    return path.splitext(path.basename(driver["URL"]))[0] or driver["NUMBER"]
+
+
+def export(directory: str,
+           card_format: str = "ansi",
+           workers: Optional[int] = None,
+           drivers: Optional[Table] = None,
+           report: Callable[[str], Any] = print) -> Tuple[List[Tuple[Record, str]], StageTimes]:
+    """
+    Writes the card of every driver in ``directory``, one file each.
+    Portraits painted before are read from the portrait atlas, the others are quantized in a pool of processes.
+    :param workers: quantizing processes, one per core by default
+    :param report: called with a line per driver that could not be exported
+    :return: (driver, path) of every card written, and the time spent in each stage
+    """
+    if card_format not in FORMATS:
+        raise ValueError(f"Unknown card format {card_format!r}")
+    times: StageTimes = StageTimes()
+    if drivers is None:
+        with times.time("roster"):
+            drivers = fetch_drivers()
+    makedirs(directory, exist_ok=True)
+    atlas = get_atlas()
+
+    with ThreadPoolExecutor(DOWNLOAD_WORKERS, thread_name_prefix="cards") as threads, \
+            ProcessPoolExecutor(workers) as processes:
+        def profile(url: str) -> Dict[str, str]:
+            with times.time("profiles"):
+                return fetch_driver(url)
+
+        def portrait(url: str) -> str:
+            key: str = atlas_key(url, **INDEX_ARGS)
+            with times.time("cache"):
+                cached: Optional[str] = atlas.get(key, ENCODING)
+            if cached is not None:
+                return cached
+            with times.time("download"):
+                data: bytes = get_bytes(url)
+            start: float = perf_counter()
+            grid, width, busy = processes.submit(quantize_portrait, data).result()
+            times.record("paint", start, perf_counter(), busy)
+            return atlas.paint(key, grid, width, encoding=ENCODING)
+
+        jobs: List[Tuple[Record, Future, Future]] = [
+            (driver, threads.submit(profile, driver["URL"]), threads.submit(portrait, driver["IMG"]))
+            for driver in drivers
+        ]
+        written: List[Tuple[Record, str]] = []
+        for driver, profile_job, portrait_job in jobs:
+            try:
+                text: str = card(driver, profile_job.result(), portrait_job.result())
+            except (FetchError, OSError, ValueError) as e:  # one failed driver does not stop the export
+                report(f"{driver['NAME']}: {e}")
+                continue
+            with times.time("write"):
+                file_path: str = path.join(directory, card_name(driver) + "." + card_format)
+                if card_format == "html":
+                    text = ansi_to_html(text, driver["NAME"])
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+            written.append((driver, file_path))
+    return written, times
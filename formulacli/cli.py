@@ -0,0 +1,261 @@
+"""
+    formulacli.cli
+    ~~~~~~~~~~~~~~
+
+    Headless subcommands printing results, drivers and news as json, csv or
+    ndjson, without the banner and the interactive contexts, and exporting
+    driver cards.
+
+    $ python -m formulacli results --for team --year 2010-2019 --format csv
+
+"""
+import csv
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from formulacli import profiling
+from formulacli.drivers import fetch_drivers, fetch_driver
+from formulacli.exceptions import FetchError
+from formulacli.news import fetch_top_stories
+from formulacli.records import Table
+from formulacli.result_tables import fetch_results
+
+FORMATS: Tuple[str, ...] = ("json", "csv", "ndjson")
+TABLES: Tuple[str, ...] = ("drivers", "team", "races", "fastest-laps")
+CARD_FORMATS: Tuple[str, ...] = ("ansi", "html")
+WORKERS: int = 8
+
+
+class Writer(ABC):
+    """
+    Writes rows as soon as they are given, ``close`` ends the document.
+    """
+    def __init__(self, out: TextIO) -> None:
+        self.out: TextIO = out
+
+    @abstractmethod
+    def write(self, row: Dict[str, Any]) -> None:
+        pass
+
+    def flush(self) -> None:
+        self.out.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class NDJSONWriter(Writer):
+    def write(self, row: Dict[str, Any]) -> None:
+        self.out.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+class JSONWriter(Writer):
+    """
+    One json array, opened before the first row.
+    """
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(out)
+        self.rows: int = 0
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self.out.write(("[\n  " if not self.rows else ",\n  ") + json.dumps(row, ensure_ascii=False))
+        self.rows += 1
+
+    def close(self) -> None:
+        self.out.write("\n]\n" if self.rows else "[]\n")
+        super().close()
+
+
+class CSVWriter(Writer):
+    """
+    Lists are joined with ``;``, a header is written again whenever the columns change.
+    """
+    def __init__(self, out: TextIO) -> None:
+        super().__init__(out)
+        self.csv = csv.writer(out)
+        self.columns: Optional[List[str]] = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+        columns: List[str] = list(row)
+        if columns != self.columns:
+            self.csv.writerow(columns)
+            self.columns = columns
+        self.csv.writerow(["; ".join(value) if isinstance(value, list) else value for value in row.values()])
+
+
+WRITERS: Dict[str, type] = {"json": JSONWriter, "csv": CSVWriter, "ndjson": NDJSONWriter}
+
+
+def parse_years(text: str) -> List[int]:
+    """
+    ``2019`` or an inclusive range, ``2010-2019``.
+    """
+    try:
+        first, _, last = text.partition("-")
+        years: List[int] = list(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise ArgumentTypeError(f"invalid season {text!r}") from None
+    if not years:
+        raise ArgumentTypeError(f"empty season range {text!r}")
+    return years
+
+
+def worker_count(text: str) -> int:
+    """
+    Number of workers, at least one.
+    """
+    try:
+        count: int = int(text)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid worker count {text!r}") from None
+    if count < 1:
+        raise ArgumentTypeError(f"at least one worker is needed, not {count}")
+    return count
+
+
+def rows(table: Table, **extra: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Table rows as dicts, prefixed by the ``extra`` columns.
+    """
+    for record in table:
+        row: Dict[str, Any] = dict(extra)
+        row.update(record)
+        yield row
+
+
+def season_results(table_for: str, years: Iterable[int], workers: int = WORKERS
+                   ) -> Iterator[Tuple[int, Union[Table, Exception]]]:
+    """
+    Fetches seasons concurrently, yielding them in order as soon as each one and its predecessors are in.
+    Failed seasons yield their error.
+    """
+    def fetch(year: int) -> Union[Table, Exception]:
+        try:
+            return fetch_results(table_for, year)
+        except (ValueError, FetchError) as e:
+            return e
+
+    years = list(years)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from zip(years, executor.map(fetch, years))
+
+
+def results(args: Namespace, writer: Writer) -> int:
+    failed: int = 0
+    for year, table in season_results(args.table_for, args.years, args.workers):
+        if isinstance(table, Exception):
+            failed += 1
+            print(f"{year} {args.table_for}: {table}", file=sys.stderr)
+            continue
+        for row in rows(table, YEAR=year):
+            writer.write(row)
+        writer.flush()
+    return 1 if failed else 0
+
+
+def drivers(args: Namespace, writer: Writer) -> int:
+    for row in rows(fetch_drivers()):
+        writer.write(row)
+    return 0
+
+
+def driver(args: Namespace, writer: Writer) -> int:
+    roster: Table = fetch_drivers()
+    if not 1 <= args.index <= len(roster):
+        print(f"Invalid driver index, [1-{len(roster)}]", file=sys.stderr)
+        return 2
+    row: Dict[str, Any] = dict(roster[args.index - 1])
+    row.update(fetch_driver(row["URL"]))
+    writer.write(row)
+    return 0
+
+
+def news(args: Namespace, writer: Writer) -> int:
+    for row in rows(fetch_top_stories(img_size=args.img_size)):
+        writer.write(row)
+    return 0
+
+
+def cards(args: Namespace, writer: Writer) -> int:
+    from formulacli.cards import export
+
+    start: float = perf_counter()
+    written, times = export(args.out, args.card_format, args.workers,
+                            report=lambda line: print(line, file=sys.stderr))
+    for card_driver, file_path in written:
+        writer.write({"NAME": card_driver["NAME"], "NUMBER": card_driver["NUMBER"], "PATH": file_path})
+    elapsed: float = perf_counter() - start
+    print(f"{len(written)} cards in {elapsed:.2f}s ({len(written) / elapsed:.1f}/s) -> {args.out}",
+          file=sys.stderr)
+    print(times.summary(), file=sys.stderr)
+    return 0 if written else 1
+
+
+def build_parser() -> ArgumentParser:
+    parser: ArgumentParser = ArgumentParser(prog="python -m formulacli",
+                                            description="Formula 1 results, drivers and news without the interface.")
+    parser.add_argument("--format", choices=FORMATS, default="json", help="output format (default: json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    results_parser = commands.add_parser("results", help="championship and race result tables")
+    results_parser.add_argument("--for", dest="table_for", choices=TABLES, default="drivers")
+    results_parser.add_argument("--year", dest="years", type=parse_years, nargs="+",
+                                default=[[datetime.now().year]], help="seasons, e.g. 2019 or 2010-2019")
+    results_parser.add_argument("--workers", type=worker_count, default=WORKERS, help="concurrent season downloads")
+    results_parser.set_defaults(run=results)
+
+    commands.add_parser("drivers", help="current drivers").set_defaults(run=drivers)
+
+    driver_parser = commands.add_parser("driver", help="profile and biography of a driver")
+    driver_parser.add_argument("index", type=int, help="position in the drivers list, from 1")
+    driver_parser.set_defaults(run=driver)
+
+    news_parser = commands.add_parser("news", help="latest headlines")
+    news_parser.add_argument("--img-size", type=int, default=9, help="thumbnail size of the image urls")
+    news_parser.set_defaults(run=news)
+
+    cards_parser = commands.add_parser("cards", help="export a card file per driver")
+    cards_parser.add_argument("--out", default="cards", help="directory of the cards (default: cards)")
+    cards_parser.add_argument("--card-format", choices=CARD_FORMATS, default="ansi")
+    cards_parser.add_argument("--workers", type=worker_count, default=None,
+                              help="painting processes (default: one per core)")
+    cards_parser.set_defaults(run=cards)
+
+    # --format is accepted after the subcommand as well
+    for subparser in commands.choices.values():
+        subparser.add_argument("--format", choices=FORMATS, default=None, dest="sub_format")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, out: Optional[TextIO] = None) -> int:
+    """
+    Runs a subcommand.
+    :param out: defaults to stdout
+    :return: exit status, 1 when something could not be fetched
+    """
+    out = out or sys.stdout
+    args: Namespace = build_parser().parse_args(argv)
+    if args.command == "results":
+        args.years = [year for years in args.years for year in years]
+    writer: Writer = WRITERS[args.sub_format or args.format](out)
+    try:
+        status: int = args.run(args, writer)
+        writer.close()
+    except FetchError as e:
+        writer.close()
+        print(e, file=sys.stderr)
+        status = 1
+    except BrokenPipeError:
+        # the reader went away (``| head``), keep the exit flush from failing again
+        if out is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        status = 0
+    profiling.close()
+    return status
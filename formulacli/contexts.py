@@ -3,18 +3,20 @@ from __future__ import annotations
 import sys
 from collections import namedtuple
 from datetime import datetime
+from math import isfinite
 from textwrap import TextWrapper
-from typing import List, Dict, Any, Union, Optional, Type
+from threading import Event
+from typing import List, Dict, Any, Union, Optional, Type, Hashable
 
-from colorama import Fore, Style, Back
-from pandas import DataFrame, Series
+from colorama import Fore, Style
 
 from formulacli.banners import Banner, DESCRIPTION
-from formulacli.drivers import fetch_drivers, fetch_driver
 from formulacli.exceptions import ExitException
-from formulacli.img_converter import convert_image
-from formulacli.news import fetch_top_stories
-from formulacli.result_tables import fetch_results
+from formulacli.nav_cache import NavigationCache, estimate_size
+from formulacli.profiling import timed
+from formulacli.records import Record, Table
+from formulacli.renderer import get_renderer
+from formulacli.roster import get_roster
 
 if sys.platform in ['linux', 'linux2', 'darwin']:
     from getch import getch as read_key
@@ -24,16 +26,22 @@ elif sys.platform == 'win32':
 Command = namedtuple("Command", ['cmd', 'label'])
 Option = namedtuple("Option", ['opt', 'label'])
 Message = namedtuple("Message", ['msg', 'type'])
+# how a visited context is built again: its class, constructor args and cache key
+Frame = namedtuple("Frame", ['ctx', 'args', 'key'])
+
+MAX_HISTORY: int = 64
 
 BANNER = Banner()
 
 
 class Context:
-    history: List[Any] = []
+    history: List[Frame] = []
+    cache: NavigationCache = NavigationCache()
     messages: List[Message] = []
     block_render: bool = True
 
     def __init__(self) -> None:
+        self.frame: Frame = Frame(ctx=type(self), args={}, key=type(self).__name__)
         self.state: Dict[str, Any] = {
             'name': "context",
             'next_ctx': self,
@@ -45,17 +53,25 @@ class Context:
             'string_input': False
         }
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'event' in cls.__dict__:
+            cls.event = timed(f"{cls.__name__}.event")(cls.event)
+
     def __str__(self):
         return self.state['name']
 
+    @timed("Context.render")
     def render(self) -> None:
-        if self.state['show_banner']:
-            print(self.banner)
-        self.show_options()
-        self.event()
-        print()
-        self.show_messages()
-        print("Press h for help.")
+        with get_renderer().frame():
+            if self.state['show_banner']:
+                print(self.banner)
+            self.show_options()
+            self.event()
+            print()
+            self.show_messages()
+            print("Press h for help.")
+        typed: bool = self.state['string_input']
         self.state['command'] = cmd = self.get_commands()
 
         if cmd.lower() in ['q', 'quit', 'exit']:
@@ -66,30 +82,126 @@ class Context:
             self.state['next_ctx_args'] = {}
             return
         if cmd.lower() in ['b', 'back']:
-            try:
+            if len(Context.history) > 1:
                 Context.history.pop()
-                self.state['next_ctx'] = Context.history[-1]
-                self.state['next_ctx_args'] = {}
-            except IndexError:
+                previous: Frame = Context.history.pop()
+                self.state['next_ctx'] = previous.ctx
+                self.state['next_ctx_args'] = previous.args
+            else:
                 self.state['next_ctx'] = MainContext
                 self.state['next_ctx_args'] = {}
             return
         if cmd.lower() in ['?', 'h', 'help']:
             self.show_help()
-            self.state['next_ctx'] = Context.history[-1]
+            self.state['next_ctx'] = self
+            return
+        if cmd.lower() == 'cache':
+            self.show_cache()
+            self.state['next_ctx'] = self
             return
         if cmd.lower() == '\'':
             self.state['string_input'] = True
+        elif typed and cmd and not self.claims(cmd):
+            self.search(cmd)
+            return
         self.action_handler()
 
     def action_handler(self) -> None:
         pass
 
+    def claims(self, cmd: str) -> bool:
+        """
+        Whether a written command is handled by :meth:`action_handler`, others are searched.
+        """
+        return False
+
+    def search(self, query: str) -> None:
+        """
+        Opens the best match of ``query`` among the drivers, teams and seasons, listing the runner-ups.
+        """
+        from formulacli.async_fetch import fetch
+        from formulacli.search import get_index
+
+        matches: List[Any] = fetch(get_index, label="Indexing").search(query, limit=6)
+        if not matches:
+            Context.messages.append(Message(msg=f"Nothing matches {query!r}", type='error'))
+            return
+        best: Any = matches[0]
+        if best.kind == "driver":
+            from formulacli.drivers import fetch_drivers
+
+            drivers: Table = fetch(fetch_drivers, label="Loading drivers")
+            index: Optional[int] = get_roster(drivers).index_of(best.key)
+            if index is None:
+                Context.messages.append(Message(msg=f"{best.label} is no longer on the grid", type='error'))
+                return
+            self.state['next_ctx'] = DriverContext
+            self.state['next_ctx_args'] = {
+                'driver': drivers[index],
+                'driver_index': index,
+                'drivers': drivers
+            }
+        elif best.kind == "season":
+            self.state['next_ctx'] = ResultTableContext
+            self.state['next_ctx_args'] = {'table_for': 'drivers', 'year': best.key, 'table': None}
+        else:
+            self.state['next_ctx'] = CareerContext
+            self.state['next_ctx_args'] = {
+                'table_for': 'drivers' if best.kind == "driver results" else 'team',
+                'name': best.key
+            }
+        if len(matches) > 1:
+            others: str = ", ".join(match.label for match in matches[1:])
+            Context.messages.append(Message(msg=f"Also matching: {others}", type='debug'))
+
     def event(self) -> None:
         pass
 
+    @classmethod
+    def cache_key(cls, **args: Any) -> Hashable:
+        """
+        Identity of the context built from ``args``, unhashable args are told apart by id.
+        """
+        values: List[Any] = []
+        for name, value in sorted(args.items()):
+            try:
+                hash(value)
+            except TypeError:
+                value = id(value)
+            values.append((name, value))
+        return (cls.__name__, *values)
+
+    @staticmethod
+    def open(ctx_type: Type[Context], args: Dict[str, Any]) -> Context:
+        """
+        Cached context built from ``args``, or a new one when it was evicted or never built.
+        """
+        key: Hashable = ctx_type.cache_key(**args)
+        ctx: Optional[Context] = Context.cache.get(key)
+        if ctx is None:
+            ctx = ctx_type(**args)
+            ctx.frame = Frame(ctx=ctx_type, args=args, key=key)
+        else:
+            ctx.state['next_ctx'] = ctx
+            ctx.state['next_ctx_args'] = {}
+        ctx.add_to_history()
+        return ctx
+
     def add_to_history(self) -> None:
-        Context.history.append(self)
+        Context.history.append(self.frame)
+        del Context.history[:-MAX_HISTORY]
+
+    def add_to_cache(self) -> None:
+        """
+        Stores the context with its current size, to be called after every render.
+        """
+        Context.cache.put(self.frame.key, self, self.nbytes())
+
+    def nbytes(self) -> int:
+        """
+        Estimated size of the state, without the constructor args shared with other contexts.
+        """
+        return estimate_size(self.state, exclude=self.frame.args.values())
 
     def show_options(self) -> None:
         template = "[{opt}]  {label}"
@@ -112,17 +224,25 @@ class Context:
     def show_help(self) -> None:
         commands: List[Command] = []
         commands += [Command(cmd='\'', label="Write command")]
+        commands += [Command(cmd='\'QUERY', label="Search drivers, teams, numbers and seasons")]
         commands += self.state['custom_commands']
 
         if len(Context.history) > 1:
             commands.append(Command(cmd='b', label="Back"))
         commands += [
             Command(cmd='h', label="Show commands"),
+            Command(cmd='\'cache', label="Navigation cache usage"),
             Command(cmd='m', label="Menu"),
             Command(cmd='q', label="Quit")
         ]
-        commands_df = DataFrame(commands, columns=["Commands", "?"]).to_string(index=False)
-        Context.messages.append(Message(msg=commands_df, type='success'))
+        commands_table = Table(["Commands", "?"], commands).to_string(index=False)
+        Context.messages.append(Message(msg=commands_table, type='success'))
+
+    def show_cache(self) -> None:
+        stats: Dict[str, Any] = Context.cache.stats()
+        stats["history"] = f"{len(Context.history)}/{MAX_HISTORY}"
+        cache_table: str = Table(["Cache", ""], stats.items()).to_string(index=False)
+        Context.messages.append(Message(msg=cache_table, type='debug'))
 
     def get_commands(self) -> str:
         cmd: str = ''
@@ -141,6 +261,25 @@ class Context:
             Context.messages.append(Message(msg="Invalid Command", type='error'))
         return cmd
 
+    def wait_for(self, event: Event) -> str:
+        """
+        Waits for a key or for ``event``, returning no command once it is set so that the context redraws.
+        """
+        from formulacli.async_fetch import FRAME_INTERVAL, KeyReader
+
+        if self.state['string_input']:
+            return Context.get_commands(self)
+        with KeyReader() as keys:
+            if keys.fd is None and sys.platform != 'win32':
+                return Context.get_commands(self)
+            while True:
+                key: Optional[str] = keys.poll()
+                if key:
+                    return key
+                if event.wait(FRAME_INTERVAL):
+                    event.clear()
+                    return ''
+
     @property
     def banner(self):
         return str(BANNER) + "\n" + DESCRIPTION
@@ -190,10 +329,13 @@ class MainContext(Context):
             self.state['next_ctx'] = NewsListContext
             self.state['next_ctx_args'] = {}
 
+    def claims(self, cmd: str) -> bool:
+        return cmd.isdecimal() and 1 <= int(cmd) <= len(self.state['menu_options'])
+
 
 class ResultTableContext(Context):
     def __init__(self, table_for: str,
-                 table: Optional[DataFrame] = None,
+                 table: Optional[Table] = None,
                  year: Optional[int] = None,
                  title: str = "") -> None:
         super().__init__()
@@ -203,6 +345,7 @@ class ResultTableContext(Context):
             'next_ctx': self,
             'custom_commands': [
                 Command(cmd='y:YEAR', label="Change Season"),
+                Command(cmd='f[:SECONDS]', label="Follow live"),
             ],
             'for': table_for,
             'year': year if year else datetime.now().year,
@@ -229,13 +372,44 @@ class ResultTableContext(Context):
                 'table': None
             }
             Context.messages.append(Message(msg=f"Season changed to {year}", type='success'))
+        elif cmd.lower() == "f" or cmd.lower().startswith("f:"):
+            from formulacli.follow import FOLLOWED, MIN_INTERVAL, POLL_INTERVAL
+
+            if self.state['for'] not in FOLLOWED or self.state['year'] != datetime.now().year:
+                Context.messages.append(
+                    Message(msg="Only this season's races and drivers can be followed", type='error')
+                )
+                return
+            interval: float = POLL_INTERVAL
+            if ':' in cmd:
+                try:
+                    interval = float(cmd.split(':', 1)[1])
+                except ValueError:
+                    interval = float("nan")
+                if not isfinite(interval) or interval <= 0:
+                    Context.messages.append(Message(msg="Invalid interval, f:SECONDS", type='error'))
+                    return
+                if interval < MIN_INTERVAL:
+                    interval = MIN_INTERVAL
+                    Context.messages.append(Message(msg=f"Polling every {MIN_INTERVAL:g}s at most", type='debug'))
+            self.state['next_ctx'] = FollowContext
+            self.state['next_ctx_args'] = {
+                'table_for': self.state['for'],
+                'interval': interval,
+            }
+
+    def claims(self, cmd: str) -> bool:
+        return cmd.lower().startswith(("y:", "f:")) or cmd.lower() == "f"
 
     def _fetch_table(self) -> None:
+        from formulacli.async_fetch import fetch
+        from formulacli.results_store import fetch_season
+
         try:
-            table: DataFrame = fetch_results(self.state['for'], self.state['year'])
+            table: Table = fetch(fetch_season, self.state['for'], self.state['year'], label="Loading results")
         except ValueError:
             self.state['year'] = datetime.now().year
-            table = fetch_results(self.state['for'], self.state['year'])
+            table = fetch(fetch_season, self.state['for'], self.state['year'], label="Loading results")
             Context.messages.append(
                 Message(msg=f"Invalid Season. [1950-{self.state['year']}]", type="error")
             )
@@ -256,9 +430,90 @@ class ResultTableContext(Context):
         return f"{year} {titles[self.state['for']]}\n"
 
 
+class FollowContext(Context):
+    def __init__(self, table_for: str, interval: float) -> None:
+        from formulacli.async_fetch import fetch
+        from formulacli.follow import Follower
+
+        super().__init__()
+        follower: Follower = Follower(table_for, interval=interval)
+        fetch(follower.poll, label="Loading results")
+        self.state.update({
+            'name': f"Following {table_for.title()}",
+            'next_ctx': self,
+            'follower': follower,
+        })
+
+    def render(self) -> None:
+        try:
+            super().render()
+        finally:
+            if self.state['next_ctx'] is not self:
+                self.state['follower'].stop()
+
+    def event(self) -> None:
+        follower = self.state['follower']
+        follower.start()
+        self._pprint(f"{datetime.now().year} {follower.table_for.title()}  {Style.DIM}live{Style.RESET_ALL}\n", 35)
+        self._pprint(self.highlight(follower.delta), 10)
+        print()
+        checked: str = follower.checked_at.strftime("%H:%M:%S")
+        changed: str = follower.changed_at.strftime("%H:%M:%S")
+        status: str = f"checked {checked}, changed {changed}, every {follower.interval:g}s"
+        if follower.error is not None:
+            status += f"  {Fore.RED}{follower.error}{Style.RESET_ALL}"
+        self._pprint(Style.DIM + status + Style.RESET_ALL, 10)
+
+    def get_commands(self) -> str:
+        return self.wait_for(self.state['follower'].updated)
+
+    @staticmethod
+    def highlight(delta: Any) -> str:
+        """
+        The table with its new and changed rows highlighted, and the places gained or lost.
+        """
+        lines: List[str] = delta.table.to_string(index=False).split("\n")
+        for i in range(len(delta.table)):
+            line: str = lines[i + 1]
+            if i in delta.added:
+                line = Fore.LIGHTGREEN_EX + line + Style.RESET_ALL
+            elif i in delta.changed:
+                line = Style.BRIGHT + line + Style.RESET_ALL
+            places: int = delta.moved.get(i, 0)
+            if places > 0:
+                line += f"  {Fore.GREEN}+{places}{Style.RESET_ALL}"
+            elif places < 0:
+                line += f"  {Fore.RED}{places}{Style.RESET_ALL}"
+            lines[i + 1] = line
+        return "\n".join(lines)
+
+
+class CareerContext(Context):
+    """
+    Results of a driver or a team in every stored season.
+    """
+    def __init__(self, table_for: str, name: str) -> None:
+        from formulacli.async_fetch import fetch
+        from formulacli.results_store import get_store
+        from formulacli.search import NAME_COLUMNS
+
+        super().__init__()
+        self.state.update({
+            'name': name,
+            'next_ctx': self,
+            'table': fetch(get_store().career, table_for, NAME_COLUMNS[table_for], name, label="Loading results"),
+        })
+
+    def event(self) -> None:
+        table: Table = self.state['table']
+        self._pprint(f"{self.state['name']}, {len(table)} stored season(s)\n", 35)
+        self._pprint(table.to_string(index=False), 10)
+        print()
+
+
 class DriversContext(Context):
     def __init__(self,
-                 drivers: Optional[DataFrame] = None) -> None:
+                 drivers: Optional[Table] = None) -> None:
         super().__init__()
         self.state.update({
             'name': "Drivers",
@@ -270,13 +525,19 @@ class DriversContext(Context):
         })
 
     def event(self) -> None:
-        drivers: Optional[DataFrame] = self.state['drivers']
+        from formulacli.async_fetch import fetch
+        from formulacli.drivers import fetch_drivers
+        from formulacli.prefetch import get_prefetcher
+
+        drivers: Optional[Table] = self.state['drivers']
         if drivers is None:
-            drivers = fetch_drivers()
-            drivers.index += 1
+            drivers = fetch(fetch_drivers, label="Loading drivers")
             self.state["drivers"] = drivers
-        self._pprint("Drivers\n", 30)
-        self._pprint(drivers[["NAME", "NUMBER", "TEAM"]].to_string(), 10)
+            get_prefetcher().start(drivers)
+        done, queued = get_prefetcher().progress()
+        progress: str = f"  {Style.DIM}[loading {done}/{queued}]{Style.RESET_ALL}" if done < queued else ""
+        self._pprint("Drivers" + progress + "\n", 30)
+        self._pprint(drivers.select("NAME", "NUMBER", "TEAM").to_string(start=1), 10)
         print("\n")
 
     def action_handler(self) -> None:
@@ -284,8 +545,8 @@ class DriversContext(Context):
         if cmd and cmd.isdecimal():
             try:
                 index: int = int(cmd) - 1
-                drivers: DataFrame = self.state["drivers"]
-                driver: Series = drivers.iloc[index, :]
+                drivers: Table = self.state["drivers"]
+                driver: Record = drivers[index]
                 self.state['next_ctx'] = DriverContext
                 self.state['next_ctx_args'] = {
                     'driver': driver,
@@ -295,14 +556,16 @@ class DriversContext(Context):
             except IndexError:
                 Context.messages.append(Message(msg="Invalid Driver Index", type="error"))
 
+    def claims(self, cmd: str) -> bool:
+        drivers: Optional[Table] = self.state['drivers']
+        return cmd.isdecimal() and drivers is not None and 1 <= int(cmd) <= len(drivers)
 
-class DriverContext(Context):
-    drivers_history: Dict[int, Context] = {}
 
+class DriverContext(Context):
     def __init__(self,
-                 driver: Union[Series, Dict[str, str]],
+                 driver: Union[Record, Dict[str, str]],
                  driver_index: int,
-                 drivers: DataFrame) -> None:
+                 drivers: Table) -> None:
         super().__init__()
         self.state.update({
             'name': driver['NAME'],
@@ -317,46 +580,28 @@ class DriverContext(Context):
             'info': None,
             'index': driver_index,
             'drivers': drivers,
-            'max_drivers': len(drivers) - 1,
         })
-        DriverContext.drivers_history[driver_index] = self
-
-        header = Back.LIGHTWHITE_EX
-        driver_names = list(drivers['NAME'])
-        for name in driver_names:
-            if name == driver['NAME']:
-                header += Fore.RED
-                header += Back.WHITE
-                header += name.split(' ')[-1]
-                header += Back.LIGHTWHITE_EX
-                header += Fore.RESET
-            else:
-                header += Fore.LIGHTBLACK_EX
-                header += Style.DIM
-                header += name.split(' ')[-1]
-                header += Fore.RESET
-            header += "  "
+        self.header: str = get_roster(drivers).header(driver_index)
 
-        header += Back.RESET
-        self.header = header
-        self.reset = True  # needs fixing
+    @classmethod
+    def cache_key(cls, **args: Any) -> Hashable:
+        return cls.__name__, args['driver']['URL']
 
     def event(self) -> None:
+        from formulacli.async_fetch import fetch
+        from formulacli.prefetch import get_prefetcher
+
         self._pprint(self.header + "\n", margin=2)
 
         portrait: Optional[str] = self.state['portrait']
-        if portrait is None or self.reset:
-            portrait = convert_image(url=self.state['driver']['IMG'],
-                                     ratio=(0.45, 0.22),
-                                     crop_box=(105, 5, 215, 120)
-                                     )
-            self.reset = False
+        if portrait is None:
+            portrait = fetch(get_prefetcher().portrait, self.state['driver']['IMG'], label="Loading portrait")
             self.state['portrait'] = portrait
         self._pprint(portrait, 7)
 
         driver: Union[Dict[str, str]] = dict(self.state['driver'])
         driver_info: Optional[Dict[str, str]] = self.state['info']
-        driver_info = driver_info or fetch_driver(driver['URL'])
+        driver_info = driver_info or fetch(get_prefetcher().profile, driver['URL'], label="Loading profile")
         self.state['info'] = driver_info
         driver.update(driver_info)
 
@@ -375,62 +620,79 @@ class DriverContext(Context):
             self.state['next_ctx_args'] = {'text': self.state['info']['BIO']}
 
         elif cmd.lower() in ['d', 'a']:
-            drivers = self.state['drivers']
-            driver_idx = self.state['index']
-            next_idx = driver_idx + 1 if cmd.lower() == 'd' else driver_idx - 1
+            drivers: Table = self.state['drivers']
+            roster = get_roster(drivers)
+            next_idx: int = (roster.next if cmd.lower() == 'd' else roster.previous)[self.state['index']]
 
-            if next_idx > self.state['max_drivers']:
-                next_idx = 0
-            elif next_idx < 0:
-                next_idx = self.state['max_drivers']
+            # cycling replaces the driver in the history, back returns to the list
+            Context.history.pop()
+            self.state['next_ctx'] = DriverContext
+            self.state['next_ctx_args'] = {
+                'driver': drivers[next_idx],
+                'driver_index': next_idx,
+                'drivers': drivers
+            }
 
-            next_driver: Union[Type[DriverContext], Series] = \
-                DriverContext.drivers_history.get(next_idx, drivers.iloc[next_idx, :])
-
-            if isinstance(next_driver, DriverContext):
-                self.state['next_ctx'] = next_driver
-                self.state['next_ctx_args'] = {}
-            else:
-                self.state['next_ctx'] = DriverContext
-                self.state['next_ctx_args'] = {
-                    'driver': next_driver,
-                    'driver_index': next_idx,
-                    'drivers': drivers
-                }
+    def claims(self, cmd: str) -> bool:
+        return cmd.lower() in ['bio', 'd', 'a']
 
 
 class NewsListContext(Context):
-    def __init__(self, articles: Optional[DataFrame] = None) -> None:
+    def __init__(self, articles: Optional[Table] = None) -> None:
+        from formulacli.async_fetch import fetch
+        from formulacli.news import THUMBNAIL_COLUMNS, fetch_top_stories
+
         super().__init__()
         self.state.update({
             'name': 'News List',
             'custom_commands': [
                 Command(cmd='NUMBER', label="Select article"),
             ],
-            'articles': articles if articles else fetch_top_stories(img_size=9),
-            'headlines': []
+            'articles': articles if articles is not None else fetch(
+                fetch_top_stories, img_size=THUMBNAIL_COLUMNS, label="Loading news"
+            ),
+            'thumbnails': None
         })
 
+    def render(self) -> None:
+        try:
+            super().render()
+        finally:
+            if self.state['next_ctx'] is not self and self.state['thumbnails'] is not None:
+                self.state['thumbnails'].shutdown()
+
     def event(self) -> None:
-        # TODO
-        headlines = self.state['headlines']
-        if headlines:
-            for headline in headlines:
-                print(headline)
-        else:
-            stories: DataFrame = self.state['articles']
-            for i, story in stories.iterrows():
-                headline = self.article_headline(story, i + 1)
-                print(headline)
-                headlines.append(headline)
-        self.state['headlines'] = headlines
+        from formulacli.thumbnails import THUMBNAIL_ARGS, ThumbnailLoader
+
+        stories: Table = self.state['articles']
+        thumbnails = self.state['thumbnails']
+        if thumbnails is None:
+            thumbnails = self.state['thumbnails'] = ThumbnailLoader(stories.column('img'))
+        width, height = THUMBNAIL_ARGS['size']
+        for i, story in enumerate(stories):
+            thumbnail: Optional[str] = thumbnails.get(story['img'])
+            if thumbnail is None:
+                lines: List[str] = [Style.DIM + "." * width] * height
+            else:
+                lines = (thumbnail.split("\n") + [" " * width] * height)[:height]
+            lines[height // 2] += Style.RESET_ALL + "  " + self.article_headline(story, i + 1).rstrip("\n")
+            self._pprint("\n".join(line + Style.RESET_ALL for line in lines), 2)
+        done, queued = thumbnails.progress()
+        if done < queued:
+            self._pprint(f"{Style.DIM}[loading images {done}/{queued}]{Style.RESET_ALL}", 2)
+
+    def get_commands(self) -> str:
+        thumbnails = self.state['thumbnails']
+        if thumbnails is not None and thumbnails.pending:
+            return self.wait_for(thumbnails.updated)
+        return super().get_commands()
 
     def action_handler(self) -> None:
         try:
             index = int(self.state['command'])
-            articles: DataFrame = self.state['articles']
+            articles: Table = self.state['articles']
             try:
-                article: Series = articles.iloc[index - 1, :]
+                article: Record = articles[index - 1]
                 Context.messages.append(Message(msg=article.to_string(), type="debug"))
             except IndexError:
                 Context.messages.append(
@@ -440,8 +702,11 @@ class NewsListContext(Context):
             # other commands
             return
 
+    def claims(self, cmd: str) -> bool:
+        return cmd.isdecimal() and 1 <= int(cmd) <= len(self.state['articles'])
+
     @staticmethod
-    def article_headline(story: Series, index: Optional[int] = None) -> str:
+    def article_headline(story: Record, index: Optional[int] = None) -> str:
         headline: str = ""
         if 'main-story' in story.tags:
             headline += Style.BRIGHT
@@ -476,6 +741,10 @@ ContextType = Union[
     MainContext,
     Type[ResultTableContext],
     ResultTableContext,
+    Type[FollowContext],
+    FollowContext,
+    Type[CareerContext],
+    CareerContext,
     Type[DriversContext],
     DriversContext,
     Type[DriverContext],
@@ -1,29 +1,50 @@
-from typing import Dict, Any, Tuple, Iterator, List
+from re import compile
+from typing import Dict, Any, Tuple, Iterator, List, Pattern
 
-from bs4 import BeautifulSoup
-from pandas import DataFrame
+from bs4 import BeautifulSoup, SoupStrainer
 
-from formulacli.html_handlers import get_response, parse
+from formulacli.html_handlers import get_response, parse, class_pattern
+from formulacli.profiling import timed
+from formulacli.records import Table
 from formulacli.urls import BASE_URL, DRIVERS_URL
 
+# subtrees read by parse_drivers and parse_driver
+DRIVERS_STRAINER: SoupStrainer = SoupStrainer(class_=class_pattern("driver-index-teasers"))
+DRIVER_STRAINER: SoupStrainer = SoupStrainer(class_=class_pattern("stat-list", "biography"))
 
-def parse_drivers(soup: BeautifulSoup) -> DataFrame:
+# renditions are served as image.img.<width>.<quality>.jpg
+IMG_RENDITION: Pattern[str] = compile(r"(\.img\.\d+\.)(\w+)(\.)")
+IMG_QUALITY: str = "low"
+
+
+def image_variant(src: str, quality: str = IMG_QUALITY) -> str:
+    """
+    Smallest rendition of a portrait: the width is kept, the portrait crop box is measured in its pixels.
+    """
+    return IMG_RENDITION.sub(r"\g<1>" + quality + r"\g<3>", src, count=1)
+
+
+@timed()
+def parse_drivers(soup: BeautifulSoup) -> Table:
     drivers_div = soup.select(".driver-index-teasers a")
     drivers: List[Dict[str, str]] = []
 
     for driver_div in drivers_div:
+        # lxml closes the link before its fieldset, the card is read from the link's column
+        card = driver_div.parent
         driver: Dict[str, str] = {
-            "NAME": driver_div.find("h1", class_='driver-name').text.strip(),
-            "NUMBER": driver_div.find("div", class_='driver-number').text.strip(),
-            "TEAM": driver_div.find("p", class_='driver-team').text.strip(),
+            "NAME": card.find("h1", class_='driver-name').text.strip(),
+            "NUMBER": card.find("div", class_='driver-number').text.strip(),
+            "TEAM": card.find("p", class_='driver-team').text.strip(),
             "URL": BASE_URL + driver_div['href'],
-            "IMG": BASE_URL + driver_div.figure.img["src"].replace("medium", "low")
+            "IMG": BASE_URL + image_variant(card.figure.img["src"])
         }
 
         drivers.append(driver)
-    return DataFrame(drivers)
+    return Table.from_dicts(drivers, columns=["NAME", "NUMBER", "TEAM", "URL", "IMG"])
 
 
+@timed()
 def parse_driver(soup: BeautifulSoup) -> Dict[str, str]:
     info_table = soup.find('table', class_='stat-list').tbody
     zipped_info: Iterator[Tuple[Any, Any]] = zip(info_table.find_all("th"), info_table.find_all("td"))
@@ -40,18 +61,18 @@ def parse_driver(soup: BeautifulSoup) -> Dict[str, str]:
     return driver
 
 
-def fetch_drivers() -> DataFrame:
+def fetch_drivers() -> Table:
     url: str = DRIVERS_URL
 
     response: str = get_response(url)
-    soup: BeautifulSoup = parse(response)
+    soup: BeautifulSoup = parse(response, DRIVERS_STRAINER)
 
-    drivers: DataFrame = parse_drivers(soup)
+    drivers: Table = parse_drivers(soup)
     return drivers
 
 
 def fetch_driver(url: str) -> Dict[str, str]:
     response: str = get_response(url)
-    soup: BeautifulSoup = parse(response)
+    soup: BeautifulSoup = parse(response, DRIVER_STRAINER)
     driver: Dict[str, str] = parse_driver(soup)
     return driver
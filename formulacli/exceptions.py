@@ -1,2 +1,36 @@
 class ExitException(Exception):
     pass
+
+
+class FetchError(Exception):
+    """A page or image could not be fetched."""
+    pass
+
+
+class FetchTimeout(FetchError):
+    pass
+
+
+class HTTPStatusError(FetchError):
+    def __init__(self, url: str, status: int) -> None:
+        super().__init__(f"{url} answered {status}")
+        self.url: str = url
+        self.status: int = status
+
+
+class ResponseTooLarge(FetchError):
+    def __init__(self, url: str, limit: int) -> None:
+        super().__init__(f"{url} is larger than {limit} bytes")
+        self.url: str = url
+        self.limit: int = limit
+
+
+class CacheMissError(FetchError):
+    """Offline mode and the url was never cached."""
+    pass
+
+
+class FetchCancelled(FetchError):
+    """The user went back while the fetch was in flight."""
+    def __init__(self) -> None:
+        super().__init__("Cancelled")
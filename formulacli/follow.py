@@ -0,0 +1,152 @@
+"""
+    formulacli.follow
+    ~~~~~~~~~~~~~~~~~
+
+    Follows a results table of the current season: polls it with conditional
+    requests and diffs every new version against the previous one, row by row.
+
+"""
+from collections import namedtuple
+from datetime import datetime
+from hashlib import sha1
+from threading import Event, Thread
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from requests import Response
+
+from formulacli import result_tables
+from formulacli.exceptions import FetchError
+from formulacli.html_handlers import request
+from formulacli.records import Table
+
+POLL_INTERVAL: float = 30.0
+MIN_INTERVAL: float = 5.0
+FOLLOWED: Tuple[str, ...] = ("races", "drivers")
+
+# column identifying a row across versions of each table
+KEYS: Dict[str, str] = {
+    "races": "GRAND PRIX",
+    "drivers": "DRIVER",
+    "team": "TEAM",
+    "fastest-laps": "GRAND PRIX",
+}
+
+# table: the new version
+# added: indexes of the new rows
+# changed: index -> columns whose value changed
+# moved: index -> places gained since the previous version, negative when lost
+# removed: keys of the rows that are gone
+Delta = namedtuple("Delta", ["table", "added", "changed", "moved", "removed"])
+
+
+def diff_tables(old: Optional[Table], new: Table, key: Optional[str] = None) -> Delta:
+    """
+    Row level differences between two versions of a table.
+    :param key: column identifying rows, their position when missing
+    """
+    if old is None:
+        return Delta(new, set(), {}, {}, [])
+    new_key: Optional[int] = new.columns.index(key) if key in new.columns else None
+    old_key: Optional[int] = old.columns.index(key) if key in old.columns else None
+
+    previous: Dict[Any, Tuple[int, Dict[str, Any]]] = {
+        row[old_key] if old_key is not None else i: (i, dict(zip(old.columns, row)))
+        for i, row in enumerate(old.rows)
+    }
+    added: Set[int] = set()
+    changed: Dict[int, Tuple[str, ...]] = {}
+    moved: Dict[int, int] = {}
+    seen: Set[Any] = set()
+    for i, row in enumerate(new.rows):
+        row_key: Any = row[new_key] if new_key is not None else i
+        seen.add(row_key)
+        if row_key not in previous:
+            added.add(i)
+            continue
+        j, values = previous[row_key]
+        columns: Tuple[str, ...] = tuple(col for col, value in zip(new.columns, row) if values.get(col) != value)
+        if columns:
+            changed[i] = columns
+        if j != i:
+            moved[i] = j - i
+    removed: List[Any] = [row_key for row_key in previous if row_key not in seen]
+    return Delta(new, added, changed, moved, removed)
+
+
+class Follower:
+    """
+    Polls a results page in a background thread.
+    Memory and cost per poll stay flat: only the validators, a digest and the last version are kept,
+    unchanged pages are answered with a 304 or skipped before parsing.
+    """
+    def __init__(self, table_for: str, year: Optional[int] = None, interval: float = POLL_INTERVAL) -> None:
+        self.table_for: str = table_for
+        self.url: str = result_tables.RESULTS_URL.format(year=year or datetime.now().year, table=table_for)
+        self.interval: float = max(interval, MIN_INTERVAL)
+        self.headers: Dict[str, str] = {}
+        self.digest: Optional[str] = None
+        self.delta: Optional[Delta] = None
+        self.error: Optional[Exception] = None
+        self.checked_at: Optional[datetime] = None
+        self.changed_at: Optional[datetime] = None
+        self.stats: Dict[str, int] = {"polls": 0, "not modified": 0, "unchanged": 0, "changes": 0, "errors": 0}
+        self.updated: Event = Event()
+        self.stopped: Event = Event()
+        self.thread: Optional[Thread] = None
+
+    @property
+    def table(self) -> Optional[Table]:
+        return self.delta.table if self.delta is not None else None
+
+    def poll(self) -> Optional[Delta]:
+        """
+        Fetches the page when it changed upstream.
+        :return: differences with the previous version, ``None`` when nothing changed
+        :raises FetchError: the page could not be fetched
+        """
+        self.stats["polls"] += 1
+        response: Response = request(self.url, self.headers)
+        self.checked_at = datetime.now()
+        if response.status_code == 304:
+            self.stats["not modified"] += 1
+            return None
+        self.headers = {}
+        if response.headers.get("ETag"):
+            self.headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            self.headers["If-Modified-Since"] = response.headers["Last-Modified"]
+
+        digest: str = sha1(response.content).hexdigest()
+        if digest == self.digest:
+            self.stats["unchanged"] += 1
+            return None
+        response.encoding = "utf-8"
+        table: Table = result_tables.parse_results(response.text)
+        self.digest = digest
+        self.delta = diff_tables(self.table, table, KEYS.get(self.table_for))
+        self.changed_at = self.checked_at
+        self.stats["changes"] += 1
+        return self.delta
+
+    def start(self) -> None:
+        """
+        Polls every ``interval`` seconds until stopped, setting ``updated`` after every poll.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = Thread(target=self._run, daemon=True, name=f"follow {self.table_for}")
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def _run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.poll()
+                self.error = None
+            except (FetchError, ValueError) as e:
+                self.stats["errors"] += 1
+                self.error = e
+            self.updated.set()
@@ -1,20 +1,37 @@
 from time import perf_counter
-from os import system
+from os import environ, makedirs, path
 from sys import platform
+from typing import Optional
 
 
-def clear_screen() -> None:
-    if platform in ["linux", "linux2", "darwin"]:
-        system("clear")
-    elif platform == "win32":
-        system("cls")
-    else:
-        print("\n" * 50)
+def cache_dir(*parts: str) -> str:
+    """
+    Per-user cache directory, created on demand.
+    Honours ``FORMULACLI_CACHE_DIR`` and ``XDG_CACHE_HOME``.
+    :param parts: sub directories
+    """
+    root: str = environ.get("FORMULACLI_CACHE_DIR", "")
+    if not root:
+        if platform == "win32":
+            base: str = environ.get("LOCALAPPDATA", path.expanduser("~"))
+        elif platform == "darwin":
+            base = path.expanduser("~/Library/Caches")
+        else:
+            base = environ.get("XDG_CACHE_HOME", path.expanduser("~/.cache"))
+        root = path.join(base, "formulacli")
+    directory: str = path.join(root, *parts)
+    makedirs(directory, exist_ok=True)
+    return directory
 
 
 class Timer:
-    def __init__(self) -> None:
+    """
+    Times a block. Named timers are recorded by :mod:`formulacli.profiling`, anonymous ones print.
+    """
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name: Optional[str] = name
         self.t1: float = 0
+        self.elapsed: float = 0
 
     def __enter__(self):
         self.t1 = perf_counter()
@@ -22,5 +39,11 @@ class Timer:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.t2 = perf_counter()
+        self.elapsed = self.t2 - self.t1
 
-        print(f"... took {round((self.t2 - self.t1), 2)} second(s)")
+        if self.name is None:
+            print(f"... took {round(self.elapsed, 2)} second(s)")
+        else:
+            from formulacli.profiling import get_profiler
+
+            get_profiler().record(self.name, self.elapsed)
@@ -1,25 +1,205 @@
-import sys
-from typing import Union
+from re import compile, escape
+from time import perf_counter
+from typing import Union, Optional, Dict, List, Tuple, Pattern
 
-from bs4 import BeautifulSoup
-from requests import Response
-from requests import get
+from bs4 import BeautifulSoup, SoupStrainer
+from requests import Response, Session, Timeout, RequestException
+from requests.adapters import HTTPAdapter
 from urllib3 import HTTPResponse
+from urllib3.exceptions import TimeoutError as UrllibTimeoutError
+from urllib3.util import Retry, make_headers
 
+from formulacli.exceptions import FetchError, FetchTimeout, HTTPStatusError, ResponseTooLarge
+from formulacli.http_cache import HTTPCache
+from formulacli.profiling import count, timed
 
-def get_response(url: str, b: bool = False) -> Union[str, HTTPResponse]:
+try:
+    import lxml  # noqa: F401
+    PARSER: str = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+# (connect, read) seconds
+TIMEOUT: Tuple[float, float] = (3.05, 10)
+RETRIES: int = 3
+BACKOFF: float = 0.3
+POOL_SIZE: int = 10
+
+# images: largest body read, whole download seconds and read size
+MAX_IMAGE_BYTES: int = 2 * 1024 * 1024
+DOWNLOAD_TIMEOUT: float = 30.0
+CHUNK_SIZE: int = 64 * 1024
+
+_session: Optional[Session] = None
+_cache: Optional[HTTPCache] = None
+_requests: int = 0
+
+
+def configure_session(timeout: Optional[Tuple[float, float]] = None,
+                      retries: Optional[int] = None,
+                      backoff: Optional[float] = None,
+                      pool_size: Optional[int] = None) -> None:
+    """
+    Changes the session settings, the session is rebuilt on the next request.
+    :param timeout: (connect, read) seconds
+    :param retries: attempts after a failed connection or a 429/5xx answer
+    :param backoff: backoff factor between retries
+    :param pool_size: kept alive connections per host
+    """
+    global TIMEOUT, RETRIES, BACKOFF, POOL_SIZE, _session
+    TIMEOUT = timeout or TIMEOUT
+    RETRIES = RETRIES if retries is None else retries
+    BACKOFF = BACKOFF if backoff is None else backoff
+    POOL_SIZE = pool_size or POOL_SIZE
+    if _session is not None:
+        _session.close()
+    _session = None
+
+
+def retry_policy() -> Retry:
+    """
+    Retries of GET requests after a failed connection or a 429/5xx answer.
+    """
+    settings = dict(total=RETRIES, backoff_factor=BACKOFF, status_forcelist=(429, 500, 502, 503, 504))
+    try:
+        return Retry(allowed_methods=("GET",), **settings)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=("GET",), **settings)
+
+
+def get_session() -> Session:
+    """
+    Shared session: pooled keep-alive connections, retries with backoff and compressed transfers.
+    """
+    global _session
+    if _session is None:
+        retry: Retry = retry_policy()
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+        session: Session = Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # gzip and deflate, plus br/zstd when their decoders are installed
+        session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+        _session = session
+    return _session
+
+
+@timed()
+def request(url: str, headers: Optional[Dict[str, str]] = None, stream: bool = False) -> Response:
+    """
+    GET through the shared session.
+    :raises FetchTimeout: connecting or reading took longer than :data:`TIMEOUT`
+    :raises HTTPStatusError: the server answered an error status
+    :raises FetchError: any other failure
+    """
+    global _requests
+    _requests += 1
     try:
-        if b:
-            response: Response = get(url, stream=True)
-            return response.raw
-        else:
-            response = get(url)
-            response.encoding = "utf-8"
-            return response.text
-    except Exception as e:
-        print(e)
-        sys.exit()
-
-
-def parse(response: str) -> BeautifulSoup:
-    return BeautifulSoup(response, 'html.parser')
+        response: Response = get_session().get(url, headers=headers, stream=stream, timeout=TIMEOUT)
+    except Timeout as e:
+        raise FetchTimeout(f"{url} timed out") from e
+    except RequestException as e:
+        # timeouts that exhausted the retries surface as connection errors
+        if isinstance(getattr(e.args[0] if e.args else None, "reason", None), UrllibTimeoutError):
+            raise FetchTimeout(f"{url} timed out") from e
+        raise FetchError(f"Could not fetch {url}") from e
+    if response.status_code >= 400:
+        response.close()
+        raise HTTPStatusError(url, response.status_code)
+    return response
+
+
+def session_stats() -> Dict[str, int]:
+    """
+    Connection reuse of the shared session, for logging.
+    ``connections`` opened, ``requests`` sent over them and how many were ``reused``.
+    """
+    connections: int = 0
+    sent: int = 0
+    if _session is not None:
+        adapter: HTTPAdapter = _session.get_adapter("https://")
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools[key]
+            connections += pool.num_connections
+            sent += pool.num_requests
+    return {
+        "requests": _requests,
+        "connections": connections,
+        "reused": max(sent - connections, 0),
+    }
+
+
+def get_cache() -> HTTPCache:
+    """
+    Shared page cache, fetching through the shared session.
+    """
+    global _cache
+    if _cache is None:
+        _cache = HTTPCache()
+    return _cache
+
+
+@timed()
+def get_response(url: str, b: bool = False) -> Union[str, HTTPResponse]:
+    """
+    :param b: stream the raw bytes instead of the decoded (and cached) page
+    :raises FetchError: see :func:`request`
+    """
+    if b:
+        response: Response = request(url, stream=True)
+        response.raw.decode_content = True
+        return response.raw
+    return get_cache().get(url)
+
+
+@timed()
+def get_bytes(url: str, max_bytes: int = MAX_IMAGE_BYTES, timeout: float = DOWNLOAD_TIMEOUT) -> bytes:
+    """
+    Streams the body of ``url``, giving up as soon as it goes over budget.
+    :param max_bytes: largest accepted body, after content decoding
+    :param timeout: seconds for the whole download, :data:`TIMEOUT` still applies to every read
+    :raises ResponseTooLarge: the body is larger than ``max_bytes``
+    :raises FetchTimeout: the download took longer than ``timeout``
+    :raises FetchError: see :func:`request`
+    """
+    start: float = perf_counter()
+    response: Response = request(url, stream=True)
+    chunks: List[bytes] = []
+    size: int = 0
+    with response:
+        length: str = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) > max_bytes and not response.headers.get("Content-Encoding"):
+            raise ResponseTooLarge(url, max_bytes)
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(url, max_bytes)
+                if perf_counter() - start > timeout:
+                    raise FetchTimeout(f"{url} timed out")
+                chunks.append(chunk)
+        except RequestException as e:
+            if isinstance(e, Timeout) or isinstance(e.args[0] if e.args else None, UrllibTimeoutError):
+                raise FetchTimeout(f"{url} timed out") from e
+            raise FetchError(f"Could not fetch {url}") from e
+    count("image bytes", size)
+    return b"".join(chunks)
+
+
+def class_pattern(*names: str) -> Pattern[str]:
+    """
+    Matches a class attribute containing any of ``names``.
+    Strainers see the raw attribute while parsing, before it is split into classes.
+    """
+    return compile(r'(^|\s)(' + "|".join(escape(name) for name in names) + r')(\s|$)')
+
+
+@timed()
+def parse(response: str, only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    :param only: build just the subtrees matching it, with lxml when installed
+    """
+    if only is None:
+        return BeautifulSoup(response, 'html.parser')
+    return BeautifulSoup(response, PARSER, parse_only=only)
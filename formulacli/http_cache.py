@@ -0,0 +1,169 @@
+"""
+    formulacli.http_cache
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Persistent response cache for page requests.
+    Entries expire according to the class of their url and are revalidated
+    with conditional GETs (ETag / Last-Modified).
+
+"""
+import json
+from datetime import datetime
+from hashlib import sha1
+from os import path, remove, replace, environ
+from re import compile
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Dict, Any, Optional, Callable, Pattern
+
+from requests import Response, RequestException
+
+from formulacli.exceptions import CacheMissError, FetchError
+from formulacli.helpers import cache_dir
+from formulacli.urls import DRIVERS_URL, LATEST_NEWS_URL
+
+# seconds an entry is served without revalidation, ``None`` never expires
+CURRENT_SEASON_TTL: Optional[float] = 10 * 60
+NEWS_TTL: Optional[float] = 5 * 60
+DRIVERS_TTL: Optional[float] = 6 * 60 * 60
+DEFAULT_TTL: Optional[float] = 60 * 60
+
+RESULTS_PAT: Pattern[str] = compile(r'/results\.html/(\d{4})/')
+
+Fetcher = Callable[[str, Dict[str, str]], Response]
+
+
+def ttl_for(url: str) -> Optional[float]:
+    """
+    Time to live of a url: historic seasons never change, the current one and the news do.
+    """
+    results = RESULTS_PAT.search(url)
+    if results:
+        if int(results.group(1)) < datetime.now().year:
+            return None
+        return CURRENT_SEASON_TTL
+    if url.startswith(LATEST_NEWS_URL):
+        return NEWS_TTL
+    if url.startswith(DRIVERS_URL.replace(".html", "")):
+        return DRIVERS_TTL
+    return DEFAULT_TTL
+
+
+def fetch(url: str, headers: Dict[str, str]) -> Response:
+    """
+    GET through the shared session of :mod:`formulacli.html_handlers`, with its pool, retries and errors.
+    """
+    from formulacli.html_handlers import request
+
+    return request(url, headers)
+
+
+class HTTPCache:
+    """
+    Url keyed cache of decoded response bodies, one json file per url.
+    """
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 offline: Optional[bool] = None,
+                 fetcher: Fetcher = fetch,
+                 ttl: Callable[[str], Optional[float]] = ttl_for) -> None:
+        """
+        :param directory: defaults to the ``http`` user cache directory,
+            nothing is stored when it cannot be created
+        :param offline: never go to the network, serve stale entries.
+            Defaults to the ``FORMULACLI_OFFLINE`` environment variable.
+        :param fetcher: performs the request given the url and extra headers
+        :param ttl: time to live of a url
+        """
+        self.directory: Optional[str]
+        try:
+            self.directory = directory or cache_dir("http")
+        except OSError:
+            self.directory = None
+        if offline is None:
+            offline = environ.get("FORMULACLI_OFFLINE", "") not in ("", "0")
+        self.offline: bool = offline
+        self.fetcher: Fetcher = fetcher
+        self.ttl: Callable[[str], Optional[float]] = ttl
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "misses": 0, "stale": 0, "errors": 0}
+
+    def get(self, url: str) -> str:
+        """
+        Body of ``url``, from the cache when fresh or still valid upstream.
+        """
+        entry: Optional[Dict[str, Any]] = self.load(url)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            self.stats["stale" if self.offline and not self.is_fresh(entry) else "hits"] += 1
+            return entry["body"]
+        if self.offline:
+            raise CacheMissError(f"{url} is not cached")
+
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            response: Response = self.fetcher(url, headers)
+        except (RequestException, FetchError):
+            if entry is None:
+                raise
+            self.stats["stale"] += 1
+            return entry["body"]
+
+        if entry is not None and response.status_code == 304:
+            self.stats["revalidated"] += 1
+            entry["stored_at"] = time()
+            self.save(entry)
+            return entry["body"]
+
+        self.stats["misses"] += 1
+        response.encoding = "utf-8"
+        body: str = response.text
+        if response.status_code == 200:
+            self.save({
+                "url": url,
+                "body": body,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "stored_at": time(),
+            })
+        return body
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        ttl: Optional[float] = self.ttl(entry["url"])
+        return ttl is None or time() - entry["stored_at"] < ttl
+
+    def entry_path(self, url: str) -> str:
+        return path.join(self.directory, sha1(url.encode()).hexdigest() + ".json")
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self.entry_path(url), encoding="utf-8") as f:
+                entry: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def save(self, entry: Dict[str, Any]) -> None:
+        """
+        Stores ``entry``, the body is still served when the cache directory is unwritable or full.
+        """
+        if self.directory is None:
+            return
+        tmp_name: Optional[str] = None
+        try:
+            with NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+                tmp_name = tmp.name
+                json.dump(entry, tmp)
+            replace(tmp_name, self.entry_path(entry["url"]))
+        except OSError:
+            self.stats["errors"] += 1
+            if tmp_name is not None and path.exists(tmp_name):
+                try:
+                    remove(tmp_name)
+                except OSError:
+                    pass
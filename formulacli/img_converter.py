@@ -1,55 +1,30 @@
-from typing import Tuple, Dict, Optional, Union
+from typing import Tuple, Dict, Optional, Union, List, Iterable, Callable
 
-from math import sqrt
-from numpy import array
+from io import BytesIO
+from math import ceil, sqrt
+from os import path, remove, replace
+from tempfile import NamedTemporaryFile
+from time import perf_counter
+
+from numpy import (
+    arange, array, asarray, empty, flatnonzero, full_like, int32, load, maximum, meshgrid, ndarray, save,
+    stack, take_along_axis, uint8, where
+)
+from numpy.random import default_rng
 from PIL import Image
-from colorama import init, Back, Style, Fore
-from urllib3 import HTTPResponse
-
-from formulacli.html_handlers import get_response
-
-init(convert=True)
-
-BACK_BW_SCHEME: Dict[Tuple[int, int, int], str] = {
-    (0, 0, 0): Back.BLACK,
-    (61, 61, 61): Back.LIGHTBLACK_EX,
-    (210, 180, 140): Back.LIGHTWHITE_EX,
-    (255, 255, 0): Back.WHITE
-}
-
-BACK_COLOR_SCHEME: Dict[Tuple[int, int, int], str] = {
-    (0, 0, 255): Back.BLUE,
-    (0, 255, 255): Back.CYAN,
-    (0, 128, 0): Back.GREEN,
-    (65, 105, 225): Back.LIGHTBLUE_EX,
-    (46, 139, 87): Back.LIGHTCYAN_EX,
-    (186, 85, 211): Back.LIGHTGREEN_EX,
-    (220, 20, 60): Back.LIGHTMAGENTA_EX,
-    (189, 189, 189): Back.LIGHTRED_EX,
-    (218, 112, 214): Back.LIGHTYELLOW_EX,
-    (255, 0, 0): Back.MAGENTA,
-    (255, 255, 255): Back.RED,
-}
-FRONT_BW_SCHEME: Dict[Tuple[int, int, int], str] = {
-    (0, 0, 0): Fore.BLACK,
-    (61, 61, 61): Fore.LIGHTBLACK_EX,
-    (210, 180, 140): Fore.LIGHTWHITE_EX,
-    (255, 255, 0): Fore.WHITE
-}
-
-FRONT_COLOR_SCHEME: Dict[Tuple[int, int, int], str] = {
-    (0, 0, 255): Fore.BLUE,
-    (0, 255, 255): Fore.CYAN,
-    (0, 128, 0): Fore.GREEN,
-    (65, 105, 225): Fore.LIGHTBLUE_EX,
-    (46, 139, 87): Fore.LIGHTCYAN_EX,
-    (186, 85, 211): Fore.LIGHTGREEN_EX,
-    (220, 20, 60): Fore.LIGHTMAGENTA_EX,
-    (189, 189, 189): Fore.LIGHTRED_EX,
-    (218, 112, 214): Fore.LIGHTYELLOW_EX,
-    (255, 0, 0): Fore.MAGENTA,
-    (255, 255, 255): Fore.RED,
-}
+from colorama import Back, Style, Fore
+
+from formulacli.helpers import cache_dir
+from formulacli.html_handlers import get_bytes
+from formulacli.palettes import (  # noqa: F401 - the schemes used to live here
+    BACK_BW_SCHEME, BACK_COLOR_SCHEME, FRONT_BW_SCHEME, FRONT_COLOR_SCHEME, LUT_BITS, SCHEMES, scheme_for, scheme_key
+)
+from formulacli.profiling import count, timed
+
+# output encodings of :func:`paint_image`
+ENCODINGS: Tuple[str, ...] = ("cells", "rle", "truecolor")
+
+_luts: Dict[Tuple[str, int], ndarray] = {}
 
 
 def distance(c1, c2) -> float:
@@ -73,56 +48,283 @@ def color_to_ansi(px: Tuple[int, int, int], colors: Dict[Tuple[int, int, int], s
     return min_col + Style.BRIGHT
 
 
+def quantize(pixels: ndarray, colors: Dict[Tuple[int, int, int], str]) -> ndarray:
+    """
+    Maps every pixel to the index of its palette entry in a single batched pass.
+    Mirrors :func:`color_to_ansi`: the first entry closer than 10 wins, otherwise the
+    nearest entry closer than 256, otherwise ``len(colors)``.
+    :param pixels: (height, width, 3+) array of RGB values
+    :param colors: color scheme
+    :return: (height, width) array of palette indexes
+    """
+    if colors is None:
+        raise ValueError
+    palette: ndarray = asarray(list(colors), dtype=int32)
+    diff: ndarray = asarray(pixels, dtype=int32)[..., None, :3] - palette
+    squared: ndarray = (diff * diff).sum(axis=-1)
+
+    close: ndarray = squared < 10 ** 2
+    nearest: ndarray = squared.argmin(axis=-1)
+    in_range: ndarray = squared.min(axis=-1) < 256 ** 2
+    indexes: ndarray = where(in_range, nearest, len(palette))
+    return where(close.any(axis=-1), close.argmax(axis=-1), indexes)
+
+
+def build_lut(colors: Dict[Tuple[int, int, int], str], bits: int = LUT_BITS) -> ndarray:
+    """
+    Quantizes the center of every RGB bucket against ``colors``.
+    :return: (2**bits, 2**bits, 2**bits) array of palette indexes
+    """
+    step: int = 1 << (8 - bits)
+    centers: ndarray = arange(0, 256, step) + step // 2
+    lut: ndarray = empty((len(centers),) * 3, dtype=uint8)
+    green, blue = meshgrid(centers, centers, indexing="ij")
+    for i, red in enumerate(centers):
+        plane: ndarray = stack([full_like(green, red), green, blue], axis=-1)
+        lut[i] = quantize(plane, colors)
+    return lut
+
+
+def get_lut(colors: Dict[Tuple[int, int, int], str], bits: int = LUT_BITS) -> ndarray:
+    """
+    Lookup table for ``colors``, built lazily and persisted in the user cache directory.
+    A missing, corrupt or unwritable file only costs a rebuild in memory.
+    """
+    key: Tuple[str, int] = (scheme_key(colors), bits)
+    lut: Optional[ndarray] = _luts.get(key)
+    if lut is not None:
+        return lut
+
+    file_path: Optional[str] = None
+    try:
+        file_path = path.join(cache_dir("lut"), f"{key[0]}-{bits}.npy")
+        lut = load(file_path)
+        if lut.shape != (1 << bits,) * 3 or lut.dtype != uint8:
+            raise ValueError(file_path)
+    except (OSError, ValueError, EOFError):
+        lut = build_lut(colors, bits)
+        if file_path is not None:
+            save_lut(lut, file_path)
+    _luts[key] = lut
+    return lut
+
+
+def save_lut(lut: ndarray, file_path: str) -> None:
+    """
+    Atomically writes ``lut`` to ``file_path``, left to the next run when the cache is not writable.
+    """
+    tmp_name: Optional[str] = None
+    try:
+        with NamedTemporaryFile(dir=path.dirname(file_path), suffix=".npy", delete=False) as tmp:
+            tmp_name = tmp.name
+            save(tmp, lut)
+        replace(tmp_name, file_path)
+    except OSError:
+        if tmp_name is not None and path.exists(tmp_name):
+            try:
+                remove(tmp_name)
+            except OSError:
+                pass
+
+
+def lut_quantize(pixels: ndarray, colors: Dict[Tuple[int, int, int], str], bits: int = LUT_BITS) -> ndarray:
+    """
+    Same as :func:`quantize`, approximated by a single lookup table index operation.
+    Falls back to :func:`quantize` when no table can be had.
+    """
+    try:
+        lut: ndarray = get_lut(colors, bits)
+    except (OSError, ValueError, MemoryError):
+        return quantize(pixels, colors)
+    rgb: ndarray = asarray(pixels, dtype=uint8)[..., :3] >> (8 - bits)
+    return lut[rgb[..., 0], rgb[..., 1], rgb[..., 2]]
+
+
+def lut_accuracy(colors: Dict[Tuple[int, int, int], str], bits: int, samples: int = 1 << 18) -> float:
+    """
+    Share of random colors mapped to the same palette entry as the exact quantizer.
+    """
+    pixels: ndarray = default_rng(0).integers(0, 256, size=(samples, 1, 3), dtype=uint8)
+    rgb: ndarray = pixels >> (8 - bits)
+    approximated: ndarray = build_lut(colors, bits)[rgb[..., 0], rgb[..., 1], rgb[..., 2]]
+    return float((approximated == quantize(pixels, colors)).mean())
+
+
+def lut_accuracy_report(bits_range: Iterable[int] = range(3, 8)) -> str:
+    """
+    Accuracy, size and build time of the lookup tables of every scheme per bucket size.
+    """
+    lines: List[str] = [f"{'SCHEME':<12}{'BUCKETS':>12}{'ACCURACY':>10}{'SIZE':>12}{'BUILD':>10}"]
+    for name, colors in SCHEMES.items():
+        for bits in bits_range:
+            start: float = perf_counter()
+            lut: ndarray = build_lut(colors, bits)
+            elapsed: float = perf_counter() - start
+            side: int = 1 << bits
+            lines.append(
+                f"{name:<12}{f'{side}x{side}x{side}':>12}{lut_accuracy(colors, bits):>10.2%}"
+                f"{lut.nbytes:>12,}{elapsed * 1000:>8.0f}ms"
+            )
+    return "\n".join(lines)
+
+
+def target_size(source: Tuple[int, int],
+                ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
+                size: Optional[Tuple[int, int]] = None,
+                crop_box: Optional[Tuple[int, int, int, int]] = None) -> Tuple[int, int]:
+    """
+    Size :func:`convert_image` paints at, for an image of ``source`` size.
+    """
+    width, height = source if crop_box is None else (crop_box[2] - crop_box[0], crop_box[3] - crop_box[1])
+    if ratio and size:
+        return round(size[0] * ratio[0]), round(size[1] * ratio[1])
+    if size:
+        return size
+    if ratio:
+        return round(width * ratio[0]), round(height * ratio[1])
+    return width, height
+
+
+@timed()
+def decode_image(data: bytes,
+                 ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
+                 size: Optional[Tuple[int, int]] = None,
+                 crop_box: Optional[Tuple[int, int, int, int]] = None) -> Image:
+    """
+    Decodes, crops and resizes an image to the size it is painted at.
+    JPEGs are decoded at the smallest DCT scale (1/2, 1/4 or 1/8) still covering that size,
+    ``crop_box`` is in pixels of the full image and scaled along.
+    """
+    image: Image = Image.open(BytesIO(data))
+    full: Tuple[int, int] = image.size
+    region: Tuple[int, int] = full if crop_box is None else (crop_box[2] - crop_box[0], crop_box[3] - crop_box[1])
+    target: Tuple[int, int] = target_size(full, ratio, size, crop_box)
+    image.draft("RGB", (max(ceil(full[0] * target[0] / max(region[0], 1)), 1),
+                        max(ceil(full[1] * target[1] / max(region[1], 1)), 1)))
+    count("image decoded bytes", image.size[0] * image.size[1] * len(image.getbands()))
+    if crop_box is not None:
+        scale: Tuple[float, float] = (image.size[0] / full[0], image.size[1] / full[1])
+        image = image.crop((round(crop_box[0] * scale[0]), round(crop_box[1] * scale[1]),
+                            round(crop_box[2] * scale[0]), round(crop_box[3] * scale[1])))
+    return image if image.size == target else image.resize(target)
+
+
+@timed()
 def convert_image(
         url: str,
         brush: Optional[str] = None,
         colored: bool = False,
         ratio: Tuple[Union[float, int], Union[float, int]] = (1, 1),
         size: Optional[Tuple[int, int]] = None,
-        crop_box: Optional[Tuple[int, int, int, int]] = None) -> str:
-    im_bytes: HTTPResponse = get_response(url, b=True)
-    image: Image = Image.open(im_bytes)
-    if crop_box is not None:
-        image = image.crop(crop_box)
+        crop_box: Optional[Tuple[int, int, int, int]] = None,
+        lut_bits: Optional[int] = None,
+        encoding: str = "cells") -> str:
+    """
+    Downloads, at most :data:`~formulacli.html_handlers.MAX_IMAGE_BYTES`, and paints an image.
+    :raises FetchError: see :func:`~formulacli.html_handlers.get_bytes`
+    """
+    image: Image = decode_image(get_bytes(url), ratio, size, crop_box)
+    return paint_image(image, colored=colored, brush=brush, lut_bits=lut_bits, encoding=encoding)
 
-    if ratio and size:
-        image = image.resize((
-            round(size[0] * ratio[0]),
-            round(size[1] * ratio[1])
-        ))
-    elif size:
-        image = image.resize(size)
-    elif ratio:
-        image = image.resize((round(image.size[0] * ratio[0]), round(image.size[1] * ratio[1])))
 
-    return paint_image(image, colored=colored, brush=brush)
+def encode_cells(indexes: ndarray, colors: Dict[Tuple[int, int, int], str], brush: str) -> List[str]:
+    """
+    One escape code plus ``Style.BRIGHT`` before every cell.
+    """
+    cells: List[str] = [color + Style.BRIGHT + brush for color in colors.values()]
+    cells.append(Style.BRIGHT + brush)  # no palette entry within range
+    return ["".join([cells[i] for i in row]) for row in indexes.tolist()]
+
+
+def encode_runs(keys: ndarray, code_for: Callable[[int], str], brush: str, prefix: str = "") -> List[str]:
+    """
+    Emits an escape code only where ``keys`` changes within a row.
+    :param keys: (height, width) array of colour keys
+    :param code_for: escape code of a key
+    :param prefix: written once at the start of every row
+    """
+    rows: List[str] = []
+    width: int = keys.shape[1]
+    for row in keys:
+        bounds: List[int] = [0, *(flatnonzero(row[1:] != row[:-1]) + 1).tolist(), width]
+        runs: List[str] = [code_for(int(row[start])) + brush * (end - start)
+                           for start, end in zip(bounds, bounds[1:])]
+        rows.append(prefix + "".join(runs))
+    return rows
+
 
+def encode_palette_runs(indexes: ndarray, colors: Dict[Tuple[int, int, int], str], brush: str) -> List[str]:
+    """
+    Run-length version of :func:`encode_cells`, rendering the same picture.
+    Cells without a palette entry only re-emit ``Style.BRIGHT`` there, so they keep
+    the colour of the cell before them and are merged into its run.
+    """
+    missing: ndarray = indexes == len(colors)
+    last_found: ndarray = maximum.accumulate(where(missing, -1, arange(indexes.shape[1])), axis=1)
+    filled: ndarray = where(last_found < 0, len(colors),
+                            take_along_axis(indexes, last_found.clip(0), axis=1))
+    codes: List[str] = [*colors.values(), ""]
+    return encode_runs(filled, codes.__getitem__, brush, prefix=Style.BRIGHT)
 
+
+def encode_truecolor(pixels: ndarray, brush: str, background: bool = True) -> List[str]:
+    """
+    Run-length encoded 24-bit colour escape codes of the pixels themselves.
+    """
+    rgb: ndarray = asarray(pixels, dtype=int32)[..., :3]
+    keys: ndarray = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+    layer: int = 48 if background else 38
+
+    def code_for(key: int) -> str:
+        return f"\x1b[{layer};2;{key >> 16};{(key >> 8) & 0xFF};{key & 0xFF}m"
+
+    return encode_runs(keys, code_for, brush)
+
+
+def index_image(im: Image,
+                color_scheme: Dict[Tuple[int, int, int], str],
+                lut_bits: Optional[int] = None) -> ndarray:
+    """
+    Palette index of every pixel, ``len(color_scheme)`` where no entry is in range.
+    :param lut_bits: quantize through a ``lut_bits`` lookup table instead of exact distances
+    """
+    pixels: ndarray = array(im)
+    if lut_bits:
+        return lut_quantize(pixels, color_scheme, lut_bits)
+    return quantize(pixels, color_scheme)
+
+
+@timed()
 def paint_image(im: Image,
                 color_scheme: Optional[Dict[Tuple[int, int, int], str]] = None,
                 colored: bool = False,
                 brush: Optional[str] = None,
+                lut_bits: Optional[int] = None,
+                encoding: str = "cells",
                 ) -> str:
+    """
+    Paints an image with ANSI escape codes.
+    :param lut_bits: quantize through a ``lut_bits`` lookup table instead of exact distances
+    :param encoding: one of :data:`ENCODINGS`
+        ``cells`` writes an escape code for every cell,
+        ``rle`` only where the colour changes within a row,
+        ``truecolor`` run-length encodes the 24-bit pixel colours instead of the scheme.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}")
+    background: bool = brush is None
+    color_scheme = scheme_for(brush, colored)
     if brush is None:
         brush = " "
-        if colored:
-            color_scheme = BACK_COLOR_SCHEME
-        else:
-            color_scheme = BACK_BW_SCHEME
+
+    if encoding == "truecolor":
+        rows: List[str] = encode_truecolor(array(im), brush, background)
     else:
-        if colored:
-            color_scheme = FRONT_COLOR_SCHEME
+        indexes: ndarray = index_image(im, color_scheme, lut_bits)
+        if encoding == "rle":
+            rows = encode_palette_runs(indexes, color_scheme, brush)
         else:
-            color_scheme = FRONT_BW_SCHEME
-
-    initial_pixels: array = array(im)
-    picture: str = ""
-    for i, row in enumerate(initial_pixels):
-        for j, px in enumerate(row):
-            picture += color_to_ansi(px, color_scheme)
-            picture += brush
-        picture += "\n"
-    picture += Back.RESET
-    picture += Fore.RESET
-    picture += Style.RESET_ALL
-    return picture
+            rows = encode_cells(indexes, color_scheme, brush)
+
+    rows.append(Back.RESET + Fore.RESET + Style.RESET_ALL)
+    return "\n".join(rows)
@@ -0,0 +1,113 @@
+"""
+    formulacli.nav_cache
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Bounded LRU cache of visited contexts. Entries are evicted by count and by
+    estimated size, evicted contexts are rebuilt from their constructor args.
+
+"""
+import sys
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from formulacli.records import Table
+
+MAX_ENTRIES: int = 32
+MAX_BYTES: int = 4 * 1024 * 1024
+
+
+def estimate_size(obj: Any, exclude: Iterable[Any] = ()) -> int:
+    """
+    Approximate bytes held by ``obj``, following containers and tables.
+    Other objects only count their own size.
+    :param exclude: objects shared with others, not counted
+    """
+    seen: Set[int] = {id(excluded) for excluded in exclude}
+    size: int = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes)):
+            continue
+        if isinstance(item, Mapping):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif isinstance(item, Table):
+            stack.append(item.columns)
+            stack.append(item.rows)
+    return size
+
+
+class NavigationCache:
+    """
+    Least recently used entries go first once there are more than ``max_entries``
+    or they add up to more than ``max_bytes``.
+    The entry stored last is always kept.
+    """
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> None:
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self.nbytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry: Optional[Tuple[Any, int]] = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        """
+        Stores ``value`` as the most recently used entry, replacing the one under ``key``.
+        :param nbytes: estimated size of ``value``
+        """
+        self.discard(key)
+        self.entries[key] = (value, nbytes)
+        self.nbytes += nbytes
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        entry: Optional[Tuple[Any, int]] = self.entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": f"{len(self.entries)}/{self.max_entries}",
+            "size": f"{self.nbytes / 1024:.1f}/{self.max_bytes / 1024:.0f} KiB",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit rate": f"{self.hit_rate:.0%}",
+            "evictions": self.evictions,
+        }
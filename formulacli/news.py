@@ -1,13 +1,21 @@
 from re import compile
 from typing import Dict, Pattern, Union, List
 
-from bs4 import BeautifulSoup
-from pandas import DataFrame
+from bs4 import BeautifulSoup, SoupStrainer
 
 from formulacli.html_handlers import get_response, parse
+from formulacli.profiling import timed
+from formulacli.records import Table
 from formulacli.urls import BASE_URL, LATEST_NEWS_URL
 
+# subtrees read by parse_top_stories
+NEWS_STRAINER: SoupStrainer = SoupStrainer("div", {"class": "col-lg-6 col-md-12"})
 
+# narrowest transform of the article images, enough for thumbnails
+THUMBNAIL_COLUMNS: int = 1
+
+
+@timed()
 def parse_top_stories(soup: BeautifulSoup, img_size: int = 1) -> List[Dict[str, Union[str, List[str]]]]:
     article_html = soup.find_all("div", {"class": "col-lg-6 col-md-12"})
 
@@ -47,8 +55,8 @@ def parse_top_stories(soup: BeautifulSoup, img_size: int = 1) -> List[Dict[str,
     return articles
 
 
-def fetch_top_stories(img_size: int = 1) -> DataFrame:
+def fetch_top_stories(img_size: int = 1) -> Table:
     resp: str = get_response(LATEST_NEWS_URL)
-    soup: BeautifulSoup = parse(resp)
+    soup: BeautifulSoup = parse(resp, NEWS_STRAINER)
     top_stories: List[Dict[str, Union[str, List[str]]]] = parse_top_stories(soup, img_size=img_size)
-    return DataFrame(top_stories)
+    return Table.from_dicts(top_stories, columns=["headline", "tags", "url", "img"])
@@ -0,0 +1,79 @@
+"""
+    formulacli.palettes
+    ~~~~~~~~~~~~~~~~~~~
+
+    Colour schemes the images are painted with, kept apart from the painters
+    so that painted pictures can be read back without numpy or PIL.
+
+"""
+from hashlib import sha1
+from typing import Dict, Optional, Tuple
+
+from colorama import Back, Fore
+
+BACK_BW_SCHEME: Dict[Tuple[int, int, int], str] = {
+    (0, 0, 0): Back.BLACK,
+    (61, 61, 61): Back.LIGHTBLACK_EX,
+    (210, 180, 140): Back.LIGHTWHITE_EX,
+    (255, 255, 0): Back.WHITE
+}
+
+BACK_COLOR_SCHEME: Dict[Tuple[int, int, int], str] = {
+    (0, 0, 255): Back.BLUE,
+    (0, 255, 255): Back.CYAN,
+    (0, 128, 0): Back.GREEN,
+    (65, 105, 225): Back.LIGHTBLUE_EX,
+    (46, 139, 87): Back.LIGHTCYAN_EX,
+    (186, 85, 211): Back.LIGHTGREEN_EX,
+    (220, 20, 60): Back.LIGHTMAGENTA_EX,
+    (189, 189, 189): Back.LIGHTRED_EX,
+    (218, 112, 214): Back.LIGHTYELLOW_EX,
+    (255, 0, 0): Back.MAGENTA,
+    (255, 255, 255): Back.RED,
+}
+FRONT_BW_SCHEME: Dict[Tuple[int, int, int], str] = {
+    (0, 0, 0): Fore.BLACK,
+    (61, 61, 61): Fore.LIGHTBLACK_EX,
+    (210, 180, 140): Fore.LIGHTWHITE_EX,
+    (255, 255, 0): Fore.WHITE
+}
+
+FRONT_COLOR_SCHEME: Dict[Tuple[int, int, int], str] = {
+    (0, 0, 255): Fore.BLUE,
+    (0, 255, 255): Fore.CYAN,
+    (0, 128, 0): Fore.GREEN,
+    (65, 105, 225): Fore.LIGHTBLUE_EX,
+    (46, 139, 87): Fore.LIGHTCYAN_EX,
+    (186, 85, 211): Fore.LIGHTGREEN_EX,
+    (220, 20, 60): Fore.LIGHTMAGENTA_EX,
+    (189, 189, 189): Fore.LIGHTRED_EX,
+    (218, 112, 214): Fore.LIGHTYELLOW_EX,
+    (255, 0, 0): Fore.MAGENTA,
+    (255, 255, 255): Fore.RED,
+}
+
+SCHEMES: Dict[str, Dict[Tuple[int, int, int], str]] = {
+    "back-bw": BACK_BW_SCHEME,
+    "back-color": BACK_COLOR_SCHEME,
+    "front-bw": FRONT_BW_SCHEME,
+    "front-color": FRONT_COLOR_SCHEME,
+}
+
+# bits kept per channel by the colour lookup tables (5 -> 32x32x32 buckets)
+LUT_BITS: int = 5
+
+
+def scheme_for(brush: Optional[str], colored: bool) -> Dict[Tuple[int, int, int], str]:
+    """
+    Scheme painting with ``brush``: background colours when there is none.
+    """
+    if brush is None:
+        return BACK_COLOR_SCHEME if colored else BACK_BW_SCHEME
+    return FRONT_COLOR_SCHEME if colored else FRONT_BW_SCHEME
+
+
+def scheme_key(colors: Dict[Tuple[int, int, int], str]) -> str:
+    """
+    Identity of a color scheme: changes whenever an entry, its code or the order changes.
+    """
+    return sha1(repr(list(colors.items())).encode()).hexdigest()[:16]
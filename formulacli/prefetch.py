@@ -0,0 +1,115 @@
+"""
+    formulacli.prefetch
+    ~~~~~~~~~~~~~~~~~~~
+
+    Background prefetching of driver profiles and portraits, so that
+    cycling through drivers does not wait for the network.
+
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Dict, Any, Tuple, Optional, Callable
+
+from formulacli.atlas import get_atlas
+from formulacli.drivers import fetch_driver
+from formulacli.exceptions import FetchError
+from formulacli.palettes import LUT_BITS
+from formulacli.records import Table
+
+MAX_WORKERS: int = 4
+
+# convert_image arguments of the DriverContext portraits
+PORTRAIT_ARGS: Dict[str, Any] = {
+    "ratio": (0.45, 0.22),
+    "crop_box": (105, 5, 215, 120),
+    "lut_bits": LUT_BITS,
+    "encoding": "rle",
+}
+
+
+def render_portrait(url: str) -> str:
+    """
+    Portraits painted once are drawn from the atlas, without numpy or PIL.
+    """
+    return get_atlas().portrait(url, **PORTRAIT_ARGS)
+
+
+class DriverPrefetcher:
+    """
+    Shared cache of driver profiles and portraits, filled by a bounded thread pool.
+    """
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self.max_workers: int = max_workers
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.futures: Dict[Tuple[str, str], Future] = {}
+        self.lock: Lock = Lock()
+
+    def start(self, drivers: Table) -> None:
+        """
+        Queues the profile and portrait of every driver of the roster, in roster order.
+        """
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="prefetch")
+            for driver in drivers:
+                self._submit(("profile", driver["URL"]), fetch_driver, driver["URL"])
+                self._submit(("portrait", driver["IMG"]), render_portrait, driver["IMG"])
+
+    def profile(self, url: str) -> Dict[str, str]:
+        return self._get(("profile", url), fetch_driver, url)
+
+    def portrait(self, url: str) -> str:
+        return self._get(("portrait", url), render_portrait, url)
+
+    def progress(self) -> Tuple[int, int]:
+        """
+        (finished, queued) prefetch tasks.
+        """
+        futures = list(self.futures.values())
+        return sum(future.done() for future in futures), len(futures)
+
+    def shutdown(self) -> None:
+        """
+        Cancels queued tasks, running ones finish in the background.
+        """
+        with self.lock:
+            if self.executor is not None:
+                # cancel_futures needs Python 3.9
+                for future in self.futures.values():
+                    future.cancel()
+                self.executor.shutdown(wait=False)
+                self.executor = None
+
+    def _submit(self, key: Tuple[str, str], fn: Callable[[str], Any], arg: str) -> None:
+        if key not in self.futures:
+            self.futures[key] = self.executor.submit(fn, arg)
+
+    def _get(self, key: Tuple[str, str], fn: Callable[[str], Any], arg: str) -> Any:
+        """
+        Prefetched result, waiting for it when in flight.
+        Failed or cancelled tasks are retried in the foreground so their errors surface.
+        """
+        future: Optional[Future] = self.futures.get(key)
+        if future is not None and not future.cancelled():
+            try:
+                return future.result()
+            except FetchError:
+                pass
+        result: Any = fn(arg)
+        done: Future = Future()
+        done.set_result(result)
+        with self.lock:
+            self.futures[key] = done
+        return result
+
+
+_prefetcher: DriverPrefetcher = DriverPrefetcher()
+
+
+def get_prefetcher() -> DriverPrefetcher:
+    return _prefetcher
+
+
+def shutdown() -> None:
+    _prefetcher.shutdown()
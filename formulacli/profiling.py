@@ -0,0 +1,214 @@
+"""
+    formulacli.profiling
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Opt-in instrumentation: call counters and latency histograms of the fetch,
+    parse and render paths, summarised when the session closes. Optionally a
+    cProfile of the whole session is saved as a pstats file.
+
+    $ FORMULACLI_PROFILE=1 python formula_run.py
+    $ python formula_run.py --profile cprofile
+
+"""
+import sys
+from bisect import bisect_left
+from functools import wraps
+from os import environ, path
+from threading import Lock
+from time import perf_counter, strftime
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, TypeVar
+
+MODES: Tuple[str, ...] = ("summary", "cprofile")
+
+# upper bounds of the histogram buckets, in milliseconds
+BUCKETS: Tuple[float, ...] = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def mode_from_env() -> Optional[str]:
+    """
+    ``FORMULACLI_PROFILE``: unset or ``0`` disables, ``cprofile`` profiles, anything else summarises.
+    """
+    value: str = environ.get("FORMULACLI_PROFILE", "")
+    if value in ("", "0"):
+        return None
+    return "cprofile" if value == "cprofile" else "summary"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect_left(BUCKETS, ms)] += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts)
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding the ``fraction`` percentile, ``max`` for the last one.
+        """
+        rank: float = fraction * self.calls
+        seen: int = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Profiler:
+    """
+    Thread safe counters and histograms, plus the cProfile of the session in ``cprofile`` mode.
+    """
+    def __init__(self) -> None:
+        self.mode: Optional[str] = None
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.lock: Lock = Lock()
+        self.started: float = perf_counter()
+        self.cprofile: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def enable(self, mode: str = "summary") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self.started = perf_counter()
+        if mode == "cprofile" and self.cprofile is None:
+            import cProfile
+
+            # only sees the main thread, fetch workers show up in the histograms
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def count(self, name: str, n: int = 1) -> None:
+        if self.mode is None:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float) -> None:
+        if self.mode is None:
+            return
+        with self.lock:
+            histogram: Optional[Histogram] = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds * 1000)
+
+    def summary(self) -> str:
+        from formulacli.records import Table
+
+        rows: List[List[Any]] = []
+        for name, histogram in sorted(self.histograms.items(), key=lambda item: -item[1].total):
+            rows.append([name, histogram.calls, f"{histogram.total:.1f}", f"{histogram.total / histogram.calls:.2f}",
+                         f"{histogram.percentile(0.5):.1f}", f"{histogram.percentile(0.95):.1f}",
+                         f"{histogram.max:.1f}"])
+        lines: List[str] = [f"session {perf_counter() - self.started:.1f}s"]
+        columns: List[str] = ["TIMED", "CALLS", "TOTAL MS", "MEAN", "P50<=", "P95<=", "MAX"]
+        lines.append(Table(columns, rows).to_string(index=False))
+        if self.counters:
+            lines.append(Table(["COUNTER", "VALUE"], sorted(self.counters.items())).to_string(index=False))
+        return "\n\n".join(lines)
+
+    def close(self, out: Optional[TextIO] = None, directory: Optional[str] = None) -> Optional[str]:
+        """
+        Writes the summary, and the pstats file in ``cprofile`` mode, then disables profiling.
+        :param out: defaults to stderr
+        :param directory: of the pstats file, defaults to the ``profile`` user cache directory
+        :return: path of the pstats file
+        """
+        if self.mode is None:
+            return None
+        out = out or sys.stderr
+        stats_path: Optional[str] = None
+        if self.cprofile is not None:
+            from formulacli.helpers import cache_dir
+
+            self.cprofile.disable()
+            stats_path = path.join(directory or cache_dir("profile"), strftime("session-%Y%m%d-%H%M%S.pstats"))
+            self.cprofile.dump_stats(stats_path)
+            self.cprofile = None
+        print(self.summary(), file=out)
+        if stats_path:
+            print(f"\ncProfile stats: {stats_path}  (python -m pstats {stats_path})", file=out)
+        self.mode = None
+        return stats_path
+
+
+_profiler: Profiler = Profiler()
+if mode_from_env():
+    _profiler.enable(mode_from_env())
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def enable(mode: str = "summary") -> None:
+    _profiler.enable(mode)
+
+
+def enable_from_argv(argv: List[str]) -> List[str]:
+    """
+    Enables profiling for ``--profile [summary|cprofile]``, returns the other arguments.
+    Must run before the instrumented modules are imported.
+    """
+    rest: List[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--profile":
+            following: Optional[str] = next(args, None)
+            if following in MODES:
+                enable(following)
+            else:
+                enable()
+                if following is not None:
+                    rest.append(following)
+        elif arg.startswith("--profile="):
+            enable(arg.split("=", 1)[1])
+        else:
+            rest.append(arg)
+    return rest
+
+
+def count(name: str, n: int = 1) -> None:
+    _profiler.count(name, n)
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """
+    Records the latency of every call under ``name`` (the qualified name of the function by default).
+    Functions decorated while profiling is disabled are returned untouched.
+    """
+    def decorator(fn: F) -> F:
+        if not _profiler.enabled:
+            return fn
+        label: str = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start: float = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _profiler.record(label, perf_counter() - start)
+        return wrapper  # type: ignore
+    return decorator
+
+
+def close(out: Optional[TextIO] = None) -> Optional[str]:
+    return _profiler.close(out)
@@ -0,0 +1,122 @@
+"""
+    formulacli.records
+    ~~~~~~~~~~~~~~~~~~
+
+    Compact row model for scraped data: a table is a tuple of column names
+    and a list of value tuples, rows are exposed as slotted records.
+
+"""
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Iterable, TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover - pandas is optional
+    from pandas import DataFrame
+
+
+class Record(Mapping):
+    """
+    Read only view of a table row, by column name (``record['NAME']``) or attribute (``record.tags``).
+    """
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: Dict[str, int], values: Tuple[Any, ...]) -> None:
+        self._index: Dict[str, int] = index
+        self._values: Tuple[Any, ...] = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"Record({dict(self)!r})"
+
+    def to_string(self) -> str:
+        """
+        One ``column  value`` line per column.
+        """
+        width: int = max((len(col) for col in self._index), default=0)
+        return "\n".join(f"{col:<{width}}    {value}" for col, value in self.items())
+
+
+class Table:
+    """
+    Rows of values sharing the same columns.
+    """
+    __slots__ = ("columns", "rows", "_index")
+
+    def __init__(self, columns: Sequence[str], rows: Iterable[Sequence[Any]] = ()) -> None:
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.rows: List[Tuple[Any, ...]] = [tuple(row) for row in rows]
+        self._index: Dict[str, int] = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    def from_dicts(cls, dicts: Sequence[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> "Table":
+        """
+        :param columns: defaults to the keys of the first dict
+        """
+        if columns is None:
+            columns = list(dicts[0]) if dicts else []
+        return cls(columns, [[d.get(col) for col in columns] for d in dicts])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[Record]:
+        return (Record(self._index, row) for row in self.rows)
+
+    def __getitem__(self, position: int) -> Record:
+        return Record(self._index, self.rows[position])
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Table) and self.columns == other.columns and self.rows == other.rows
+
+    def __repr__(self) -> str:
+        return f"Table({list(self.columns)!r}, {len(self.rows)} rows)"
+
+    def column(self, name: str) -> List[Any]:
+        i: int = self._index[name]
+        return [row[i] for row in self.rows]
+
+    def select(self, *columns: str) -> "Table":
+        indexes: List[int] = [self._index[col] for col in columns]
+        return Table(columns, [[row[i] for i in indexes] for row in self.rows])
+
+    def to_string(self, index: bool = True, start: int = 0) -> str:
+        """
+        Fixed width text table, values right aligned under their header.
+        :param index: prefix every row with its position
+        :param start: position of the first row
+        """
+        header: List[str] = list(self.columns)
+        body: List[List[str]] = [[str(value) for value in row] for row in self.rows]
+        if index:
+            header = [""] + header
+            body = [[str(start + i)] + row for i, row in enumerate(body)]
+        widths: List[int] = [max([len(col)] + [len(row[i]) for row in body]) for i, col in enumerate(header)]
+
+        lines: List[str] = []
+        for row in [header] + body:
+            lines.append("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+        return "\n".join(lines)
+
+    def to_pandas(self) -> "DataFrame":
+        from pandas import DataFrame
+
+        return DataFrame(self.rows, columns=list(self.columns))
+
+    @classmethod
+    def from_pandas(cls, frame: "DataFrame") -> "Table":
+        return cls([str(col) for col in frame.columns], frame.itertuples(index=False, name=None))
@@ -0,0 +1,165 @@
+"""
+    formulacli.renderer
+    ~~~~~~~~~~~~~~~~~~~
+
+    Buffered frame renderer. Everything a context prints is collected into one
+    frame, which is written with a single call, redrawing only the lines that
+    differ from the previous frame.
+
+"""
+import shutil
+import sys
+from collections import deque
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
+from re import compile
+from time import perf_counter
+from typing import Deque, Dict, Iterator, List, Optional, Pattern, TextIO, Tuple
+
+HOME: str = "\x1b[H"
+CLEAR_SCREEN: str = "\x1b[2J"
+CLEAR_LINE: str = "\x1b[K"
+CLEAR_BELOW: str = "\x1b[J"
+RESET: str = "\x1b[0m"
+
+SGR: Pattern[str] = compile(r"\x1b\[([0-9;]*)m")
+ESCAPE: Pattern[str] = compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+# frames kept for the frame time statistics
+HISTORY: int = 100
+
+
+def move_to(row: int) -> str:
+    """
+    Cursor to the start of ``row``, counted from 0.
+    """
+    return f"\x1b[{row + 1};1H"
+
+
+def visible_width(line: str) -> int:
+    return len(ESCAPE.sub("", line))
+
+
+def carried_styles(lines: List[str]) -> List[str]:
+    """
+    SGR sequences in effect at the start of every line, so that a line can be redrawn on its own.
+    """
+    styles: List[str] = []
+    carried: str = ""
+    for line in lines:
+        styles.append(carried)
+        for match in SGR.finditer(line):
+            codes: str = match.group(1)
+            if codes in ("", "0"):
+                carried = ""
+            else:
+                carried += match.group(0)
+    return styles
+
+
+class Renderer:
+    """
+    Draws frames captured from stdout.
+    Falls back to a full redraw when lines would wrap or scroll, or when the terminal was resized.
+    """
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.size: Tuple[int, int] = (0, 0)
+        self.stream: Optional[TextIO] = None
+        self.frames: Deque[Dict[str, float]] = deque(maxlen=HISTORY)
+
+    @contextmanager
+    def frame(self) -> Iterator[None]:
+        """
+        Captures what is printed in the block and draws it on exit.
+        Nothing is drawn when the block raises.
+        """
+        start: float = perf_counter()
+        self.stream = sys.stdout
+        buffer: StringIO = StringIO()
+        try:
+            with redirect_stdout(buffer):
+                yield
+        finally:
+            stream: TextIO = self.stream
+            self.stream = None
+        built: float = perf_counter()
+        written, changed = self.draw(buffer.getvalue(), stream)
+        self.frames.append({
+            "build": built - start,
+            "write": perf_counter() - built,
+            "bytes": written,
+            "lines": changed,
+        })
+
+    def draw(self, text: str, stream: TextIO) -> Tuple[int, int]:
+        """
+        Writes a frame with a single call.
+        :return: characters written and lines redrawn
+        """
+        lines: List[str] = text.split("\n")
+        if not stream.isatty():
+            stream.write(text)
+            stream.flush()
+            return len(text), len(lines)
+
+        size: Tuple[int, int] = tuple(shutil.get_terminal_size())
+        columns, rows = size
+        # the row below the frame takes the input echo, it must not scroll
+        fits: bool = len(lines) < rows and all(visible_width(line) < columns for line in lines)
+        if not fits or size != self.size or not self.lines:
+            output: str = RESET + HOME + CLEAR_SCREEN + text
+            changed: int = len(lines)
+        else:
+            styles: List[str] = carried_styles(lines)
+            parts: List[str] = []
+            for row, line in enumerate(lines[:-1]):
+                if row < len(self.lines) and self.lines[row] == line:
+                    continue
+                parts.append(move_to(row) + RESET + styles[row] + line + RESET + CLEAR_LINE)
+            # the last line is always written, leaving the cursor where a full redraw would
+            last: int = len(lines) - 1
+            parts.append(move_to(last) + CLEAR_BELOW + styles[last] + lines[last])
+            output = "".join(parts)
+            changed = len(parts)
+
+        self.lines = lines if fits else []
+        self.size = size
+        stream.write(output)
+        stream.flush()
+        return len(output), changed
+
+    def invalidate(self) -> None:
+        """
+        The next frame is drawn in full, after something else wrote to the terminal.
+        """
+        self.lines = []
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Mean build and write times (ms), characters and redrawn lines over the last frames.
+        """
+        if not self.frames:
+            return {}
+        count: int = len(self.frames)
+        return {
+            "frames": count,
+            "build ms": round(sum(frame["build"] for frame in self.frames) / count * 1000, 2),
+            "write ms": round(sum(frame["write"] for frame in self.frames) / count * 1000, 2),
+            "bytes": round(sum(frame["bytes"] for frame in self.frames) / count),
+            "lines": round(sum(frame["lines"] for frame in self.frames) / count, 1),
+        }
+
+
+_renderer: Renderer = Renderer()
+
+
+def get_renderer() -> Renderer:
+    return _renderer
+
+
+def terminal() -> TextIO:
+    """
+    The real stdout, also while a frame is being captured.
+    """
+    return _renderer.stream or sys.stdout
@@ -1,10 +1,16 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pandas import DataFrame
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
-from formulacli.html_handlers import get_response, parse
+from formulacli.html_handlers import get_response, parse, class_pattern
+from formulacli.profiling import timed
+from formulacli.records import Table
+from formulacli.schema import header
+from formulacli.urls import RESULTS_URL
+
+# subtree read by get_result_table
+RESULTS_STRAINER: SoupStrainer = SoupStrainer("table", class_=class_pattern("resultsarchive-table"))
 
 
 def get_result_table(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
@@ -15,15 +21,17 @@ def get_result_table(soup: BeautifulSoup) -> Optional[BeautifulSoup]:
         return None
 
 
+@timed()
 def get_cols(table: BeautifulSoup) -> List[str]:
     cols: List[str] = []
     for th in table.thead.find_all("th"):
         col: Optional[str] = th.text
         if col:
-            cols.append(col.upper())
+            cols.append(header(col))
     return cols
 
 
+@timed()
 def get_values(table: BeautifulSoup) -> List[List[str]]:
     entries: List[List[str]] = []
     for tr in table.tbody.find_all("tr"):
@@ -35,16 +43,23 @@ def get_values(table: BeautifulSoup) -> List[List[str]]:
     return entries
 
 
-def fetch_results(_for: str = "drivers", year: Optional[int] = None) -> DataFrame:
+def fetch_results(_for: str = "drivers", year: Optional[int] = None) -> Table:
     if not year:
         year = datetime.now().year
 
-    url: str = f"https://www.formula1.com/en/results.html/{year}/{_for}.html"
+    url: str = RESULTS_URL.format(year=year, table=_for)
+
+    return parse_results(get_response(url))
+
 
-    table: Optional[BeautifulSoup] = get_result_table(parse(get_response(url)))
+def parse_results(page: str) -> Table:
+    """
+    :raises ValueError: the page has no results table
+    """
+    table: Optional[BeautifulSoup] = get_result_table(parse(page, RESULTS_STRAINER))
     if table is None:
         raise ValueError("Invalid Season Year")
     cols: List[str] = get_cols(table)
     entries: List[List[str]] = get_values(table)
 
-    return DataFrame(entries, columns=cols)
+    return Table(cols, entries)
@@ -0,0 +1,381 @@
+"""
+    formulacli.results_store
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Local SQLite store of result tables and the bulk ingest command filling it.
+    Cells are stored typed (see :mod:`formulacli.schema`) and cross-season
+    aggregates (career points, wins, fastest laps...) are kept up to date as
+    seasons are stored, so reading them does not scan the result tables.
+
+    $ python -m formulacli.results_store --from 1950 --to 2019
+    $ python -m formulacli.results_store --aggregate wins --limit 10
+
+"""
+import json
+import sqlite3
+from argparse import ArgumentParser
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from datetime import datetime
+from os import path
+from threading import Lock, RLock
+from time import time, perf_counter
+from typing import Dict, List, Optional, Any, Iterable, Tuple, Callable
+
+from formulacli import schema
+from formulacli.exceptions import FetchError
+from formulacli.helpers import cache_dir
+from formulacli.records import Record, Table
+from formulacli.result_tables import fetch_results
+
+TABLES: Tuple[str, ...] = ("drivers", "team", "races", "fastest-laps")
+FIRST_SEASON: int = 1950
+WORKERS: int = 8
+# bumped whenever stored cells change type, older stores are converted when opened
+SCHEMA_VERSION: int = 1
+
+
+def one(row: Record) -> float:
+    return 1.0
+
+
+def points(row: Record) -> float:
+    return schema.number(row["PTS"]) if "PTS" in row else 0.0
+
+
+def champion(row: Record) -> float:
+    return 1.0 if row.get("POS") == 1 else 0.0
+
+
+# name: summed value of the rows of a table type, per value of the key column
+Aggregate = namedtuple("Aggregate", ["name", "table_for", "key", "value"])
+AGGREGATES: Dict[str, Aggregate] = {aggregate.name: aggregate for aggregate in (
+    Aggregate("career-points", "drivers", "DRIVER", points),
+    Aggregate("seasons", "drivers", "DRIVER", one),
+    Aggregate("titles", "drivers", "DRIVER", champion),
+    Aggregate("team-points", "team", "TEAM", points),
+    Aggregate("team-titles", "team", "TEAM", champion),
+    Aggregate("wins", "races", "WINNER", one),
+    Aggregate("team-wins", "races", "CAR", one),
+    Aggregate("fastest-laps", "fastest-laps", "DRIVER", one),
+    Aggregate("team-fastest-laps", "fastest-laps", "CAR", one),
+)}
+
+
+def contributions(table_for: str, table: Table) -> Dict[Tuple[str, str], float]:
+    """
+    What a typed season adds to every aggregate, by (aggregate, key).
+    """
+    added: Dict[Tuple[str, str], float] = {}
+    for aggregate in AGGREGATES.values():
+        if aggregate.table_for != table_for or aggregate.key not in table.columns:
+            continue
+        for row in table:
+            key: Optional[str] = row[aggregate.key]
+            if key:
+                added[aggregate.name, key] = added.get((aggregate.name, key), 0.0) + aggregate.value(row)
+    return added
+
+
+class ResultsStore:
+    """
+    One SQLite table per result table type, one row per result, a ``seasons``
+    table with the headers of every stored season and an ``aggregates`` table.
+    """
+    def __init__(self, db_path: Optional[str] = None) -> None:
+        self.db_path: str = db_path or path.join(cache_dir("results"), "results.sqlite3")
+        # shared by the fetch threads of the contexts and the prefetcher, reads and writes hold the lock
+        self.db: sqlite3.Connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.lock: RLock = RLock()
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS seasons ("
+                " table_for TEXT, year INTEGER, columns TEXT, fetched_at REAL,"
+                " PRIMARY KEY (table_for, year))"
+            )
+            # rows counts the results summed in value, keys without any are deleted
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS aggregates ("
+                " name TEXT, key TEXT, value REAL, rows INTEGER,"
+                " PRIMARY KEY (name, key))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS aggregates_value ON aggregates (name, value)")
+        version: int = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.migrate()
+
+    @staticmethod
+    def sql_table(table_for: str) -> str:
+        if table_for not in TABLES:
+            raise ValueError(f"Unknown table {table_for!r}")
+        return "results_" + table_for.replace("-", "_")
+
+    def query(self, sql: str, parameters: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        """
+        Every row of a read, fetched while holding the lock.
+        """
+        with self.lock:
+            return self.db.execute(sql, parameters).fetchall()
+
+    def migrate(self) -> None:
+        """
+        Stores every season again with the current schema and rebuilds the aggregates.
+        """
+        seasons: List[Tuple[str, int]] = self.query("SELECT table_for, year FROM seasons")
+        tables: List[Tuple[str, int, Table]] = [(table_for, year, self.load(table_for, year))
+                                                for table_for, year in seasons if table_for in TABLES]
+        with self.lock, self.db:
+            for table_for in TABLES:
+                self.db.execute(f"DROP TABLE IF EXISTS {self.sql_table(table_for)}")
+            self.db.execute("DELETE FROM aggregates")
+        for table_for, year, table in tables:
+            self.save(table_for, year, table)
+        with self.lock:
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def columns_of(self, table_for: str, year: int) -> Optional[List[str]]:
+        season = self.query("SELECT columns FROM seasons WHERE table_for = ? AND year = ?", (table_for, year))
+        return json.loads(season[0][0]) if season else None
+
+    def rows(self, table_for: str, year: int, columns: List[str]) -> List[List[schema.Value]]:
+        """
+        Typed rows of a stored season.
+        """
+        quoted: str = ", ".join(f'"{col}"' for col in columns)
+        kinds: List[str] = schema.kinds(table_for, columns)
+        return [[schema.from_sql(value, kind) for value, kind in zip(row, kinds)] for row in self.query(
+            f"SELECT {quoted} FROM {self.sql_table(table_for)} WHERE year = ? ORDER BY row", (year,))]
+
+    def add(self, added: Dict[Tuple[str, str], float], sign: int) -> None:
+        self.db.executemany(
+            "INSERT INTO aggregates VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (name, key) DO UPDATE SET value = value + excluded.value, rows = rows + excluded.rows",
+            [(name, key, sign * value, sign) for (name, key), value in added.items()]
+        )
+
+    def save(self, table_for: str, year: int, table: Table) -> None:
+        """
+        Stores (or replaces) a scraped season and updates the aggregates with it.
+        """
+        sql_table: str = self.sql_table(table_for)
+        columns: List[str] = list(table.columns)
+        typed: Table = schema.typed(table_for, table)
+        with self.lock, self.db:
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS {sql_table} (year INTEGER, row INTEGER)')
+            self.db.execute(f'CREATE INDEX IF NOT EXISTS {sql_table}_year ON {sql_table} (year)')
+            existing = {info[1] for info in self.db.execute(f"PRAGMA table_info({sql_table})")}
+            for col in columns:
+                if col not in existing:
+                    self.db.execute(f'ALTER TABLE {sql_table} ADD COLUMN "{col}" {schema.affinity(table_for, col)}')
+
+            # a season stored again first takes its previous results out of the aggregates
+            stored_columns: Optional[List[str]] = self.columns_of(table_for, year)
+            if stored_columns is not None:
+                stored: Table = Table(stored_columns, self.rows(table_for, year, stored_columns))
+                self.add(contributions(table_for, stored), -1)
+            self.add(contributions(table_for, typed), 1)
+            self.db.execute("DELETE FROM aggregates WHERE rows <= 0")
+
+            self.db.execute(f"DELETE FROM {sql_table} WHERE year = ?", (year,))
+            quoted: str = ", ".join(f'"{col}"' for col in columns)
+            marks: str = ", ".join("?" * (len(columns) + 2))
+            rows: List[List[Any]] = [[year, i, *map(schema.to_sql, values)] for i, values in enumerate(typed.rows)]
+            self.db.executemany(f"INSERT INTO {sql_table} (year, row, {quoted}) VALUES ({marks})", rows)
+            self.db.execute("INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?)",
+                            (table_for, year, json.dumps(columns), time()))
+
+    def load(self, table_for: str, year: int, typed: bool = False) -> Optional[Table]:
+        """
+        Stored season, ``None`` when it was never ingested.
+        :param typed: parsed values (see :mod:`formulacli.schema`) instead of the scraped text
+        """
+        columns: Optional[List[str]] = self.columns_of(table_for, year)
+        if columns is None:
+            return None
+        rows: List[List[Any]] = self.rows(table_for, year, columns)
+        if not typed:
+            rows = [[schema.to_text(value) for value in row] for row in rows]
+        return Table(columns, rows)
+
+    def seasons(self, table_for: str) -> List[int]:
+        return [year for year, in self.query(
+            "SELECT year FROM seasons WHERE table_for = ? ORDER BY year", (table_for,))]
+
+    def stored_columns(self, table_for: str) -> List[str]:
+        """
+        Headers of every stored season, empty when none was stored.
+        """
+        return [info[1] for info in self.query(f"PRAGMA table_info({self.sql_table(table_for)})")
+                if info[1] not in ("year", "row")]
+
+    def distinct(self, table_for: str, column: str) -> List[str]:
+        """
+        Values of ``column`` over every stored season.
+        """
+        if column not in self.stored_columns(table_for):
+            return []
+        return [value for value, in self.query(
+            f'SELECT DISTINCT "{column}" FROM {self.sql_table(table_for)} WHERE "{column}" IS NOT NULL ORDER BY 1')]
+
+    def career(self, table_for: str, column: str, value: str) -> Table:
+        """
+        Rows of every stored season where ``column`` is ``value``, newest season first.
+        """
+        columns: List[str] = [col for col in self.stored_columns(table_for) if col != column]
+        if column not in self.stored_columns(table_for):
+            return Table(["YEAR", *columns])
+        quoted: str = ", ".join(f'"{col}"' for col in columns)
+        kinds: List[str] = ["int", *schema.kinds(table_for, columns)]
+        rows = self.query(f'SELECT year, {quoted} FROM {self.sql_table(table_for)} WHERE "{column}" = ?'
+                          f' ORDER BY year DESC, row', (value,))
+        return Table(["YEAR", *columns], [
+            [schema.to_text(schema.from_sql(cell, kind)) for cell, kind in zip(row, kinds)] for row in rows
+        ])
+
+    def aggregate(self, name: str, limit: Optional[int] = None) -> Table:
+        """
+        Keys of an aggregate by descending value, e.g. the drivers with the most wins.
+        :raises ValueError: unknown aggregate
+        """
+        if name not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {name!r}")
+        rows = self.query("SELECT key, value FROM aggregates WHERE name = ? ORDER BY value DESC, key LIMIT ?",
+                          (name, -1 if limit is None else limit))
+        return Table([AGGREGATES[name].key, name.upper()], [[key, schema.to_text(value)] for key, value in rows])
+
+    def aggregate_of(self, name: str, key: str) -> float:
+        """
+        Value of an aggregate for a single key, 0 when it has none.
+        """
+        value = self.query("SELECT value FROM aggregates WHERE name = ? AND key = ?", (name, key))
+        return value[0][0] if value else 0.0
+
+    def rebuild_aggregates(self) -> None:
+        """
+        Sums the aggregates again from every stored season.
+        """
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM aggregates")
+            for table_for in TABLES:
+                for year in self.seasons(table_for):
+                    columns: List[str] = self.columns_of(table_for, year)
+                    self.add(contributions(table_for, Table(columns, self.rows(table_for, year, columns))), 1)
+
+    def signature(self) -> str:
+        """
+        Changes whenever a season is stored.
+        """
+        (count, fetched_at), = self.query("SELECT COUNT(*), MAX(fetched_at) FROM seasons")
+        return f"{count}:{fetched_at or 0}"
+
+    def close(self) -> None:
+        self.db.close()
+
+
+_store: Optional[ResultsStore] = None
+# asked for from worker threads
+_store_lock: Lock = Lock()
+
+
+def get_store() -> ResultsStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResultsStore()
+    return _store
+
+
+def fetch_season(table_for: str, year: int) -> Table:
+    """
+    Like :func:`fetch_results`, reading finished seasons from the store and storing them when missing.
+    The current season always goes to the network.
+    """
+    if year >= datetime.now().year:
+        return fetch_results(table_for, year)
+    store: ResultsStore = get_store()
+    table: Optional[Table] = store.load(table_for, year)
+    if table is None:
+        table = fetch_results(table_for, year)
+        store.save(table_for, year, table)
+    return table
+
+
+def ingest(store: ResultsStore,
+           years: Iterable[int],
+           tables: Iterable[str] = TABLES,
+           workers: int = WORKERS,
+           refresh: bool = False,
+           report: Callable[[str], Any] = print) -> Dict[str, int]:
+    """
+    Downloads seasons concurrently and stores them as they arrive.
+    The current season is only stored with ``refresh``, like :func:`fetch_season` it is not finished
+    and would count in the aggregates (its leader as a champion).
+    :param refresh: download seasons that are already stored, and the current one
+    :param report: called with a line per finished season
+    :return: counts of ``stored``, ``skipped`` (already stored or not finished), ``missing`` and ``failed`` seasons
+    """
+    counts: Dict[str, int] = {"stored": 0, "skipped": 0, "missing": 0, "failed": 0}
+    jobs: List[Tuple[str, int]] = []
+    years = list(years)
+    current: int = datetime.now().year
+    for table_for in tables:
+        stored = set() if refresh else set(store.seasons(table_for))
+        for year in years:
+            if year >= current and not refresh:
+                counts["skipped"] += 1
+                report(f"{year} {table_for}: not finished, skipped")
+            elif year in stored:
+                counts["skipped"] += 1
+            else:
+                jobs.append((table_for, year))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures: Dict[Future, Tuple[str, int]] = {
+            executor.submit(fetch_results, table_for, year): (table_for, year) for table_for, year in jobs
+        }
+        for future in as_completed(futures):
+            table_for, year = futures[future]
+            try:
+                store.save(table_for, year, future.result())
+            except ValueError:
+                counts["missing"] += 1
+                report(f"{year} {table_for}: no results")
+            except FetchError as e:
+                counts["failed"] += 1
+                report(f"{year} {table_for}: {e}")
+            else:
+                counts["stored"] += 1
+                report(f"{year} {table_for}: stored")
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser: ArgumentParser = ArgumentParser(prog="python -m formulacli.results_store",
+                                            description="Download result tables into the local store.")
+    parser.add_argument("--from", dest="first", type=int, default=FIRST_SEASON, help="first season")
+    parser.add_argument("--to", dest="last", type=int, default=datetime.now().year - 1,
+                        help="last season, the last finished one by default")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--refresh", action="store_true",
+                        help="download stored seasons again, and the current one")
+    parser.add_argument("--db", help="store path")
+    parser.add_argument("--aggregate", choices=list(AGGREGATES), help="print a stored aggregate instead")
+    parser.add_argument("--limit", type=int, default=20, help="rows of the aggregate")
+    args = parser.parse_args(argv)
+
+    store: ResultsStore = ResultsStore(args.db)
+    if args.aggregate:
+        print(store.aggregate(args.aggregate, args.limit).to_string(index=False))
+        store.close()
+        return
+    start: float = perf_counter()
+    counts: Dict[str, int] = ingest(store, range(args.first, args.last + 1), args.tables, args.workers, args.refresh)
+    store.close()
+    summary: str = ", ".join(f"{count} {label}" for label, count in counts.items())
+    print(f"{summary} in {perf_counter() - start:.1f}s -> {store.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+    formulacli.roster
+    ~~~~~~~~~~~~~~~~~
+
+    The drivers list as DriverContext browses it: the surname strip of the
+    header is built once per roster, only the highlighted surname changes per
+    driver, and the next and previous drivers are looked up in a ring.
+
+"""
+from typing import Dict, List, Optional
+
+from colorama import Back, Fore, Style
+
+from formulacli.records import Record, Table
+
+
+class Roster:
+    """
+    :param drivers: as fetched by :func:`~formulacli.drivers.fetch_drivers`
+    """
+    def __init__(self, drivers: Table) -> None:
+        self.drivers: Table = drivers
+        surnames: List[str] = [name.split(' ')[-1] for name in drivers.column('NAME')]
+        cells: List[str] = [Fore.LIGHTBLACK_EX + Style.DIM + surname + Fore.RESET + "  " for surname in surnames]
+        self.highlighted: List[str] = [
+            Fore.RED + Back.WHITE + surname + Back.LIGHTWHITE_EX + Fore.RESET + "  " for surname in surnames
+        ]
+        self.strip: str = Back.LIGHTWHITE_EX + "".join(cells) + Back.RESET
+        # where the cell of every driver starts and ends in the strip
+        self.bounds: List[int] = [len(Back.LIGHTWHITE_EX)]
+        for cell in cells:
+            self.bounds.append(self.bounds[-1] + len(cell))
+        count: int = len(drivers)
+        self.next: List[int] = [(i + 1) % count for i in range(count)]
+        self.previous: List[int] = [(i - 1) % count for i in range(count)]
+        self.positions: Dict[str, int] = {url: i for i, url in enumerate(drivers.column('URL'))}
+
+    def __len__(self) -> int:
+        return len(self.drivers)
+
+    def __getitem__(self, index: int) -> Record:
+        return self.drivers[index]
+
+    def header(self, index: int) -> str:
+        """
+        The surname strip with the driver at ``index`` highlighted.
+        """
+        return self.strip[:self.bounds[index]] + self.highlighted[index] + self.strip[self.bounds[index + 1]:]
+
+    def index_of(self, url: str) -> Optional[int]:
+        return self.positions.get(url)
+
+
+_roster: Optional[Roster] = None
+
+
+def get_roster(drivers: Table) -> Roster:
+    """
+    Roster of ``drivers``, built once for the last table asked for.
+    """
+    global _roster
+    if _roster is None or _roster.drivers is not drivers:
+        _roster = Roster(drivers)
+    return _roster
@@ -0,0 +1,152 @@
+"""
+    formulacli.schema
+    ~~~~~~~~~~~~~~~~~
+
+    Types of the result table columns: scraped cells are parsed once into
+    ints, floats, durations and dates, and formatted back to the scraped text.
+    Cells that do not parse (``DQ``, ``NC``, ``DNF``...) or would not be
+    formatted back the same are kept as text.
+
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Sequence, Union
+
+from formulacli.records import Table
+
+# column kinds of every table type, unknown columns are text
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "drivers": {"POS": "int", "DRIVER": "text", "NATIONALITY": "text", "CAR": "text", "PTS": "float"},
+    "team": {"POS": "int", "TEAM": "text", "PTS": "float"},
+    "races": {"GRAND PRIX": "text", "DATE": "date", "WINNER": "text", "CAR": "text", "LAPS": "int",
+              "TIME": "duration"},
+    "fastest-laps": {"GRAND PRIX": "text", "DRIVER": "text", "CAR": "text", "TIME": "duration"},
+}
+
+# SQLite affinity of every kind, durations are stored in seconds and dates as ISO text
+AFFINITIES: Dict[str, str] = {
+    "int": "INTEGER",
+    "float": "REAL",
+    "duration": "REAL",
+    "date": "TEXT",
+    "text": "TEXT",
+}
+
+DATE_FORMAT: str = "%d %b %Y"
+
+Value = Union[int, float, str, date, timedelta, None]
+
+
+def header(text: str) -> str:
+    """
+    Normalised column name: upper case, single spaces.
+    """
+    return " ".join(text.split()).upper()
+
+
+def kinds(table_for: str, columns: Sequence[str]) -> List[str]:
+    schema: Dict[str, str] = SCHEMAS.get(table_for, {})
+    return [schema.get(col, "text") for col in columns]
+
+
+def parse_duration(text: str) -> float:
+    """
+    Seconds of ``"1:25:00.100"`` or ``"1:20.100"``.
+    :raises ValueError: not a duration
+    """
+    seconds: float = 0.0
+    for part in text.split(":"):
+        if not part or part.startswith(("-", "+")):
+            raise ValueError(f"Not a duration {text!r}")
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_duration(seconds: float) -> str:
+    minutes, rest = divmod(round(seconds * 1000), 60_000)
+    hours, minutes = divmod(minutes, 60)
+    fraction: str = f"{rest // 1000:02}.{rest % 1000:03}"
+    return f"{hours}:{minutes:02}:{fraction}" if hours else f"{minutes}:{fraction}"
+
+
+def parse(text: str, kind: str) -> Value:
+    """
+    Typed value of a scraped cell, the text itself when it does not parse back to the same text.
+    """
+    if not text:
+        return None
+    value: Value
+    try:
+        if kind == "int":
+            value = int(text)
+        elif kind == "float":
+            value = float(text)
+        elif kind == "duration":
+            value = timedelta(seconds=parse_duration(text))
+        elif kind == "date":
+            value = datetime.strptime(text, DATE_FORMAT).date()
+        else:
+            return text
+    except ValueError:
+        return text
+    return value if to_text(value) == text else text
+
+
+def to_sql(value: Value) -> Union[int, float, str, None]:
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def from_sql(value: Union[int, float, str, None], kind: str) -> Value:
+    """
+    Typed value of a stored cell.
+    """
+    if kind == "duration" and isinstance(value, (int, float)):
+        return timedelta(seconds=value)
+    if kind == "date" and isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def to_text(value: Value) -> str:
+    """
+    Scraped representation of a typed value.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, timedelta):
+        return format_duration(value.total_seconds())
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def number(value: Value) -> float:
+    """
+    Value of a numeric cell in aggregates, 0 for the unparsed ones.
+    """
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def typed(table_for: str, table: Table) -> Table:
+    """
+    Copy of a scraped table with its cells parsed.
+    """
+    column_kinds: List[str] = kinds(table_for, table.columns)
+    return Table(table.columns, [
+        [parse(text, kind) if kind != "text" else text for text, kind in zip(row, column_kinds)]
+        for row in table.rows
+    ])
+
+
+def affinity(table_for: str, column: str) -> str:
+    return AFFINITIES[SCHEMAS.get(table_for, {}).get(column, "text")]
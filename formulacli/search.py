@@ -0,0 +1,202 @@
+"""
+    formulacli.search
+    ~~~~~~~~~~~~~~~~~
+
+    In-memory index of the current drivers, by name, number and team, and of
+    the drivers, teams and seasons of the results store. Words are matched by
+    prefix, misspelled ones by their trigrams. The index is saved next to the
+    store and rebuilt when the store changes.
+
+"""
+import json
+import unicodedata
+from collections import Counter, namedtuple
+from datetime import datetime
+from os import path, replace
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from formulacli.exceptions import FetchError
+from formulacli.records import Table
+from formulacli.results_store import FIRST_SEASON, ResultsStore, get_store
+
+# kinds of entries, best ranked first
+KINDS: Tuple[str, ...] = ("driver", "season", "driver results", "team results")
+FORMAT_VERSION: int = 1
+MAX_AGE: float = 24 * 60 * 60
+# column naming the driver or team in the results tables
+NAME_COLUMNS: Dict[str, str] = {"drivers": "DRIVER", "team": "TEAM"}
+# least share of trigrams a misspelled word has in common with an indexed one
+MIN_SIMILARITY: float = 0.4
+
+# kind: one of KINDS
+# label: shown to the user
+# key: what the entry opens, driver url, season or the name in the results
+Entry = namedtuple("Entry", ["kind", "label", "key"])
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower case words without accents: ``"Kimi Räikkönen RAI"`` -> ``["kimi", "raikkonen", "rai"]``.
+    """
+    plain: str = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return "".join(char.lower() if char.isalnum() else " " for char in plain).split()
+
+
+def trigrams(word: str) -> Set[str]:
+    padded: str = f"^{word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Every prefix of every indexed word maps to the entries holding it, a flattened trie.
+    Misspelled words are looked up by trigram among the indexed words.
+    """
+    def __init__(self, signature: str = "", built_at: Optional[float] = None) -> None:
+        self.signature: str = signature
+        self.built_at: float = built_at if built_at is not None else time()
+        self.entries: List[Entry] = []
+        self.words: List[Tuple[str, ...]] = []
+        self.prefixes: Dict[str, Set[int]] = {}
+        self.vocabulary: Dict[str, Set[int]] = {}
+        self.grams: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: Entry, *texts: str) -> None:
+        """
+        Indexes ``entry`` under the words of ``texts``.
+        """
+        i: int = len(self.entries)
+        words: Tuple[str, ...] = tuple(dict.fromkeys(word for text in texts for word in tokenize(str(text))))
+        self.entries.append(entry)
+        self.words.append(words)
+        for word in words:
+            for end in range(1, len(word) + 1):
+                self.prefixes.setdefault(word[:end], set()).add(i)
+            if word not in self.vocabulary:
+                self.vocabulary[word] = set()
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+            self.vocabulary[word].add(i)
+
+    def similar(self, word: str) -> Dict[int, float]:
+        """
+        Entries holding an indexed word close to ``word``, with the share of trigrams they have in common.
+        """
+        grams: Set[str] = trigrams(word)
+        shared: Counter = Counter(other for gram in grams for other in self.grams.get(gram, ()))
+        found: Dict[int, float] = {}
+        for other, count in shared.items():
+            similarity: float = count / max(len(grams), len(other))
+            if similarity >= MIN_SIMILARITY:
+                for i in self.vocabulary[other]:
+                    found[i] = max(found.get(i, 0.0), similarity)
+        return found
+
+    def search(self, query: str, limit: int = 10) -> List[Entry]:
+        """
+        Entries holding every word of ``query``, as a prefix or misspelled.
+        Ranked by how close the misspelled words are, then by kind and label.
+        """
+        words: List[str] = tokenize(query)
+        if not words:
+            return []
+        scores: Optional[Dict[int, float]] = None
+        for word in words:
+            prefixed: Optional[Set[int]] = self.prefixes.get(word)
+            matches: Dict[int, float] = dict.fromkeys(prefixed, 1.0) if prefixed else self.similar(word)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {i: score + matches[i] for i, score in scores.items() if i in matches}
+            if not scores:
+                return []
+
+        def rank(i: int) -> Tuple[float, int, str]:
+            return -scores[i], KINDS.index(self.entries[i].kind), self.entries[i].label
+
+        return [self.entries[i] for i in sorted(scores, key=rank)[:limit]]
+
+    def save(self, file_path: str) -> None:
+        data: Dict[str, Any] = {
+            "version": FORMAT_VERSION,
+            "signature": self.signature,
+            "built_at": self.built_at,
+            "entries": [[*entry, words] for entry, words in zip(self.entries, self.words)],
+        }
+        with NamedTemporaryFile("w", dir=path.dirname(file_path), suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+            json.dump(data, tmp)
+        replace(tmp.name, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional["SearchIndex"]:
+        """
+        Saved index, ``None`` when missing or saved by another version.
+        """
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != FORMAT_VERSION:
+            return None
+        index: SearchIndex = cls(data["signature"], data["built_at"])
+        for kind, label, key, words in data["entries"]:
+            index.add(Entry(kind, label, key), *words)
+        return index
+
+
+def build_index(store: ResultsStore, roster: Optional[Table] = None) -> SearchIndex:
+    """
+    :param roster: current drivers, as fetched by :func:`~formulacli.drivers.fetch_drivers`
+    """
+    index: SearchIndex = SearchIndex(store.signature())
+    for driver in roster or ():
+        index.add(Entry("driver", driver["NAME"], driver["URL"]), driver["NAME"], driver["NUMBER"], driver["TEAM"])
+    for year in range(FIRST_SEASON, datetime.now().year + 1):
+        index.add(Entry("season", f"{year} season", year), str(year))
+    for name in store.distinct("drivers", NAME_COLUMNS["drivers"]):
+        index.add(Entry("driver results", name, name), name)
+    for name in store.distinct("team", NAME_COLUMNS["team"]):
+        index.add(Entry("team results", name, name), name)
+    return index
+
+
+_index: Optional[SearchIndex] = None
+
+
+def get_index(store: Optional[ResultsStore] = None) -> SearchIndex:
+    """
+    Shared index, loaded from its file next to the store or rebuilt when the store changed
+    or the roster is older than :data:`MAX_AGE`. Indexes built without a roster are not saved
+    and are built again on the next search, once the drivers can be fetched.
+    """
+    global _index
+    store = store or get_store()
+    file_path: str = path.join(path.dirname(store.db_path), "search.json")
+    if _index is None:
+        _index = SearchIndex.load(file_path)
+    if _index is None or _index.signature != store.signature() or time() - _index.built_at > MAX_AGE:
+        from formulacli.drivers import fetch_drivers
+
+        roster: Optional[Table]
+        try:
+            roster = fetch_drivers()
+        except FetchError:
+            roster = None
+        _index = build_index(store, roster)
+        if roster is not None:
+            _index.save(file_path)
+        else:
+            # stale, the roster is fetched again on the next search
+            _index.built_at = 0.0
+    return _index
+
+
+def clear() -> None:
+    global _index
+    _index = None
@@ -0,0 +1,78 @@
+"""
+    formulacli.thumbnails
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Article thumbnails downloaded and painted in a thread pool with a worker
+    per image, so that a page of them takes as long as its slowest image.
+
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Event
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from formulacli.atlas import get_atlas
+from formulacli.palettes import LUT_BITS
+
+MAX_WORKERS: int = 16
+
+# convert_image arguments of the NewsListContext thumbnails
+THUMBNAIL_ARGS: Dict[str, Any] = {
+    "size": (12, 3),
+    "lut_bits": LUT_BITS,
+    "encoding": "rle",
+}
+
+
+def render_thumbnail(url: str) -> str:
+    return get_atlas().portrait(url, **THUMBNAIL_ARGS)
+
+
+class ThumbnailLoader:
+    """
+    Paints every thumbnail of a page in the background, setting ``updated`` as each one completes.
+    """
+    def __init__(self,
+                 urls: Iterable[str],
+                 max_workers: int = MAX_WORKERS,
+                 render: Optional[Callable[[str], str]] = None) -> None:
+        """
+        :param render: paints the thumbnail of a url, :func:`render_thumbnail` by default
+        """
+        unique: List[str] = list(dict.fromkeys(url for url in urls if url))
+        self.updated: Event = Event()
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(min(len(unique), max_workers), 1),
+                                                               thread_name_prefix="thumbnails")
+        self.futures: Dict[str, Future] = {}
+        for url in unique:
+            future: Future = self.executor.submit(render or render_thumbnail, url)
+            future.add_done_callback(lambda _: self.updated.set())
+            self.futures[url] = future
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Painted thumbnail, ``None`` while it is loading and empty when it could not be painted.
+        """
+        future: Optional[Future] = self.futures.get(url)
+        if future is None or future.cancelled():
+            return ""
+        if not future.done():
+            return None
+        return "" if future.exception() is not None else future.result()
+
+    def progress(self) -> Tuple[int, int]:
+        """
+        (finished, queued) thumbnails.
+        """
+        futures = list(self.futures.values())
+        return sum(future.done() for future in futures), len(futures)
+
+    @property
+    def pending(self) -> bool:
+        done, queued = self.progress()
+        return done < queued
+
+    def shutdown(self) -> None:
+        """
+        Lets the running thumbnails finish in the background, the workers exit after them.
+        """
+        self.executor.shutdown(wait=False)
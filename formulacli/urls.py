@@ -3,3 +3,5 @@ BASE_URL: str = "https://www.formula1.com"
 DRIVERS_URL: str = "https://www.formula1.com/en/drivers.html"
 
 LATEST_NEWS_URL: str = "https://www.formula1.com/en/latest.html"
+
+RESULTS_URL: str = "https://www.formula1.com/en/results.html/{year}/{table}.html"
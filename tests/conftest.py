@@ -0,0 +1,64 @@
+import threading
+from collections import namedtuple
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from tests.replay import replay_handler
+
+
+def pytest_addoption(parser):
+    parser.addoption("--network", action="store_true", help="run the tests reaching the live site")
+    parser.addoption("--replay-latency", type=float, default=0.0,
+                     help="seconds the replay server waits before every answer")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "network: reaches the live site, skipped without --network")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--network"):
+        return
+    skip = pytest.mark.skip(reason="reaches the live site, run with --network")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def serve():
+    """Starts a local HTTP server for a handler class, returns its base url."""
+    servers = []
+
+    def start(handler):
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(httpd)
+        return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    yield start
+    for httpd in servers:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+Replay = namedtuple("Replay", ["url", "handler"])
+
+
+@pytest.fixture
+def replay(serve, monkeypatch, tmp_path, request):
+    """Points the scrapers at the replay server, with an empty page cache."""
+    from formulacli import atlas, drivers, html_handlers, news, result_tables
+
+    handler = replay_handler(latency=request.config.getoption("--replay-latency"))
+    url = serve(handler)
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(html_handlers, "_cache", None)
+    monkeypatch.setattr(atlas, "_atlas", None)
+    monkeypatch.setattr(drivers, "BASE_URL", url)
+    monkeypatch.setattr(drivers, "DRIVERS_URL", url + "/en/drivers.html")
+    monkeypatch.setattr(news, "BASE_URL", url)
+    monkeypatch.setattr(news, "LATEST_NEWS_URL", url + "/en/latest.html")
+    monkeypatch.setattr(result_tables, "RESULTS_URL", url + "/en/results.html/{year}/{table}.html")
+    return Replay(url, handler)
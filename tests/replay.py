@@ -0,0 +1,140 @@
+"""
+    tests.replay
+    ~~~~~~~~~~~~
+
+    Stand-in for formula1.com serving the recorded pages in ``tests/fixtures``
+    with a configurable latency, and the recorder refreshing them.
+
+    $ python -m tests.replay --record
+
+"""
+import hashlib
+import re
+import sys
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern, Tuple, Type
+
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+
+# url path -> fixture file, results pages are shared by every season
+ROUTES: List[Tuple[Pattern[str], str]] = [
+    (re.compile(r"^/en/drivers\.html$"), "drivers.html"),
+    (re.compile(r"^/en/drivers/[\w%-]+\.html$"), "driver.html"),
+    (re.compile(r"^/en/results\.html/\d{4}/(drivers|team|races|fastest-laps)\.html$"), r"results_\1.html"),
+    (re.compile(r"^/en/latest\.html$"), "latest.html"),
+    (re.compile(r"\.(jpg|jpeg|png)$"), "portrait.jpg"),
+]
+
+# live page recorded into each fixture
+RECORDINGS: Dict[str, str] = {
+    "drivers.html": "https://www.formula1.com/en/drivers.html",
+    "driver.html": "https://www.formula1.com/en/drivers/lewis-hamilton.html",
+    "results_drivers.html": "https://www.formula1.com/en/results.html/2019/drivers.html",
+    "results_team.html": "https://www.formula1.com/en/results.html/2019/team.html",
+    "results_races.html": "https://www.formula1.com/en/results.html/2019/races.html",
+    "results_fastest-laps.html": "https://www.formula1.com/en/results.html/2019/fastest-laps.html",
+    "latest.html": "https://www.formula1.com/en/latest.html",
+}
+
+
+def route(path: str) -> Optional[str]:
+    """
+    Fixture file answering ``path``, ``None`` for a 404.
+    """
+    path = path.split("?")[0]
+    for pattern, name in ROUTES:
+        match = pattern.search(path)
+        if match:
+            return match.expand(name)
+    return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """
+    Answers with the fixture of the path after ``latency`` seconds.
+    Sends ETags and answers 304 to matching conditional requests.
+    """
+    protocol_version: str = "HTTP/1.1"
+    latency: float = 0.0
+    fixtures: Path = FIXTURES
+    requests: List[str] = []
+
+    def do_GET(self) -> None:
+        type(self).requests.append(self.path)
+        time.sleep(self.latency)
+        body: Optional[bytes] = self.page(self.path)
+        if body is None:
+            self.answer(404, b"")
+            return
+        etag: str = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.answer(304, b"", etag=etag)
+            return
+        content_type: str = "image/jpeg" if body.startswith(b"\xff\xd8") else "text/html; charset=utf-8"
+        self.answer(200, body, content_type, etag)
+
+    def page(self, path: str) -> Optional[bytes]:
+        name: Optional[str] = route(path)
+        if name is None or not (self.fixtures / name).exists():
+            return None
+        return (self.fixtures / name).read_bytes()
+
+    def answer(self, status: int, body: bytes, content_type: str = "text/html", etag: str = "") -> None:
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def replay_handler(latency: float = 0.0, fixtures: Path = FIXTURES) -> Type[ReplayHandler]:
+    """
+    Handler class with its own latency and request log.
+    """
+    return type("Replay", (ReplayHandler,), {"latency": latency, "fixtures": fixtures, "requests": []})
+
+
+class SnapshotHandler(ReplayHandler):
+    """
+    Answers every path with the current snapshot, a page changing over time.
+    """
+    snapshots: List[bytes] = []
+    current: int = 0
+
+    def page(self, path: str) -> Optional[bytes]:
+        return self.snapshots[self.current]
+
+    @classmethod
+    def advance(cls) -> None:
+        """
+        Serves the next snapshot, the last one stays.
+        """
+        cls.current = min(cls.current + 1, len(cls.snapshots) - 1)
+
+
+def snapshot_handler(snapshots: List[bytes], latency: float = 0.0) -> Type[SnapshotHandler]:
+    return type("Snapshots", (SnapshotHandler,), {"snapshots": snapshots, "latency": latency, "requests": []})
+
+
+def record(names: Optional[List[str]] = None) -> None:
+    """
+    Downloads the live pages into the fixtures.
+    """
+    from formulacli.html_handlers import request
+
+    for name in names or RECORDINGS:
+        (FIXTURES / name).write_bytes(request(RECORDINGS[name]).content)
+        print(f"{name}: recorded {RECORDINGS[name]}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["--record"]:
+        sys.exit("usage: python -m tests.replay --record [FIXTURE...]")
+    record(sys.argv[2:])
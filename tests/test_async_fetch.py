@@ -0,0 +1,36 @@
+import threading
+import time
+
+import pytest
+
+from formulacli import async_fetch
+from formulacli.async_fetch import fetch
+from formulacli.exceptions import ExitException, FetchCancelled
+
+
+def keys(*pressed):
+    pressed = list(pressed)
+    return lambda self: pressed.pop(0) if pressed else None
+
+
+def test_fetch_returns_result():
+    assert fetch(lambda a, b=0: a + b, 1, b=2) == 3
+
+
+def test_fetch_raises_worker_errors():
+    def broken():
+        raise ValueError("Invalid Season Year")
+
+    with pytest.raises(ValueError):
+        fetch(broken)
+
+
+@pytest.mark.parametrize("key, error", [("b", FetchCancelled), ("q", ExitException)])
+def test_keys_leave_slow_fetches(monkeypatch, key, error):
+    monkeypatch.setattr(async_fetch.KeyReader, "poll", keys(None, key))
+    release = threading.Event()
+    start = time.perf_counter()
+    with pytest.raises(error):
+        fetch(release.wait, 10)
+    assert time.perf_counter() - start < 1
+    release.set()
@@ -0,0 +1,205 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from numpy import uint8
+from numpy.random import default_rng
+from PIL import Image
+
+from formulacli import atlas
+from formulacli.atlas import GRID, RECORD, PortraitAtlas, atlas_key, emit
+from formulacli.img_converter import convert_image, index_image, paint_image, scheme_for
+from formulacli.prefetch import PORTRAIT_ARGS
+
+# the atlas keeps palette indexes, the encoding is only chosen when they are emitted
+KEY_ARGS = {name: value for name, value in PORTRAIT_ARGS.items() if name != "encoding"}
+
+
+@pytest.fixture
+def image():
+    pixels = default_rng(7).integers(0, 256, size=(23, 31, 3), dtype=uint8)
+    pixels[0, :4] = [(0, 0, 0), (5, 5, 5), (255, 255, 0), (0, 0, 255)]
+    return Image.fromarray(pixels, "RGB")
+
+
+def test_key_covers_every_index_parameter():
+    base = atlas_key("img/1", **KEY_ARGS)
+    assert atlas_key("img/1", **KEY_ARGS) == base
+    assert atlas_key("img/2", **KEY_ARGS) != base
+    for change in ({"crop_box": (0, 0, 10, 10)}, {"ratio": (1, 1)}, {"size": (40, 20)},
+                   {"colored": True}, {"brush": "#"}, {"lut_bits": None}):
+        assert atlas_key("img/1", **dict(KEY_ARGS, **change)) != base, change
+
+
+@pytest.mark.parametrize("encoding", ["cells", "rle"])
+@pytest.mark.parametrize("colored", [False, True])
+@pytest.mark.parametrize("brush", [None, "#"])
+def test_emit_matches_paint_image(image, encoding, colored, brush, tmp_path, monkeypatch):
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    colors = scheme_for(brush, colored)
+    indexes = index_image(image, colors, lut_bits=5)
+    grid = indexes.astype("uint8").tobytes()
+    assert emit(grid, indexes.shape[1], list(colors.values()), brush or " ", encoding) == \
+        paint_image(image, colored=colored, brush=brush, lut_bits=5, encoding=encoding)
+
+
+def test_grids_survive_a_restart(tmp_path):
+    file_path = str(tmp_path / "portraits.atlas")
+    portraits = PortraitAtlas(file_path)
+    assert portraits.get("a") is None
+    portraits.put("a", bytes([0, 1, 2, 3, 4, 0]), 3, ["A", "B", "C"], " ")
+    portraits.put("b", bytes([1, 1]), 2, ["A", "B"], "#")
+    portraits.put("a", bytes([2, 2]), 1, ["A", "B", "C"], " ")
+    portraits.close()
+
+    reopened = PortraitAtlas(file_path)
+    assert len(reopened) == 2
+    assert reopened.get("a", "cells").split("\n")[:2] == ["C\x1b[1m ", "C\x1b[1m "]
+    assert reopened.get("b").startswith("\x1b[1mB##\n")
+    assert reopened.stats["hits"] == 2 and reopened.stats["misses"] == 0
+    reopened.close()
+
+
+def test_unreadable_atlas_is_empty(tmp_path):
+    file_path = tmp_path / "portraits.atlas"
+    file_path.write_bytes(b"not an atlas")
+    portraits = PortraitAtlas(str(file_path))
+    assert len(portraits) == 0
+    portraits.put("a", bytes([0]), 1, ["A"], " ")
+    assert PortraitAtlas(str(file_path)).get("a") is not None
+
+
+def test_grids_are_appended_in_place(tmp_path):
+    file_path = tmp_path / "portraits.atlas"
+    portraits = PortraitAtlas(str(file_path))
+    portraits.put("a", bytes(100), 10, ["A"], " ")
+    before = file_path.read_bytes()
+    portraits.put("b", bytes(100), 10, ["A"], " ")
+    after = file_path.read_bytes()
+    # same scheme, a single grid record is added after the first one
+    assert after.startswith(before) and len(after) - len(before) == RECORD.size + GRID.size + 100
+
+    # an interrupted write leaves a partial record, ignored and then overwritten
+    with open(file_path, "ab") as f:
+        f.write(RECORD.pack(b"G", 500) + b"partial")
+    reopened = PortraitAtlas(str(file_path))
+    assert len(reopened) == 2
+    reopened.put("c", bytes(4), 2, ["A"], " ")
+    assert len(PortraitAtlas(str(file_path))) == 3
+
+
+def test_atlas_is_capped(tmp_path):
+    file_path = tmp_path / "portraits.atlas"
+    portraits = PortraitAtlas(str(file_path), max_bytes=2000)
+    for key in "abcdefghij":
+        portraits.put(key, bytes(200), 20, ["A"], " ")
+        if key == "b":
+            assert portraits.get("a") is not None
+    assert file_path.stat().st_size <= 2000
+    assert portraits.stats["evicted"] > 0
+    # the newest grids and the ones read this session are kept
+    assert {"a", "j"} <= set(portraits.entries)
+    assert "c" not in portraits.entries
+    assert PortraitAtlas(str(file_path)).entries.keys() == portraits.entries.keys()
+
+
+def test_unwritable_atlas_still_paints(tmp_path):
+    portraits = PortraitAtlas(str(tmp_path / "missing" / "portraits.atlas"))
+    assert portraits.paint("a", bytes([0, 1]), 2) == emit(bytes([0, 1]), 2, list(scheme_for(None, False).values()), " ")
+    assert portraits.stats["errors"] == 1
+    assert portraits.get("a") is None
+
+
+def test_writers_append_after_each_other(tmp_path):
+    file_path = str(tmp_path / "portraits.atlas")
+    first, second = PortraitAtlas(file_path), PortraitAtlas(file_path)
+    first.put("a", bytes(10), 5, ["A"], " ")
+    # the second one has not seen "a", it is read before "b" is appended
+    second.put("b", bytes(10), 5, ["A", "B"], " ")
+    first.put("c", bytes(10), 5, ["A", "B"], " ")
+    assert list(second.entries) == ["a", "b"]
+    assert list(PortraitAtlas(file_path).entries) == ["a", "b", "c"]
+    assert PortraitAtlas(file_path).get("c").startswith("\x1b[1mA")
+
+
+def test_compacted_atlas_is_read_again(tmp_path):
+    file_path = tmp_path / "portraits.atlas"
+    reader = PortraitAtlas(str(file_path))
+    writer = PortraitAtlas(str(file_path), max_bytes=2000)
+    for key in "abcdefghij":
+        writer.put(key, bytes(200), 20, ["A"], " ")
+    # still mapping the atlas from before the compaction
+    assert len(reader) == 0 and writer.stats["evicted"] > 0
+    reader.put("k", bytes(200), 20, ["A"], " ")
+    assert set(PortraitAtlas(str(file_path)).entries) == set(writer.entries) | {"k"}
+
+
+def test_atlas_is_never_truncated(tmp_path):
+    file_path = tmp_path / "portraits.atlas"
+    PortraitAtlas(str(file_path)).put("a", bytes(100), 10, ["A"], " ")
+    with open(file_path, "ab") as f:
+        f.write(RECORD.pack(b"G", 5000) + bytes(500))
+    size = file_path.stat().st_size
+    portraits = PortraitAtlas(str(file_path))
+    portraits.put("b", bytes(4), 2, ["A"], " ")
+    assert file_path.stat().st_size == size
+    assert list(PortraitAtlas(str(file_path)).entries) == ["a", "b"]
+
+
+def test_processes_share_the_atlas(tmp_path):
+    code = (
+        "import sys\n"
+        "from formulacli.atlas import PortraitAtlas\n"
+        "portraits = PortraitAtlas(sys.argv[1])\n"
+        "for i in range(20): portraits.put(sys.argv[2] + str(i), bytes(50), 10, ['A'], ' ')\n"
+    )
+    file_path = str(tmp_path / "portraits.atlas")
+    writers = [subprocess.Popen([sys.executable, "-c", code, file_path, name], env=os.environ) for name in "xy"]
+    assert [writer.wait() for writer in writers] == [0, 0]
+    assert len(PortraitAtlas(file_path)) == 40
+
+
+def test_get_atlas_is_created_once(tmp_path, monkeypatch):
+    class SlowAtlas(PortraitAtlas):
+        def __init__(self):
+            time.sleep(0.01)
+            super().__init__(str(tmp_path / "portraits.atlas"))
+
+    monkeypatch.setattr(atlas, "PortraitAtlas", SlowAtlas)
+    monkeypatch.setattr(atlas, "_atlas", None)
+    found = []
+    threads = [threading.Thread(target=lambda: found.append(atlas.get_atlas())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(portraits) for portraits in found}) == 1
+
+
+def test_portraits_are_downloaded_once(replay):
+    url = replay.url + "/portrait.jpg"
+    painted = atlas.get_atlas().portrait(url, **PORTRAIT_ARGS)
+    assert painted == convert_image(url, **PORTRAIT_ARGS)
+
+    downloads = len(replay.handler.requests)
+    assert PortraitAtlas().portrait(url, **PORTRAIT_ARGS) == painted
+    assert len(replay.handler.requests) == downloads
+    assert atlas_key(url, **KEY_ARGS) in atlas.get_atlas().entries
+
+
+def test_stored_portraits_skip_numpy_and_pil(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    portraits = PortraitAtlas()
+    portraits.put(atlas_key("u", **KEY_ARGS), bytes([0, 1, 2, 3]), 2, ["A", "B", "C", "D"], " ")
+    portraits.close()
+    code = (
+        "import sys\n"
+        "from formulacli.prefetch import render_portrait\n"
+        "assert render_portrait('u')\n"
+        "print(' '.join(m for m in ('numpy', 'PIL') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=os.environ)
+    assert result.stdout.strip() == ""
@@ -0,0 +1,92 @@
+"""
+End to end fetch, parse and render timings against the replay server.
+
+    $ python -m pytest tests/test_benchmarks.py --replay-latency 0.05
+"""
+import shutil
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from formulacli import atlas, html_handlers  # noqa: E402
+from formulacli.drivers import fetch_driver, fetch_drivers  # noqa: E402
+from formulacli.news import fetch_top_stories  # noqa: E402
+from formulacli.prefetch import render_portrait  # noqa: E402
+from formulacli.renderer import Renderer  # noqa: E402
+from formulacli.result_tables import fetch_results  # noqa: E402
+
+ROUNDS = 5
+
+
+@pytest.fixture
+def cold(replay, tmp_path):
+    """Runs ``fn`` with an empty page cache every round, so that every page goes through the server."""
+    def run(benchmark, fn, *args, **kwargs):
+        def empty_cache():
+            shutil.rmtree(tmp_path / "http", ignore_errors=True)
+            html_handlers._cache = None
+
+        return benchmark.pedantic(fn, args, kwargs, setup=empty_cache, rounds=ROUNDS, iterations=1)
+    return run
+
+
+def test_drivers(benchmark, cold):
+    assert len(cold(benchmark, fetch_drivers)) == 20
+
+
+def test_driver_profile(benchmark, cold, replay):
+    assert "BIO" in cold(benchmark, fetch_driver, replay.url + "/en/drivers/lewis-hamilton.html")
+
+
+@pytest.mark.parametrize("table_for", ["drivers", "team", "races", "fastest-laps"])
+def test_results(benchmark, cold, table_for):
+    assert len(cold(benchmark, fetch_results, table_for, 2019)) > 0
+
+
+def test_news(benchmark, cold):
+    assert len(cold(benchmark, fetch_top_stories, img_size=9)) == 13
+
+
+def test_portrait(benchmark, replay, tmp_path):
+    def empty_cache():
+        shutil.rmtree(tmp_path / "atlas", ignore_errors=True)
+        atlas._atlas = None
+
+    portrait = benchmark.pedantic(render_portrait, (replay.url + "/content/portrait.low.jpg",),
+                                  setup=empty_cache, rounds=ROUNDS)
+    assert "\x1b[" in portrait
+
+
+def test_cached_portrait(benchmark, replay):
+    url = replay.url + "/content/portrait.low.jpg"
+    render_portrait(url)
+    assert "\x1b[" in benchmark.pedantic(render_portrait, (url,), rounds=ROUNDS)
+    assert len(replay.handler.requests) == 1
+
+
+def test_cached_results(benchmark, replay):
+    fetch_results("races", 2019)
+    table = benchmark.pedantic(fetch_results, ("races", 2019), rounds=ROUNDS)
+    assert len(replay.handler.requests) == 1
+    assert len(table) > 0
+
+
+def test_driver_frame(benchmark, replay):
+    roster = fetch_drivers()
+    portraits = [render_portrait(roster[0]["IMG"])] * 2
+    frames = [roster.to_string() + "\n" + portrait for portrait in portraits]
+    renderer = Renderer()
+
+    class Terminal:
+        def write(self, text):
+            pass
+
+        def flush(self):
+            pass
+
+        def isatty(self):
+            return True
+
+    terminal = Terminal()
+    benchmark.pedantic(lambda: [renderer.draw(frame, terminal) for frame in frames], rounds=ROUNDS * 4)
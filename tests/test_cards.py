@@ -0,0 +1,36 @@
+import io
+import json
+
+from formulacli import cli
+from formulacli.cards import ansi_to_html, export
+
+
+def test_every_driver_gets_a_card(replay, tmp_path):
+    written, times = export(str(tmp_path / "cards"), workers=2, report=print)
+
+    assert len(written) == 20
+    driver, file_path = written[0]
+    assert file_path == str(tmp_path / "cards" / "lewis-hamilton.ansi")
+    text = open(file_path, encoding="utf-8").read()
+    assert text.startswith(f"  {driver['NAME']}  #{driver['NUMBER']}")
+    assert "\x1b[" in text
+    assert {"roster", "profiles", "cache", "download", "paint", "write"} <= set(times.stages)
+    assert "PARALLEL" in times.summary()
+
+    # painted portraits are kept in the portrait atlas
+    _, again = export(str(tmp_path / "html"), "html", workers=2)
+    assert "paint" not in again.stages
+    assert open(tmp_path / "html" / "lewis-hamilton.html", encoding="utf-8").read().startswith("<!DOCTYPE html>")
+
+
+def test_ansi_to_html():
+    page = ansi_to_html("a\x1b[31m<b>\x1b[48;2;1;2;255m \x1b[0mc", "t")
+    assert '<span style="color:#cd0000">&lt;b&gt;</span>' in page
+    assert '<span style="color:#cd0000;background:#0102ff"> </span>c' in page
+
+
+def test_cards_command(replay, tmp_path):
+    out = io.StringIO()
+    assert cli.main(["cards", "--out", str(tmp_path), "--workers", "1", "--format", "ndjson"], out) == 0
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(rows) == 20 and rows[0]["PATH"].endswith("lewis-hamilton.ansi")
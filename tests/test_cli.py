@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from formulacli import cli
+from formulacli.drivers import DRIVER_STRAINER, DRIVERS_STRAINER, parse_driver, parse_drivers
+from formulacli.exceptions import FetchTimeout
+from formulacli.html_handlers import parse
+from formulacli.records import Table
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+SEASON = Table(["POS", "DRIVER", "PTS"], [["1", "Lewis Hamilton HAM", "413"], ["2", "Valtteri Bottas BOT", "326"]])
+
+
+def page(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def run(*argv):
+    out = io.StringIO()
+    status = cli.main(list(argv), out=out)
+    return status, out.getvalue()
+
+
+@pytest.fixture
+def seasons(monkeypatch):
+    def fake_results(table_for, year):
+        if year == 2030:
+            raise ValueError("Invalid Season Year")
+        if year == 2031:
+            raise FetchTimeout("timed out")
+        return SEASON
+
+    monkeypatch.setattr(cli, "fetch_results", fake_results)
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    monkeypatch.setattr(cli, "fetch_drivers", lambda: parse_drivers(parse(page("drivers.html"), DRIVERS_STRAINER)))
+    monkeypatch.setattr(cli, "fetch_driver", lambda url: parse_driver(parse(page("driver.html"), DRIVER_STRAINER)))
+
+
+def test_parse_years():
+    assert cli.parse_years("2019") == [2019]
+    assert cli.parse_years("2010-2012") == [2010, 2011, 2012]
+
+
+@pytest.mark.parametrize("command", [["results"], ["cards"]])
+@pytest.mark.parametrize("count", ["0", "-2", "two"])
+def test_worker_count_is_checked(command, count, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(command + ["--workers", count])
+    assert exit_info.value.code == 2
+    assert "--workers" in capsys.readouterr().err
+
+
+def test_writer_is_abstract():
+    with pytest.raises(TypeError):
+        cli.Writer(io.StringIO())
+
+
+def test_results_json_across_seasons(seasons):
+    status, output = run("results", "--for", "team", "--year", "2017-2018", "2019", "--format", "json")
+
+    rows = json.loads(output)
+    assert status == 0
+    assert [row["YEAR"] for row in rows] == [2017, 2017, 2018, 2018, 2019, 2019]
+    assert rows[0] == {"YEAR": 2017, "POS": "1", "DRIVER": "Lewis Hamilton HAM", "PTS": "413"}
+
+
+def test_results_csv_and_failed_seasons(seasons, capsys):
+    status, output = run("--format", "csv", "results", "--year", "2029-2031")
+
+    assert status == 1
+    assert list(csv.reader(io.StringIO(output))) == [
+        ["YEAR", "POS", "DRIVER", "PTS"],
+        ["2029", "1", "Lewis Hamilton HAM", "413"],
+        ["2029", "2", "Valtteri Bottas BOT", "326"],
+    ]
+    errors = capsys.readouterr().err
+    assert "2030 drivers: Invalid Season Year" in errors
+    assert "2031 drivers: timed out" in errors
+
+
+def test_drivers_ndjson(roster):
+    status, output = run("drivers", "--format", "ndjson")
+
+    lines = output.splitlines()
+    assert status == 0
+    assert len(lines) == 20
+    assert set(json.loads(lines[0])) == {"NAME", "NUMBER", "TEAM", "URL", "IMG"}
+
+
+def test_driver_profile(roster, capsys):
+    status, output = run("driver", "1")
+    assert status == 0
+    assert json.loads(output)[0]["TEAM"] == "Mercedes"
+    assert "BIO" in json.loads(output)[0]
+
+    assert run("driver", "21")[0] == 2
+    assert "Invalid driver index" in capsys.readouterr().err
+
+
+def test_news_csv_joins_tags(monkeypatch):
+    stories = Table(["headline", "tags", "url", "img"], [["Title", ["main-story", "feature"], "u", "i"]])
+    monkeypatch.setattr(cli, "fetch_top_stories", lambda img_size: stories)
+
+    assert run("news", "--format", "csv")[1].splitlines()[1] == "Title,main-story; feature,u,i"
+
+
+def test_fetch_errors_exit_with_status_one(monkeypatch, capsys):
+    def offline():
+        raise FetchTimeout("timed out")
+
+    monkeypatch.setattr(cli, "fetch_drivers", offline)
+    assert run("drivers") == (1, "[]\n")
+    assert "timed out" in capsys.readouterr().err
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from formulacli import html_handlers
+from formulacli.drivers import DRIVER_STRAINER, DRIVERS_STRAINER, parse_driver, parse_drivers
+from formulacli.html_handlers import parse
+from formulacli.news import NEWS_STRAINER, parse_top_stories
+from formulacli.result_tables import RESULTS_STRAINER, get_cols, get_result_table, get_values
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def page(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def table(soup):
+    result = get_result_table(soup)
+    return get_cols(result), get_values(result)
+
+
+def test_drivers_strained():
+    html = page("drivers.html")
+    drivers = parse_drivers(parse(html, DRIVERS_STRAINER))
+    assert drivers == parse_drivers(parse(html))
+    assert len(drivers) == 20
+    assert drivers[0]["IMG"].endswith("image.img.1920.low.jpg/1554818962683.jpg")
+
+
+def test_driver_strained():
+    html = page("driver.html")
+    driver = parse_driver(parse(html, DRIVER_STRAINER))
+    assert driver == parse_driver(parse(html))
+    assert driver["TEAM"] == "Mercedes"
+
+
+@pytest.mark.parametrize("table_for", ["drivers", "team", "races", "fastest-laps"])
+def test_results_strained(table_for):
+    html = page(f"results_{table_for}.html")
+    assert table(parse(html, RESULTS_STRAINER)) == table(parse(html))
+
+
+def test_news_strained():
+    html = page("latest.html")
+    stories = parse_top_stories(parse(html, NEWS_STRAINER), img_size=9)
+    assert stories == parse_top_stories(parse(html), img_size=9)
+    assert stories[0]["tags"] == ["main-story", "feature"]
+    assert len(stories) == 13
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_strained_extractors_under_both_parsers(parser, monkeypatch):
+    if parser == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(html_handlers, "PARSER", parser)
+    drivers = parse_drivers(parse(page("drivers.html"), DRIVERS_STRAINER))
+    assert len(drivers) == 20
+    assert drivers[0]["NAME"] == "Lewis Hamilton" and drivers[0]["NUMBER"] == "44"
+    assert parse_driver(parse(page("driver.html"), DRIVER_STRAINER))["TEAM"] == "Mercedes"
+    for table_for in ["drivers", "team", "races", "fastest-laps"]:
+        html = page(f"results_{table_for}.html")
+        assert table(parse(html, RESULTS_STRAINER)) == table(parse(html))
+    assert len(parse_top_stories(parse(page("latest.html"), NEWS_STRAINER), img_size=9)) == 13
+
+
+def test_missing_results_table():
+    assert get_result_table(parse(page("latest.html"), RESULTS_STRAINER)) is None
@@ -0,0 +1,107 @@
+import pytest
+
+from formulacli import follow, result_tables
+from formulacli.contexts import Context, FollowContext, ResultTableContext
+from formulacli.follow import Follower, diff_tables
+from formulacli.records import Table
+from tests.replay import snapshot_handler
+
+COLUMNS = ["POS", "DRIVER", "PTS"]
+
+
+def page(rows):
+    head = "".join(f"<th>{col}</th>" for col in COLUMNS)
+    body = "".join("<tr>" + "".join(f"<td>{value}</td>" for value in row) + "</tr>" for row in rows)
+    return (f'<html><body><table class="resultsarchive-table"><thead><tr>{head}</tr></thead>'
+            f'<tbody>{body}</tbody></table></body></html>').encode()
+
+
+BEFORE = [["1", "Lewis Hamilton HAM", "363"], ["2", "Valtteri Bottas BOT", "314"], ["3", "Max Verstappen VER", "260"]]
+AFTER = [["1", "Lewis Hamilton HAM", "388"], ["2", "Max Verstappen VER", "278"], ["3", "Valtteri Bottas BOT", "314"],
+         ["4", "Charles Leclerc LEC", "249"]]
+
+
+@pytest.fixture
+def snapshots(serve, monkeypatch):
+    handler = snapshot_handler([page(BEFORE), page(AFTER)])
+    url = serve(handler)
+    monkeypatch.setattr(result_tables, "RESULTS_URL", url + "/en/results.html/{year}/{table}.html")
+    parsed = []
+    parse_results = result_tables.parse_results
+    monkeypatch.setattr(result_tables, "parse_results", lambda text: parsed.append(1) or parse_results(text))
+    handler.parsed = parsed
+    return handler
+
+
+def test_diff_tables():
+    delta = diff_tables(Table(COLUMNS, BEFORE), Table(COLUMNS, AFTER), key="DRIVER")
+
+    assert delta.added == {3}
+    assert delta.changed == {0: ("PTS",), 1: ("POS", "PTS"), 2: ("POS",)}
+    assert delta.moved == {1: 1, 2: -1}
+    assert delta.removed == []
+    assert diff_tables(Table(COLUMNS, AFTER), Table(COLUMNS, BEFORE), key="DRIVER").removed == ["Charles Leclerc LEC"]
+
+
+def test_first_version_has_no_changes():
+    delta = diff_tables(None, Table(COLUMNS, BEFORE))
+    assert (delta.added, delta.changed, delta.moved) == (set(), {}, {})
+
+
+def test_polls_are_conditional_and_flat(snapshots):
+    follower = Follower("drivers", year=2019)
+
+    assert follower.poll().table == Table(COLUMNS, BEFORE)
+    for _ in range(5):
+        assert follower.poll() is None
+    assert follower.stats["not modified"] == 5
+    assert len(snapshots.parsed) == 1
+
+    snapshots.advance()
+    delta = follower.poll()
+    assert delta.moved == {1: 1, 2: -1}
+    assert follower.poll() is None
+    assert len(snapshots.parsed) == 2
+    assert snapshots.requests == ["/en/results.html/2019/drivers.html"] * 8
+
+
+def test_background_polling(snapshots, monkeypatch):
+    monkeypatch.setattr(follow, "MIN_INTERVAL", 0)
+    follower = Follower("drivers", year=2019, interval=0.02)
+    follower.poll()
+    snapshots.advance()
+
+    follower.start()
+    assert follower.updated.wait(2)
+    follower.stop()
+    follower.thread.join(2)
+
+    assert follower.table == Table(COLUMNS, AFTER)
+    assert not follower.thread.is_alive()
+
+
+def test_highlighted_rows():
+    delta = diff_tables(Table(COLUMNS, BEFORE), Table(COLUMNS, AFTER), key="DRIVER")
+    lines = FollowContext.highlight(delta).split("\n")
+
+    assert lines[0].split() == COLUMNS
+    assert lines[1].startswith("\x1b[1m")
+    assert lines[2].endswith("\x1b[32m+1\x1b[0m")
+    assert lines[3].endswith("\x1b[31m-1\x1b[0m")
+    assert lines[4].startswith("\x1b[92m")
+
+
+@pytest.mark.parametrize("cmd, interval", [("f", follow.POLL_INTERVAL), ("f:60", 60.0), ("f:0.5", follow.MIN_INTERVAL),
+                                           ("f:", None), ("f:abc", None), ("f:-1", None), ("f:0", None),
+                                           ("f:nan", None)])
+def test_follow_interval_is_checked(cmd, interval):
+    ctx = ResultTableContext("drivers", table=Table(COLUMNS, BEFORE))
+    ctx.state['command'] = cmd
+    ctx.action_handler()
+    if interval is None:
+        assert ctx.state['next_ctx'] is ctx
+        assert Context.messages[-1].type == 'error'
+    else:
+        assert ctx.state['next_ctx'] is FollowContext
+        assert ctx.state['next_ctx_args']['interval'] == interval
+    Context.messages.clear()
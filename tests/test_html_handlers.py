@@ -1,3 +1,6 @@
+import time
+from http.server import BaseHTTPRequestHandler
+
 import pytest
 import requests
 from bs4 import BeautifulSoup
@@ -5,9 +8,12 @@ from bs4 import BeautifulSoup
 from urllib3 import HTTPResponse
 
 from formulacli import html_handlers
+from formulacli.exceptions import FetchError, FetchTimeout, HTTPStatusError, ResponseTooLarge
 from formulacli.html_handlers import parse
+from tests.replay import FIXTURES
 
 
+@pytest.mark.network
 def test_get_response():
     response = html_handlers.get_response('http://216.58.192.142')
     assert isinstance(response, str)
@@ -15,9 +21,71 @@ def test_get_response():
     assert isinstance(response, HTTPResponse)
 
 
+@pytest.mark.network
 def test_parse():
     response = requests.get('http://216.58.192.142')
     soup = parse(response.text)
     assert isinstance(soup, BeautifulSoup)
 
 
+class PagesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.5)
+        status = 404 if self.path == "/missing" else 200
+        body = b"<html><p>page</p></html>"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def pages(serve, monkeypatch):
+    monkeypatch.setattr(html_handlers, "_session", None)
+    monkeypatch.setattr(html_handlers, "_requests", 0)
+    return serve(PagesHandler)
+
+
+def test_request_reuses_connections(pages):
+    for _ in range(3):
+        assert html_handlers.request(pages + "/page").text == "<html><p>page</p></html>"
+    assert html_handlers.session_stats() == {"requests": 3, "connections": 1, "reused": 2}
+
+
+def test_request_errors_are_typed(pages):
+    with pytest.raises(HTTPStatusError) as error:
+        html_handlers.request(pages + "/missing")
+    assert error.value.status == 404
+
+    html_handlers.configure_session(timeout=(1, 0.1), retries=0)
+    try:
+        with pytest.raises(FetchTimeout):
+            html_handlers.request(pages + "/slow")
+        with pytest.raises(FetchError):
+            html_handlers.request("http://127.0.0.1:1/")
+    finally:
+        html_handlers.configure_session(timeout=(3.05, 10), retries=3)
+
+
+def test_retry_policy_on_older_urllib3(monkeypatch):
+    class OldRetry(html_handlers.Retry):
+        # urllib3 < 1.26 only knows method_whitelist
+        def __init__(self, method_whitelist=None, **kwargs):
+            super().__init__(allowed_methods=method_whitelist, **kwargs)
+
+    monkeypatch.setattr(html_handlers, "Retry", OldRetry)
+    retry = html_handlers.retry_policy()
+    assert retry.allowed_methods == ("GET",) and retry.total == html_handlers.RETRIES
+
+
+def test_get_bytes_enforces_the_budget(replay):
+    portrait = (FIXTURES / "portrait.jpg").read_bytes()
+    assert html_handlers.get_bytes(replay.url + "/portrait.jpg") == portrait
+    with pytest.raises(ResponseTooLarge):
+        html_handlers.get_bytes(replay.url + "/portrait.jpg", max_bytes=len(portrait) - 1)
@@ -0,0 +1,118 @@
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from formulacli import html_handlers, http_cache
+from formulacli.exceptions import CacheMissError, HTTPStatusError
+from formulacli.http_cache import HTTPCache, ttl_for
+from formulacli.urls import DRIVERS_URL, LATEST_NEWS_URL, RESULTS_URL
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    body = b"<html>v1</html>"
+    etag = '"v1"'
+    requests = []
+
+    def do_GET(self):
+        StubHandler.requests.append(dict(self.headers))
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(serve):
+    StubHandler.requests = []
+    return serve(StubHandler) + "/en/page.html"
+
+
+def test_ttl_classes():
+    year = datetime.now().year
+    assert ttl_for(RESULTS_URL.format(year=1988, table="team")) is None
+    assert ttl_for(RESULTS_URL.format(year=year, table="team")) == http_cache.CURRENT_SEASON_TTL
+    assert ttl_for(LATEST_NEWS_URL) == http_cache.NEWS_TTL
+    assert ttl_for(DRIVERS_URL) == http_cache.DRIVERS_TTL
+
+
+def test_fresh_entries_skip_network(server, tmp_path):
+    cache = HTTPCache(str(tmp_path), offline=False)
+    assert cache.get(server) == "<html>v1</html>"
+    assert cache.get(server) == "<html>v1</html>"
+    assert len(StubHandler.requests) == 1
+    assert HTTPCache(str(tmp_path), offline=False).get(server) == "<html>v1</html>"
+    assert len(StubHandler.requests) == 1
+
+
+def test_expired_entries_revalidate(server, tmp_path):
+    cache = HTTPCache(str(tmp_path), offline=False, ttl=lambda url: 0)
+    cache.get(server)
+    assert cache.get(server) == "<html>v1</html>"
+    assert StubHandler.requests[-1]["If-None-Match"] == '"v1"'
+    assert cache.stats["revalidated"] == 1
+
+
+def test_changed_entries_are_replaced(server, tmp_path, monkeypatch):
+    cache = HTTPCache(str(tmp_path), offline=False, ttl=lambda url: 0)
+    cache.get(server)
+    monkeypatch.setattr(StubHandler, "body", b"<html>v2</html>")
+    monkeypatch.setattr(StubHandler, "etag", '"v2"')
+    assert cache.get(server) == "<html>v2</html>"
+    assert cache.load(server)["etag"] == '"v2"'
+
+
+def test_offline_serves_stale(server, tmp_path):
+    HTTPCache(str(tmp_path), offline=False).get(server)
+    offline = HTTPCache(str(tmp_path), offline=True, ttl=lambda url: 0)
+    assert offline.get(server) == "<html>v1</html>"
+    assert offline.stats["stale"] == 1
+    assert len(StubHandler.requests) == 1
+    with pytest.raises(CacheMissError):
+        offline.get(server + "?other")
+
+
+def test_unreachable_serves_stale(server, tmp_path):
+    HTTPCache(str(tmp_path), offline=False).get(server)
+    unreachable = server.replace(server.split("/")[2], "127.0.0.1:1")
+    cache = HTTPCache(str(tmp_path), offline=False, ttl=lambda url: 0)
+    entry = cache.load(server)
+    entry["url"] = unreachable
+    cache.save(entry)
+    assert cache.get(unreachable) == "<html>v1</html>"
+
+
+def test_misses_go_through_the_shared_session(server, tmp_path):
+    sent = html_handlers._requests
+    HTTPCache(str(tmp_path), offline=False).get(server)
+    assert html_handlers._requests == sent + 1
+    assert "Accept-Encoding" in StubHandler.requests[0]
+    with pytest.raises(HTTPStatusError):
+        HTTPCache(str(tmp_path), offline=False).get(server.replace("/en/page.html", "/missing"))
+
+
+def test_unwritable_cache_still_serves(server, tmp_path, monkeypatch):
+    cache = HTTPCache(str(tmp_path / "missing"), offline=False)
+    assert cache.get(server) == "<html>v1</html>"
+    assert cache.stats["errors"] == 1
+
+    # a file where the cache directory should be
+    (tmp_path / "cache").write_bytes(b"")
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path / "cache"))
+    cache = HTTPCache(offline=False)
+    assert cache.directory is None
+    assert cache.get(server) == "<html>v1</html>"
+    assert len(StubHandler.requests) == 2
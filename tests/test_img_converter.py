@@ -0,0 +1,189 @@
+import io
+import re
+from pathlib import Path
+
+import pytest
+from colorama import Back, Fore, Style
+from numpy import array, asarray, uint8
+from numpy.random import default_rng
+from PIL import Image
+
+from formulacli import img_converter
+from formulacli.img_converter import color_to_ansi, encode_cells, encode_palette_runs, paint_image, quantize
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SGR = re.compile(r"\x1b\[([\d;]*)m")
+
+
+def screen(picture):
+    """Cells as a terminal would show them: (sgr state, character) per cell."""
+    state, cells = {}, []
+    for line in picture.split("\n"):
+        row = []
+        for token in re.split(r"(\x1b\[[\d;]*m)", line):
+            match = SGR.fullmatch(token)
+            if match:
+                for param in match.group(1).split(";"):
+                    code = int(param or 0)
+                    if code == 0:
+                        state = {}
+                    else:
+                        state[code // 10 if code >= 30 else code] = code
+            else:
+                row += [(tuple(sorted(state.items())), char) for char in token]
+        cells.append(row)
+    return cells
+
+
+def legacy_paint(im, colored=False, brush=None):
+    if brush is None:
+        brush = " "
+        scheme = img_converter.BACK_COLOR_SCHEME if colored else img_converter.BACK_BW_SCHEME
+    else:
+        scheme = img_converter.FRONT_COLOR_SCHEME if colored else img_converter.FRONT_BW_SCHEME
+    picture = ""
+    for row in array(im).tolist():
+        for px in row:
+            picture += color_to_ansi(tuple(px), scheme)
+            picture += brush
+        picture += "\n"
+    return picture + Back.RESET + Fore.RESET + Style.RESET_ALL
+
+
+@pytest.fixture
+def image():
+    pixels = default_rng(7).integers(0, 256, size=(23, 31, 3), dtype=uint8)
+    pixels[0, :4] = [(0, 0, 0), (5, 5, 5), (255, 255, 0), (0, 0, 255)]
+    return Image.fromarray(pixels, "RGB")
+
+
+@pytest.mark.parametrize("colored", [False, True])
+@pytest.mark.parametrize("brush", [None, "#"])
+def test_paint_image_matches_legacy(image, colored, brush):
+    assert paint_image(image, colored=colored, brush=brush) == legacy_paint(image, colored, brush)
+
+
+def test_quantize_out_of_range():
+    scheme = {(0, 0, 0): Back.BLACK, (4, 4, 4): Back.WHITE}
+    # (5, 5, 5) is closer to the second entry, but the first one is already "close enough"
+    pixels = array([[(255, 255, 255), (5, 5, 5), (40, 40, 40)]], dtype=uint8)
+    assert quantize(pixels, scheme).tolist() == [[2, 0, 1]]
+    assert color_to_ansi((255, 255, 255), scheme) == Style.BRIGHT
+
+
+def test_quantize_requires_scheme():
+    with pytest.raises(ValueError):
+        quantize(array([[(0, 0, 0)]]), None)
+
+
+def test_lut_persisted_per_scheme(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(img_converter, "_luts", {})
+    lut = img_converter.get_lut(img_converter.BACK_COLOR_SCHEME, 4)
+    assert lut.shape == (16, 16, 16)
+    files = list((tmp_path / "lut").iterdir())
+    assert [f.name for f in files] == [f"{img_converter.scheme_key(img_converter.BACK_COLOR_SCHEME)}-4.npy"]
+
+    monkeypatch.setattr(img_converter, "_luts", {})
+    monkeypatch.setattr(img_converter, "build_lut", None)  # must be loaded from disk
+    assert (img_converter.get_lut(img_converter.BACK_COLOR_SCHEME, 4) == lut).all()
+
+
+def test_lut_quantize_matches_bucket_centers(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    centers = array([[(r, g, b) for r in range(8, 256, 16) for g in (24, 136) for b in (56, 200)]], dtype=uint8)
+    scheme = img_converter.FRONT_COLOR_SCHEME
+    assert (img_converter.lut_quantize(centers, scheme, 4) == quantize(centers, scheme)).all()
+
+
+@pytest.mark.parametrize("content", [b"", b"\x93NUMPY garbage", None])
+def test_lut_survives_a_broken_cache(tmp_path, monkeypatch, content):
+    scheme = img_converter.FRONT_COLOR_SCHEME
+    if content is None:
+        # a file where the cache directory should be, nothing can be written
+        (tmp_path / "cache").write_bytes(b"")
+    else:
+        (tmp_path / "cache" / "lut").mkdir(parents=True)
+        (tmp_path / "cache" / "lut" / f"{img_converter.scheme_key(scheme)}-4.npy").write_bytes(content)
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(img_converter, "_luts", {})
+    assert (img_converter.get_lut(scheme, 4) == img_converter.build_lut(scheme, 4)).all()
+
+
+def test_lut_quantize_falls_back_to_exact(tmp_path, monkeypatch, image):
+    def no_memory(*args):
+        raise MemoryError
+
+    monkeypatch.setenv("FORMULACLI_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(img_converter, "_luts", {})
+    monkeypatch.setattr(img_converter, "build_lut", no_memory)
+    pixels = array(image)
+    assert (img_converter.lut_quantize(pixels, img_converter.BACK_COLOR_SCHEME, 4) ==
+            quantize(pixels, img_converter.BACK_COLOR_SCHEME)).all()
+
+
+@pytest.mark.parametrize("colored", [False, True])
+@pytest.mark.parametrize("brush", [None, "#"])
+def test_rle_renders_same_screen(image, colored, brush):
+    cells = paint_image(image, colored=colored, brush=brush)
+    runs = paint_image(image, colored=colored, brush=brush, encoding="rle")
+    assert screen(runs) == screen(cells)
+
+
+def test_rle_merges_cells_without_palette_entry():
+    scheme = {(0, 0, 0): Back.BLACK, (40, 40, 40): Back.WHITE}
+    indexes = quantize(array([[(255, 255, 255), (0, 0, 0), (255, 255, 255), (40, 40, 40)]] * 2), scheme)
+    cells = "\n".join(encode_cells(indexes, scheme, " "))
+    runs = "\n".join(encode_palette_runs(indexes, scheme, " "))
+    assert screen(runs) == screen(cells)
+    assert runs.split("\n")[0] == Style.BRIGHT + " " + Back.BLACK + "  " + Back.WHITE + " "
+
+
+def test_truecolor_runs():
+    pixels = array([[(1, 2, 3), (1, 2, 3), (250, 0, 9)]], dtype=uint8)
+    picture = paint_image(Image.fromarray(pixels, "RGB"), encoding="truecolor")
+    assert picture.split("\n")[0] == "\x1b[48;2;1;2;3m  \x1b[48;2;250;0;9m "
+    assert paint_image(Image.fromarray(pixels, "RGB"), brush="#", encoding="truecolor").startswith("\x1b[38;2;1;2;3m##")
+
+
+def test_unknown_encoding(image):
+    with pytest.raises(ValueError):
+        paint_image(image, encoding="sixel")
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    counters = {}
+    monkeypatch.setattr(img_converter, "count", lambda name, n=1: counters.__setitem__(name, n))
+    return counters
+
+
+def jpeg(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def test_decode_image_uses_reduced_jpeg_decoding(counted):
+    full = Image.open(FIXTURES / "portrait.jpg").convert("RGB").resize((1280, 1280))
+    crop_box = (420, 20, 860, 480)
+
+    decoded = img_converter.decode_image(jpeg(full), ratio=(0.45, 0.22), crop_box=crop_box)
+
+    expected = full.crop(crop_box).resize((198, 101))
+    assert decoded.size == expected.size
+    assert counted["image decoded bytes"] == 640 * 640 * 3  # 1/2 scale, the width needs it
+    assert abs(asarray(decoded, dtype=float) - asarray(expected, dtype=float)).mean() < 6
+
+
+def test_decode_image_keeps_sizes_draft_cannot_reach(counted):
+    full = Image.open(FIXTURES / "portrait.jpg").convert("RGB")
+    decoded = img_converter.decode_image(jpeg(full), size=(300, 300))
+    assert decoded.size == (300, 300)
+    assert counted["image decoded bytes"] == 320 * 320 * 3
+
+
+def test_convert_image_streams_the_replayed_portrait(replay):
+    picture = img_converter.convert_image(replay.url + "/portrait.jpg", ratio=(0.45, 0.22),
+                                          crop_box=(105, 5, 215, 120), encoding="rle")
+    assert picture.count("\n") == round(115 * 0.22)
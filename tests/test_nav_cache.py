@@ -0,0 +1,101 @@
+import pytest
+
+from formulacli import contexts
+from formulacli.contexts import Context, MAX_HISTORY
+from formulacli.nav_cache import NavigationCache, estimate_size
+from formulacli.records import Table
+
+
+class PageContext(Context):
+    built = 0
+
+    def __init__(self, page: int, body: str = "") -> None:
+        super().__init__()
+        PageContext.built += 1
+        self.state.update({'name': f"Page {page}", 'body': body * 1000})
+
+
+@pytest.fixture(autouse=True)
+def navigation(monkeypatch):
+    monkeypatch.setattr(Context, "history", [])
+    monkeypatch.setattr(Context, "cache", NavigationCache(max_entries=3, max_bytes=64 * 1024))
+    PageContext.built = 0
+
+
+def test_evicts_least_recently_used_by_count():
+    cache = NavigationCache(max_entries=2)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 10)
+
+    assert "b" not in cache
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.nbytes == 20
+    assert cache.evictions == 1
+
+
+def test_evicts_by_size_but_keeps_the_last_entry():
+    cache = NavigationCache(max_entries=10, max_bytes=100)
+    cache.put("a", 1, 60)
+    cache.put("b", 2, 30)
+    cache.put("a", 1, 80)  # grew after a render
+
+    assert list(cache.entries) == ["a"]
+    assert cache.nbytes == 80
+    cache.put("huge", 3, 500)
+    assert list(cache.entries) == ["huge"]
+
+
+def test_hit_rate():
+    cache = NavigationCache()
+    cache.put("a", 1, 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.stats()["hit rate"] == "67%"
+
+
+def test_estimate_size_follows_containers_and_skips_excluded():
+    portrait = "x" * 10_000
+    table = Table(["BIO"], [["y" * 5_000]])
+
+    assert estimate_size({"portrait": portrait}) > 10_000
+    assert estimate_size({"table": table}) > 5_000
+    assert estimate_size({"table": table}, exclude=[table]) < 1_000
+
+
+def test_open_reuses_cached_contexts():
+    page = Context.open(PageContext, {"page": 1})
+    page.add_to_cache()
+    page.state['next_ctx'] = contexts.TextContext
+
+    again = Context.open(PageContext, {"page": 1})
+
+    assert again is page
+    assert again.state['next_ctx'] is again
+    assert PageContext.built == 1
+    assert Context.cache.hits == 1
+
+
+def test_evicted_contexts_are_rebuilt_from_their_args():
+    for page in range(5):
+        Context.open(PageContext, {"page": page, "body": "text"}).add_to_cache()
+    assert len(Context.cache) == 3
+    assert Context.cache.nbytes <= 64 * 1024
+
+    first = Context.open(PageContext, {"page": 0, "body": "text"})
+
+    assert PageContext.built == 6
+    assert first.state['body'] == "text" * 1000
+    assert Context.history[-1] is first.frame
+
+
+def test_history_is_bounded():
+    for page in range(MAX_HISTORY + 10):
+        Context.open(PageContext, {"page": page})
+
+    assert len(Context.history) == MAX_HISTORY
+    assert Context.history[-1].args == {"page": MAX_HISTORY + 9}
@@ -0,0 +1,81 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from formulacli import prefetch
+from formulacli.exceptions import FetchError
+from formulacli.prefetch import DriverPrefetcher
+from formulacli.records import Table
+
+
+@pytest.fixture
+def roster():
+    return Table(["URL", "IMG"], [[f"driver/{i}", f"img/{i}"] for i in range(8)])
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"active": 0, "peak": 0, "urls": []}
+    lock = threading.Lock()
+
+    def slow(url):
+        with lock:
+            calls["active"] += 1
+            calls["peak"] = max(calls["peak"], calls["active"])
+            calls["urls"].append(url)
+        time.sleep(0.02)
+        with lock:
+            calls["active"] -= 1
+        if url == "driver/broken":
+            raise FetchError(url)
+        return {"URL": url} if url.startswith("driver") else f"portrait of {url}"
+
+    monkeypatch.setattr(prefetch, "fetch_driver", slow)
+    monkeypatch.setattr(prefetch, "render_portrait", slow)
+    return calls
+
+
+def test_prefetch_fills_cache_with_bounded_concurrency(roster, calls):
+    prefetcher = DriverPrefetcher(max_workers=3)
+    prefetcher.start(roster)
+    assert prefetcher.profile("driver/5") == {"URL": "driver/5"}
+    assert prefetcher.portrait("img/7") == "portrait of img/7"
+    prefetcher.shutdown()
+    assert calls["peak"] <= 3
+    assert len(calls["urls"]) <= 16
+    assert prefetcher.progress()[1] == 16
+
+
+def test_prefetch_shutdown_cancels_queue(roster, calls):
+    prefetcher = DriverPrefetcher(max_workers=1)
+    prefetcher.start(roster)
+    prefetcher.shutdown()
+    time.sleep(0.05)
+    assert len(calls["urls"]) < 16
+    # cancelled entries are fetched on demand
+    assert prefetcher.portrait("img/7") == "portrait of img/7"
+
+
+def test_prefetch_shutdown_before_cancel_futures(roster, calls, monkeypatch):
+    shutdown = ThreadPoolExecutor.shutdown
+
+    def old_shutdown(self, wait=True):
+        # Python < 3.9 signature
+        shutdown(self, wait)
+
+    monkeypatch.setattr(ThreadPoolExecutor, "shutdown", old_shutdown)
+    prefetcher = DriverPrefetcher(max_workers=1)
+    prefetcher.start(roster)
+    prefetcher.shutdown()
+    assert any(future.cancelled() for future in prefetcher.futures.values())
+
+
+def test_prefetch_failures_retry_in_foreground(calls):
+    prefetcher = DriverPrefetcher(max_workers=1)
+    prefetcher.start(Table(["URL", "IMG"], [["driver/broken", "img/0"]]))
+    with pytest.raises(FetchError):
+        prefetcher.profile("driver/broken")
+    assert calls["urls"].count("driver/broken") == 2
+    prefetcher.shutdown()
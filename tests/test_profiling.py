@@ -0,0 +1,94 @@
+import io
+import pstats
+import time
+
+import pytest
+
+from formulacli import profiling
+from formulacli.helpers import Timer
+from formulacli.profiling import Histogram, Profiler, enable_from_argv, timed
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    profiler = Profiler()
+    monkeypatch.setattr(profiling, "_profiler", profiler)
+    return profiler
+
+
+def test_disabled_leaves_functions_untouched(profiler):
+    def parse():
+        pass
+
+    assert timed()(parse) is parse
+    profiler.count("pages")
+    assert profiler.counters == {}
+
+
+def test_timed_records_latency(profiler):
+    profiler.enable()
+
+    @timed()
+    def parse(delay):
+        time.sleep(delay)
+        return delay
+
+    assert parse(0.02) == 0.02
+    parse(0)
+    histogram = profiler.histograms["test_timed_records_latency.<locals>.parse"]
+    assert histogram.calls == 2
+    assert histogram.max >= 20
+    assert histogram.percentile(0.5) == 1
+
+
+def test_histogram_buckets():
+    histogram = Histogram()
+    for ms in (0.5, 3, 3, 7, 700):
+        histogram.add(ms)
+    assert histogram.counts[:7] == [1, 2, 1, 0, 0, 0, 1]
+    assert histogram.percentile(0.5) == 5
+    assert histogram.percentile(1) == 700
+
+
+def test_named_timers_are_recorded(profiler, capsys):
+    profiler.enable()
+    with Timer("open") as timer:
+        pass
+    with Timer():
+        pass
+
+    assert profiler.histograms["open"].calls == 1
+    assert timer.elapsed >= 0
+    assert "took" in capsys.readouterr().out
+
+
+def test_summary_at_close(profiler):
+    profiler.enable()
+    profiler.record("get_response", 0.12)
+    profiler.count("page cache hits", 3)
+    out = io.StringIO()
+
+    assert profiler.close(out) is None
+    summary = out.getvalue()
+    assert "get_response" in summary and "120.0" in summary
+    assert "page cache hits" in summary
+    assert not profiler.enabled
+
+
+def test_cprofile_dump(profiler, tmp_path):
+    profiler.enable("cprofile")
+    sum(range(1000))
+    stats_path = profiler.close(io.StringIO(), directory=str(tmp_path))
+
+    assert stats_path.startswith(str(tmp_path))
+    assert pstats.Stats(stats_path).total_calls > 0
+
+
+def test_enable_from_argv(profiler, tmp_path):
+    assert enable_from_argv(["results", "--year", "2019"]) == ["results", "--year", "2019"]
+    assert not profiler.enabled
+    assert enable_from_argv(["--profile", "results"]) == ["results"]
+    assert profiler.mode == "summary"
+    assert enable_from_argv(["--profile=cprofile"]) == []
+    assert profiler.mode == "cprofile"
+    profiler.close(io.StringIO(), directory=str(tmp_path))
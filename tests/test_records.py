@@ -0,0 +1,47 @@
+import pickle
+
+import pytest
+
+from formulacli.records import Table
+
+
+@pytest.fixture
+def table():
+    return Table(["NAME", "NUMBER", "tags"], [["Lewis Hamilton", "44", ["news"]], ["Max Verstappen", "33", []]])
+
+
+def test_record_access(table):
+    record = table[1]
+    assert record["NAME"] == "Max Verstappen"
+    assert record.tags == []
+    assert dict(table[0]) == {"NAME": "Lewis Hamilton", "NUMBER": "44", "tags": ["news"]}
+    with pytest.raises(AttributeError):
+        record.TEAM
+    with pytest.raises(IndexError):
+        table[2]
+
+
+def test_select_and_column(table):
+    assert table.select("NUMBER", "NAME") == Table(["NUMBER", "NAME"],
+                                                   [["44", "Lewis Hamilton"], ["33", "Max Verstappen"]])
+    assert table.column("NUMBER") == ["44", "33"]
+
+
+def test_to_string(table):
+    assert table.select("NAME", "NUMBER").to_string(start=1).split("\n") == [
+        "             NAME  NUMBER",
+        "1  Lewis Hamilton      44",
+        "2  Max Verstappen      33",
+    ]
+    assert table.select("NUMBER").to_string(index=False) == "NUMBER\n    44\n    33"
+
+
+def test_from_dicts_and_pickle(table):
+    rows = [{"NAME": "Lewis Hamilton", "NUMBER": "44", "tags": ["news"]}, {"NAME": "Max Verstappen", "NUMBER": "33"}]
+    assert Table.from_dicts(rows).column("tags") == [["news"], None]
+    assert pickle.loads(pickle.dumps(table[0])) == table[0]
+
+
+def test_pandas_round_trip(table):
+    pytest.importorskip("pandas")
+    assert Table.from_pandas(table.to_pandas()) == table
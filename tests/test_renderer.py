@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+
+from formulacli import renderer
+from formulacli.renderer import Renderer, carried_styles
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    size = {"value": os.terminal_size((80, 24))}
+    monkeypatch.setattr(renderer.shutil, "get_terminal_size", lambda: size["value"])
+    return size
+
+
+def draw(frames, text):
+    out = Terminal()
+    frames.draw(text, out)
+    return out.getvalue()
+
+
+def test_first_frame_is_drawn_in_full(screen):
+    output = draw(Renderer(), "Drivers\n  1 HAM\n")
+    assert output == "\x1b[0m\x1b[H\x1b[2JDrivers\n  1 HAM\n"
+
+
+def test_only_changed_lines_are_redrawn(screen):
+    frames = Renderer()
+    draw(frames, "Drivers\n  1 HAM\n  2 BOT\nPress h for help.\n")
+
+    output = draw(frames, "Drivers\n  1 HAM\n  2 VER\nPress h for help.\n")
+
+    assert "HAM" not in output and "Drivers" not in output
+    assert output == "\x1b[3;1H\x1b[0m  2 VER\x1b[0m\x1b[K" + "\x1b[5;1H\x1b[J"
+
+
+def test_shorter_frames_clear_below(screen):
+    frames = Renderer()
+    draw(frames, "a\nb\nc\n")
+    assert draw(frames, "a\n") == "\x1b[2;1H\x1b[J"
+
+
+def test_full_redraw_on_resize_or_overflow(screen):
+    frames = Renderer()
+    draw(frames, "a\nb\n")
+    screen["value"] = os.terminal_size((100, 30))
+    assert draw(frames, "a\nc\n").startswith("\x1b[0m\x1b[H\x1b[2J")
+
+    tall = "\n".join("row" for _ in range(40))
+    assert draw(frames, tall).startswith("\x1b[0m\x1b[H\x1b[2J")
+    assert draw(frames, tall).startswith("\x1b[0m\x1b[H\x1b[2J")
+
+
+def test_styles_are_carried_to_redrawn_lines():
+    lines = ["\x1b[31mred", "still red", "\x1b[0mplain", "\x1b[1m\x1b[47mbold", "x"]
+    assert carried_styles(lines) == ["", "\x1b[31m", "\x1b[31m", "", "\x1b[1m\x1b[47m"]
+
+
+def test_frame_captures_prints_and_records_times(screen, monkeypatch):
+    out = Terminal()
+    monkeypatch.setattr("sys.stdout", out)
+    frames = Renderer()
+
+    with frames.frame():
+        print("Main Menu")
+        assert frames.stream is out
+
+    assert out.getvalue().endswith("Main Menu\n")
+    assert frames.stats()["frames"] == 1
+    assert frames.stats()["lines"] == 2
+
+
+def test_failed_frames_are_not_drawn(monkeypatch):
+    out = Terminal()
+    monkeypatch.setattr("sys.stdout", out)
+    frames = Renderer()
+
+    with pytest.raises(RuntimeError):
+        with frames.frame():
+            print("half a frame")
+            raise RuntimeError
+
+    assert out.getvalue() == ""
+    assert not frames.frames
+
+
+def test_pipes_get_plain_text():
+    out = io.StringIO()
+    Renderer().draw("a\nb\n", out)
+    assert out.getvalue() == "a\nb\n"
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from formulacli import html_handlers
+from formulacli.exceptions import HTTPStatusError
+from formulacli.http_cache import HTTPCache
+from formulacli.drivers import fetch_driver, fetch_drivers
+from formulacli.news import fetch_top_stories
+from formulacli.prefetch import render_portrait
+from formulacli.result_tables import fetch_results
+from tests.replay import replay_handler, route
+
+
+def test_routes():
+    assert route("/en/drivers.html") == "drivers.html"
+    assert route("/en/drivers/max-verstappen.html") == "driver.html"
+    assert route("/en/results.html/1997/fastest-laps.html") == "results_fastest-laps.html"
+    assert route("/content/dam/image.img.1920.low.jpg/1554818962683.jpg") == "portrait.jpg"
+    assert route("/en/results.html/1997/unknown.html") is None
+
+
+def test_scrapers_run_against_the_replay(replay):
+    drivers = fetch_drivers()
+    assert len(drivers) == 20
+    assert drivers[0]["URL"].startswith(replay.url)
+
+    assert fetch_driver(drivers[0]["URL"])["TEAM"] == "Mercedes"
+    assert len(fetch_top_stories()) == 13
+    assert "\x1b[" in render_portrait(drivers[0]["IMG"])
+    for table_for in ("drivers", "team", "races", "fastest-laps"):
+        assert len(fetch_results(table_for, 2019)) > 0
+
+
+def test_missing_pages_are_404(replay):
+    with pytest.raises(HTTPStatusError):
+        html_handlers.request(replay.url + "/en/unknown.html")
+
+
+def test_latency_and_revalidation(serve, monkeypatch, tmp_path):
+    handler = replay_handler(latency=0.2)
+    url = serve(handler) + "/en/drivers.html"
+    cache = HTTPCache(directory=str(tmp_path), fetcher=html_handlers.request, ttl=lambda url: 0)
+
+    start = time.perf_counter()
+    page = cache.get(url)
+    assert time.perf_counter() - start >= 0.2
+    assert cache.get(url) == page
+    assert cache.stats["revalidated"] == 1
+    assert handler.requests == ["/en/drivers.html", "/en/drivers.html"]
@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from formulacli import results_store, schema
+from formulacli.records import Table
+from formulacli.results_store import AGGREGATES, ResultsStore, ingest
+
+DRIVERS_1997 = Table(["POS", "DRIVER", "NATIONALITY", "CAR", "PTS"], [
+    ["1", "Jacques Villeneuve VIL", "CAN", "Williams Renault", "81"],
+    ["2", "Heinz-Harald Frentzen FRE", "GER", "Williams Renault", "42"],
+    ["DQ", "Michael Schumacher MSC", "GER", "Ferrari", "78.5"],
+])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_round_trip_keeps_scraped_text(store):
+    store.save("drivers", 1997, DRIVERS_1997)
+    assert store.load("drivers", 1997) == DRIVERS_1997
+    assert store.load("drivers", 1998) is None
+    assert store.seasons("drivers") == [1997]
+
+
+def test_typed_columns(store):
+    store.save("drivers", 1997, DRIVERS_1997)
+    typed = store.load("drivers", 1997, typed=True)
+    assert typed.column("POS") == [1, 2, "DQ"]
+    assert typed.column("PTS") == [81.0, 42.0, 78.5]
+
+
+def test_new_headers_extend_the_table(store):
+    store.save("races", 1950, Table(["GRAND PRIX", "WINNER", "LAPS"], [["Britain", "Farina", "70"]]))
+    store.save("races", 2019, Table(["GRAND PRIX", "WINNER", "LAPS", "TIME"],
+                                    [["Australia", "Bottas", "58", "1:25:27.325"]]))
+    assert store.load("races", 1950).columns == ("GRAND PRIX", "WINNER", "LAPS")
+    assert store.load("races", 2019, typed=True).column("LAPS") == [58]
+
+
+def test_ingest_skips_stored_seasons(store, monkeypatch):
+    fetched = []
+
+    def fake_fetch(table_for, year):
+        fetched.append((table_for, year))
+        if year == 1949:
+            raise ValueError("Invalid Season Year")
+        return DRIVERS_1997
+
+    monkeypatch.setattr(results_store, "fetch_results", fake_fetch)
+    store.save("drivers", 1997, DRIVERS_1997)
+    counts = ingest(store, range(1949, 1999), tables=["drivers"], workers=4, report=lambda line: None)
+    assert counts == {"stored": 48, "skipped": 1, "missing": 1, "failed": 0}
+    assert ("drivers", 1997) not in fetched
+    assert len(store.seasons("drivers")) == 49
+
+
+def test_unknown_table(store):
+    with pytest.raises(ValueError):
+        store.save("pit-stops", 2019, DRIVERS_1997)
+
+
+RACES_2019 = Table(["GRAND PRIX", "DATE", "WINNER", "CAR", "LAPS", "TIME"], [
+    ["Australia", "17 Mar 2019", "Valtteri Bottas BOT", "Mercedes", "58", "1:25:27.325"],
+    ["Bahrain", "31 Mar 2019", "Lewis Hamilton HAM", "Mercedes", "57", "1:34:21.295"],
+    ["Azerbaijan", "28 Apr 2019", "Valtteri Bottas BOT", "Mercedes", "DNF", "1:31:52.942"],
+])
+
+
+def test_durations_and_dates(store):
+    store.save("races", 2019, RACES_2019)
+    typed = store.load("races", 2019, typed=True)
+    assert typed.column("DATE")[0] == date(2019, 3, 17)
+    assert typed.column("TIME")[0] == timedelta(hours=1, minutes=25, seconds=27.325)
+    assert typed.column("LAPS") == [58, 57, "DNF"]
+    assert store.load("races", 2019) == RACES_2019
+
+
+def test_cells_that_would_not_print_back_stay_text():
+    assert schema.parse("1:20.100", "duration") == timedelta(seconds=80.1)
+    assert schema.parse("2:13:23.6", "duration") == "2:13:23.6"
+    assert schema.parse("+1 Lap", "duration") == "+1 Lap"
+    assert schema.parse("01", "int") == "01"
+    assert schema.parse("", "int") is None
+
+
+def test_aggregates_follow_the_stored_seasons(store):
+    store.save("drivers", 1997, DRIVERS_1997)
+    store.save("drivers", 1998, Table(["POS", "DRIVER", "NATIONALITY", "CAR", "PTS"], [
+        ["1", "Mika Häkkinen HAK", "FIN", "McLaren Mercedes", "100"],
+        ["5", "Jacques Villeneuve VIL", "CAN", "Williams Mecachrome", "21"],
+    ]))
+    store.save("races", 2019, RACES_2019)
+    assert store.aggregate_of("career-points", "Jacques Villeneuve VIL") == 102
+    assert store.aggregate_of("titles", "Jacques Villeneuve VIL") == 1
+    assert store.aggregate_of("seasons", "Jacques Villeneuve VIL") == 2
+    assert store.aggregate("wins").rows == [("Valtteri Bottas BOT", "2"), ("Lewis Hamilton HAM", "1")]
+    assert store.aggregate("team-wins", limit=1).columns == ("CAR", "TEAM-WINS")
+
+    # storing a season again replaces what it added
+    store.save("drivers", 1998, Table(["POS", "DRIVER", "PTS"], [["1", "Mika Häkkinen HAK", "100"]]))
+    assert store.aggregate_of("career-points", "Jacques Villeneuve VIL") == 81
+    assert store.aggregate_of("seasons", "Mika Häkkinen HAK") == 1
+    assert store.aggregate("career-points").column("DRIVER") == [
+        "Mika Häkkinen HAK", "Jacques Villeneuve VIL", "Michael Schumacher MSC", "Heinz-Harald Frentzen FRE"
+    ]
+
+    before = {name: store.aggregate(name).rows for name in AGGREGATES}
+    store.rebuild_aggregates()
+    assert {name: store.aggregate(name).rows for name in AGGREGATES} == before
+    with pytest.raises(ValueError):
+        store.aggregate("podiums")
+
+
+def test_text_stores_are_migrated(tmp_path):
+    db_path = str(tmp_path / "results.sqlite3")
+    db = sqlite3.connect(db_path)
+    db.execute("CREATE TABLE seasons (table_for TEXT, year INTEGER, columns TEXT, fetched_at REAL,"
+               " PRIMARY KEY (table_for, year))")
+    db.execute('CREATE TABLE results_races (year INTEGER, row INTEGER, "WINNER" TEXT, "TIME" TEXT)')
+    db.execute("INSERT INTO results_races VALUES (2019, 0, 'Valtteri Bottas BOT', '1:25:27.325')")
+    db.execute("""INSERT INTO seasons VALUES ('races', 2019, '["WINNER", "TIME"]', 0)""")
+    db.commit()
+    db.close()
+
+    store = ResultsStore(db_path)
+    assert store.load("races", 2019, typed=True).column("TIME") == [timedelta(seconds=5127.325)]
+    assert store.aggregate_of("wins", "Valtteri Bottas BOT") == 1
+    store.close()
+
+
+def test_reads_and_writes_from_many_threads(store):
+    errors = []
+
+    def read():
+        try:
+            for _ in range(200):
+                store.load("drivers", 1997)
+                store.seasons("drivers")
+                store.career("drivers", "DRIVER", "Jacques Villeneuve VIL")
+                store.signature()
+        except Exception as e:  # any sqlite3 error of a shared cursor
+            errors.append(e)
+
+    def write():
+        for year in range(1960, 2000):
+            store.save("drivers", year, DRIVERS_1997)
+
+    store.save("drivers", 1997, DRIVERS_1997)
+    threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert store.aggregate_of("seasons", "Jacques Villeneuve VIL") == 40
+
+
+def test_ingest_leaves_the_current_season_out(store, monkeypatch):
+    monkeypatch.setattr(results_store, "fetch_results", lambda table_for, year: DRIVERS_1997)
+    current = datetime.now().year
+    counts = ingest(store, [current - 1, current], tables=["drivers"], report=lambda line: None)
+    assert counts["stored"] == 1 and counts["skipped"] == 1
+    assert store.seasons("drivers") == [current - 1]
+    assert store.aggregate_of("titles", "Jacques Villeneuve VIL") == 1
+
+    ingest(store, [current], tables=["drivers"], refresh=True, report=lambda line: None)
+    assert store.seasons("drivers") == [current - 1, current]
@@ -0,0 +1,49 @@
+from colorama import Back, Fore, Style
+
+from formulacli.contexts import Context, DriverContext
+from formulacli.records import Table
+from formulacli.roster import Roster, get_roster
+
+DRIVERS = Table(["NAME", "NUMBER", "TEAM", "URL", "IMG"], [
+    [f"Driver Surname{i}", str(i), "Team", f"u/{i}", f"i/{i}"] for i in range(20)
+])
+
+
+def legacy_header(drivers, current):
+    header = Back.LIGHTWHITE_EX
+    for name in drivers.column('NAME'):
+        if name == current:
+            header += Fore.RED + Back.WHITE + name.split(' ')[-1] + Back.LIGHTWHITE_EX + Fore.RESET
+        else:
+            header += Fore.LIGHTBLACK_EX + Style.DIM + name.split(' ')[-1] + Fore.RESET
+        header += "  "
+    return header + Back.RESET
+
+
+def test_header_matches_the_loop_it_replaces():
+    roster = Roster(DRIVERS)
+    for i, driver in enumerate(DRIVERS):
+        assert roster.header(i) == legacy_header(DRIVERS, driver["NAME"])
+
+
+def test_neighbours_wrap_around():
+    roster = Roster(DRIVERS)
+    assert roster.next[19] == 0 and roster.previous[0] == 19
+    assert roster.next[4] == 5 and roster.previous[4] == 3
+    assert roster.index_of("u/7") == 7 and roster.index_of("u/missing") is None
+
+
+def test_built_once_per_roster():
+    assert get_roster(DRIVERS) is get_roster(DRIVERS)
+    assert get_roster(Table(DRIVERS.columns, DRIVERS.rows)) is not get_roster(DRIVERS)
+
+
+def test_cycling_drivers():
+    ctx = DriverContext(DRIVERS[0], 0, DRIVERS)
+    Context.history.append(ctx.frame)
+    ctx.state['command'] = 'a'
+    ctx.action_handler()
+    assert ctx.state['next_ctx'] is DriverContext
+    assert ctx.state['next_ctx_args']['driver_index'] == 19
+    assert ctx.state['next_ctx_args']['driver']["NAME"] == "Driver Surname19"
+    assert DriverContext(DRIVERS[19], 19, DRIVERS).header == legacy_header(DRIVERS, "Driver Surname19")
@@ -0,0 +1,134 @@
+import pytest
+
+from formulacli import drivers, search
+from formulacli.contexts import CareerContext, Context, DriverContext, MainContext, ResultTableContext
+from formulacli.exceptions import FetchError
+from formulacli.records import Table
+from formulacli.results_store import ResultsStore
+from formulacli.search import Entry, SearchIndex, build_index, get_index, tokenize
+
+ROSTER = Table(["NAME", "NUMBER", "TEAM", "URL", "IMG"], [
+    ["Lewis Hamilton", "44", "Mercedes", "u/hamilton", "i/hamilton"],
+    ["Kimi Räikkönen", "7", "Alfa Romeo Racing", "u/raikkonen", "i/raikkonen"],
+])
+DRIVERS_1997 = Table(["POS", "DRIVER", "NATIONALITY", "CAR", "PTS"], [
+    ["1", "Jacques Villeneuve VIL", "CAN", "Williams Renault", "81"],
+    ["DQ", "Michael Schumacher MSC", "GER", "Ferrari", "78.5"],
+])
+DRIVERS_1998 = Table(["POS", "DRIVER", "NATIONALITY", "CAR", "PTS"], [
+    ["1", "Mika Häkkinen HAK", "FIN", "McLaren Mercedes", "100"],
+    ["5", "Jacques Villeneuve VIL", "CAN", "Williams Mecachrome", "21"],
+])
+TEAMS_1997 = Table(["POS", "TEAM", "PTS"], [["1", "Williams Renault", "123"], ["2", "Ferrari", "102"]])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite3"))
+    store.save("drivers", 1997, DRIVERS_1997)
+    store.save("drivers", 1998, DRIVERS_1998)
+    store.save("team", 1997, TEAMS_1997)
+    search.clear()
+    yield store
+    search.clear()
+    store.close()
+
+
+@pytest.fixture
+def roster(monkeypatch):
+    fetched = []
+
+    def fetch_drivers():
+        fetched.append(ROSTER)
+        return ROSTER
+
+    monkeypatch.setattr(drivers, "fetch_drivers", fetch_drivers)
+    return fetched
+
+
+def test_tokenize_drops_accents_and_punctuation():
+    assert tokenize("Kimi Räikkönen RAI") == ["kimi", "raikkonen", "rai"]
+    assert tokenize("Heinz-Harald Frentzen") == ["heinz", "harald", "frentzen"]
+
+
+def test_names_numbers_teams_and_seasons(store):
+    index = build_index(store, ROSTER)
+
+    assert index.search("ham")[0] == Entry("driver", "Lewis Hamilton", "u/hamilton")
+    assert index.search("44") == [Entry("driver", "Lewis Hamilton", "u/hamilton")]
+    assert index.search("raik")[0].key == "u/raikkonen"
+    assert index.search("hakkinen") == [Entry("driver results", "Mika Häkkinen HAK", "Mika Häkkinen HAK")]
+    assert index.search("jac vil") == [Entry("driver results", "Jacques Villeneuve VIL", "Jacques Villeneuve VIL")]
+    assert index.search("1997")[0] == Entry("season", "1997 season", 1997)
+    assert Entry("team results", "Williams Renault", "Williams Renault") in index.search("williams")
+    assert index.search("nobody") == []
+
+
+def test_misspelled_words_rank_by_similarity(store):
+    index = build_index(store, ROSTER)
+    assert index.search("vileneuve")[0].label == "Jacques Villeneuve VIL"
+    assert index.search("shumacher")[0].label == "Michael Schumacher MSC"
+
+
+def test_index_is_saved_next_to_the_store(store, roster):
+    assert get_index(store).search("44")
+    search.clear()
+    assert get_index(store).search("44")
+    assert len(roster) == 1
+
+    store.save("drivers", 1999, DRIVERS_1997)
+    get_index(store)
+    assert len(roster) == 2
+
+
+def test_index_without_roster_is_rebuilt(store, monkeypatch):
+    online = []
+
+    def fetch_drivers():
+        if not online:
+            raise FetchError("offline")
+        return ROSTER
+
+    monkeypatch.setattr(drivers, "fetch_drivers", fetch_drivers)
+    assert not get_index(store).search("44")
+    online.append(True)
+    assert get_index(store).search("44")
+
+
+def test_round_trip(store, tmp_path):
+    index = build_index(store, ROSTER)
+    index.save(str(tmp_path / "index.json"))
+    loaded = SearchIndex.load(str(tmp_path / "index.json"))
+    assert loaded.entries == index.entries
+    assert loaded.search("vileneuve") == index.search("vileneuve")
+    assert SearchIndex.load(str(tmp_path / "missing.json")) is None
+
+
+def test_written_commands_are_searched(store, roster, monkeypatch):
+    monkeypatch.setattr(search, "get_store", lambda: store)
+    ctx = MainContext()
+    assert ctx.claims("3") and not ctx.claims("44")
+
+    ctx.search("44")
+    assert ctx.state['next_ctx'] is DriverContext
+    assert ctx.state['next_ctx_args']['driver']['NAME'] == "Lewis Hamilton"
+    assert ctx.state['next_ctx_args']['driver_index'] == 0
+
+    ctx.search("1998")
+    assert ctx.state['next_ctx'] is ResultTableContext
+    assert ctx.state['next_ctx_args']['year'] == 1998
+
+    ctx.search("villeneuve")
+    assert ctx.state['next_ctx'] is CareerContext
+    assert ctx.state['next_ctx_args'] == {'table_for': 'drivers', 'name': "Jacques Villeneuve VIL"}
+    Context.messages.clear()
+
+
+def test_career_lists_every_stored_season(store):
+    career = store.career("drivers", "DRIVER", "Jacques Villeneuve VIL")
+    assert career.columns == ("YEAR", "POS", "NATIONALITY", "CAR", "PTS")
+    assert career.rows == [
+        ("1998", "5", "CAN", "Williams Mecachrome", "21"),
+        ("1997", "1", "CAN", "Williams Renault", "81"),
+    ]
+    assert store.career("races", "WINNER", "x").rows == []
@@ -0,0 +1,13 @@
+import subprocess
+import sys
+
+
+def test_main_menu_skips_heavy_imports():
+    code = (
+        "import sys, formulacli.app\n"
+        "formulacli.app.FormulaCLI()\n"
+        "formulacli.app.contexts.MainContext()\n"
+        "print(' '.join(m for m in ('pandas', 'numpy', 'PIL', 'requests', 'bs4') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
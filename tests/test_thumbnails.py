@@ -0,0 +1,68 @@
+import time
+from threading import Event
+
+from formulacli import thumbnails
+from formulacli.contexts import NewsListContext
+from formulacli.exceptions import FetchError
+from formulacli.records import Table
+from formulacli.thumbnails import ThumbnailLoader
+
+
+def slow_render(delays, release=None):
+    def render(url):
+        if release is not None:
+            release.wait(5)
+        time.sleep(delays[url])
+        if url == "broken":
+            raise FetchError(url)
+        return f"<{url}>"
+    return render
+
+
+def test_page_takes_as_long_as_its_slowest_image():
+    delays = {f"img/{i}": 0.2 for i in range(12)}
+    start = time.perf_counter()
+    loader = ThumbnailLoader(delays, render=slow_render(delays))
+    while loader.pending:
+        loader.updated.wait(1)
+    assert time.perf_counter() - start < 1.0
+    assert loader.get("img/3") == "<img/3>"
+    assert loader.progress() == (12, 12)
+
+
+def test_thumbnails_fill_in_as_they_complete():
+    release = Event()
+    loader = ThumbnailLoader(["img/1", "broken", "img/1"], render=slow_render({"img/1": 0, "broken": 0}, release))
+    assert loader.get("img/1") is None
+    assert loader.progress() == (0, 2)
+
+    release.set()
+    assert loader.updated.wait(5)
+    while loader.pending:
+        time.sleep(0.01)
+    assert loader.get("img/1") == "<img/1>"
+    assert loader.get("broken") == ""
+    assert loader.get("unknown") == ""
+
+
+def test_headlines_render_before_their_thumbnails(monkeypatch, capsys):
+    release = Event()
+    monkeypatch.setattr(thumbnails, "render_thumbnail", lambda url: release.wait(5) and "T" * 12 + "\nT\nT\n")
+    articles = Table(["headline", "tags", "url", "img"],
+                     [["First", ["main-story", "news"], "u/1", "i/1"], ["Second", ["feature"], "u/2", "i/2"]])
+    ctx = NewsListContext(articles)
+
+    ctx.event()
+    loading = capsys.readouterr().out
+    assert "First" in loading and "Second" in loading
+    assert "TTTTTTTTTTTT" not in loading
+    assert "[loading images 0/2]" in loading
+
+    release.set()
+    while ctx.state['thumbnails'].pending:
+        time.sleep(0.01)
+    ctx.event()
+    loaded = capsys.readouterr().out
+    assert "TTTTTTTTTTTT" in loaded
+    assert "loading images" not in loaded
+    ctx.state['thumbnails'].shutdown()
@@ -3,6 +3,8 @@ import requests
 
 from formulacli import urls
 
+pytestmark = pytest.mark.network
+
 
 def test_base_url_connection():
     resp = requests.get(urls.BASE_URL)